@@ -0,0 +1,44 @@
+"""Compare adding a note with an in-place save against a full rewrite.
+
+The cached journal, as opened by the command line, also updates its cache.
+
+Run with `python -m benchmarks.bench_add`."""
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+from jrnlmd.journal import Journal
+from jrnlmd.journal_entry import JournalEntry
+
+from .journal_generator import generate_journal
+
+SIZE_MB = 30
+DATES = {"newest": "2200-01-01", "middle": "2015-06-01", "oldest": "2011-12-31"}
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        journal_file = Path(tmp_dir) / "journal.md"
+        journal_file.write_text(generate_journal(SIZE_MB * 2**20))
+        runs = [
+            (False, False, "full save"),
+            (True, False, "in place"),
+            (True, True, "cached"),
+        ]
+        with mock.patch("jrnlmd.config.DEFAULT_CACHE_DIR", tmp_dir):
+            for lazy, use_cache, label in runs:
+                if use_cache:
+                    # Store the cache of the file written by the previous runs
+                    Journal(journal_file, lazy=True, use_cache=True)
+                for position, date in DATES.items():
+                    start = time.perf_counter()
+                    journal = Journal(journal_file, lazy=lazy, use_cache=use_cache)
+                    journal.add(JournalEntry("a note", date, "topic"))
+                    journal.save()
+                    elapsed = time.perf_counter() - start
+                    print(f"{label:>9}  {position:>6} date  {elapsed:7.3f} s")
+
+
+if __name__ == "__main__":
+    main()
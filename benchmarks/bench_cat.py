@@ -0,0 +1,49 @@
+"""Compare rendering a whole journal with `to_md` and with the streaming `iter_md`.
+
+Run with `python -m benchmarks.bench_cat`."""
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from jrnlmd.journal import Journal
+
+from .journal_generator import generate_journal
+
+SIZE_MB = 30
+
+
+def render_to_md(journal: Journal) -> float:
+    start = time.perf_counter()
+    journal.to_md()
+    return time.perf_counter() - start
+
+
+def render_iter_md(journal: Journal) -> float:
+    start = time.perf_counter()
+    chunks = journal.iter_md()
+    next(chunks)
+    first_chunk = time.perf_counter() - start
+    for _ in chunks:
+        pass
+    return first_chunk
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        journal_file = Path(tmp_dir) / "journal.md"
+        journal_file.write_text(generate_journal(SIZE_MB * 2**20))
+        for label, render in [("to_md", render_to_md), ("iter_md", render_iter_md)]:
+            journal = Journal(journal_file, lazy=True)
+            tracemalloc.start()
+            first_output = render(journal)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(
+                f"{label:>7}: first output after {first_output:6.3f} s,"
+                f" peak memory {peak / 2**20:6.1f} MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Measure the peak memory of filtered reads of a 200 MB journal.
+
+Each read runs in a new process, which reports its peak resident set size, read
+from `/proc` as `ru_maxrss` would include the peak of the parent process. The
+first opening of the journal builds its cache, and the reads then use the cache
+as the command does. They are compared with loading all the notes.
+
+Run with `python -m benchmarks.bench_filtered_read`."""
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from .journal_generator import generate_journal
+
+SIZE_MB = 200
+READS = {
+    "cold cache": "pass",
+    "warm cache": "pass",
+    "on": "journal.on(journal.dates()[-100]).to_md()",
+    "about": "journal.about('topic7').since(journal.dates()[-365]).to_md()",
+    "last year": "journal.since(journal.dates()[-365]).to_md()",
+    "all notes": "journal.to_dict()",
+}
+CHILD = """
+import re, sys
+from pathlib import Path
+from unittest import mock
+from jrnlmd.journal import Journal
+with mock.patch("jrnlmd.config.DEFAULT_CACHE_DIR", sys.argv[2]):
+    if sys.argv[1]:
+        journal = Journal(Path(sys.argv[1]), lazy=True, use_cache=True)
+        {read}
+print(re.search(r"VmHWM:\\s*(\\d+)", Path("/proc/self/status").read_text())[1])
+"""
+
+
+def run_read(journal_file: str, cache_dir: str, read: str) -> int:
+    """Return the peak resident set size of a read, in kB.
+
+    No journal is opened if `journal_file` is empty."""
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD.format(read=read), journal_file, cache_dir],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return int(result.stdout)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        journal_file = Path(tmp_dir) / "journal.md"
+        journal_file.write_text(generate_journal(SIZE_MB * 2**20))
+        baseline = run_read("", tmp_dir, "pass")
+        print(f"{SIZE_MB} MB journal, {baseline / 1024:.0f} MB for Python and imports")
+        for label, read in READS.items():
+            start = time.perf_counter()
+            peak = run_read(str(journal_file), tmp_dir, read)
+            elapsed = time.perf_counter() - start
+            print(
+                f"{label:>10}: peak {peak / 1024:6.0f} MB"
+                f" (+{(peak - baseline) / 1024:4.0f} MB) {elapsed:6.2f} s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Compare the git commit backends in a repository with many tracked files.
+
+Run with `python -m benchmarks.bench_git`."""
+import os
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from jrnlmd.version_control import BACKENDS, JournalGitVersionControl
+
+N_FILES = 50_000
+FILES_PER_DIR = 500
+N_COMMITS = 10
+
+
+def create_repo(repo_dir: Path) -> Path:
+    """Create a repository with `N_FILES` tracked files and a journal."""
+    subprocess.run(["git", "init", "--quiet", str(repo_dir)], check=True)
+    for i in range(N_FILES):
+        file_path = repo_dir / f"notes{i // FILES_PER_DIR}" / f"note{i}.md"
+        file_path.parent.mkdir(exist_ok=True)
+        file_path.write_text(f"note {i}\n")
+    journal_file = repo_dir / "journal.md"
+    journal_file.write_text("# 2021-11-12\n\n## topic1\n\n- a note\n")
+    subprocess.run(["git", "add", "--all"], cwd=repo_dir, check=True)
+    subprocess.run(
+        ["git", "commit", "--quiet", "-m", "Initial commit"], cwd=repo_dir, check=True
+    )
+    return journal_file
+
+
+def time_commits(journal_file: Path, backend: str) -> float:
+    """Return the mean time to add a note and commit the journal."""
+    start = time.perf_counter()
+    for i in range(N_COMMITS):
+        with journal_file.open("a") as f:
+            f.write(f"- {backend} note {i}\n")
+        JournalGitVersionControl(journal_file, backend).commit(f"{backend} {i}")
+    return (time.perf_counter() - start) / N_COMMITS
+
+
+def main():
+    for variable in ["AUTHOR", "COMMITTER"]:
+        os.environ.setdefault(f"GIT_{variable}_NAME", "jrnlmd")
+        os.environ.setdefault(f"GIT_{variable}_EMAIL", "jrnlmd@example.com")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        journal_file = create_repo(Path(tmp_dir))
+        print(f"{N_FILES} tracked files, mean of {N_COMMITS} commits")
+        for backend in BACKENDS:
+            print(f"{backend:>9}: {time_commits(journal_file, backend):7.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Measure the throughput of the import command against one add per entry.
+
+Run with `python -m benchmarks.bench_import`."""
+import random
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+from jrnlmd import jrnlmd
+
+from .journal_generator import generate_journal
+
+SIZE_MB = 5
+N_IMPORTED = 10_000
+N_ADDED = 100
+
+
+def generate_entries(n_entries: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    entries = []
+    for i in range(n_entries):
+        date = f"2023-{rng.randint(1, 12):02}-{rng.randint(1, 28):02}"
+        topic = f"topic{rng.randrange(50)}"
+        entries.append(f"{date}: {topic} . imported note {i} , second bullet")
+    return entries
+
+
+def run(args):
+    with mock.patch("jrnlmd.jrnlmd.print_with_external"):
+        jrnlmd.cli.main(args, standalone_mode=False)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        journal_file = Path(tmp_dir) / "journal.md"
+        journal_text = generate_journal(SIZE_MB * 2**20)
+        entries_file = Path(tmp_dir) / "entries.txt"
+        entries_file.write_text("\n".join(generate_entries(N_IMPORTED)))
+        with mock.patch("jrnlmd.config.DEFAULT_CACHE_DIR", tmp_dir):
+            journal_file.write_text(journal_text)
+            start = time.perf_counter()
+            run(["-j", str(journal_file), "import", str(entries_file)])
+            elapsed = time.perf_counter() - start
+            print(f"import {N_IMPORTED} entries: {N_IMPORTED / elapsed:9.0f} entries/s")
+            journal_file.write_text(journal_text)
+            start = time.perf_counter()
+            for entry in generate_entries(N_ADDED):
+                run(["-j", str(journal_file), "add", entry])
+            elapsed = time.perf_counter() - start
+            print(f"add {N_ADDED} entries:       {N_ADDED / elapsed:9.0f} entries/s")
+
+
+if __name__ == "__main__":
+    main()
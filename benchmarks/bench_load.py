@@ -0,0 +1,35 @@
+"""Measure how `Journal.load` scales with the size of the journal.
+
+The lazy load only indexes the headings, so it is also reported for comparison.
+
+Run with `python -m benchmarks.bench_load`."""
+import tempfile
+import time
+from pathlib import Path
+
+from jrnlmd.journal import Journal
+
+from .journal_generator import generate_journal
+
+SIZES_MB = [5, 10, 20, 50]
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        journal_file = Path(tmp_dir) / "journal.md"
+        for size_mb in SIZES_MB:
+            journal_file.write_text(generate_journal(size_mb * 2**20))
+            start = time.perf_counter()
+            journal = Journal(journal_file)
+            elapsed = time.perf_counter() - start
+            start = time.perf_counter()
+            Journal(journal_file, lazy=True)
+            elapsed_lazy = time.perf_counter() - start
+            print(
+                f"{size_mb:>4} MB  {len(journal._j):>6} days  {elapsed:7.3f} s "
+                f" {size_mb / elapsed:6.1f} MB/s  lazy {elapsed_lazy:7.3f} s"
+            )
+
+
+if __name__ == "__main__":
+    main()
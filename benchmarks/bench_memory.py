@@ -0,0 +1,87 @@
+"""Compare the memory used by the notes of a 10-year journal, stored in nested
+dictionaries of strings as they were before, and in a `NoteStore`.
+
+Run with `python -m benchmarks.bench_memory`."""
+import gc
+import tracemalloc
+from collections import defaultdict
+from typing import Callable, DefaultDict, Iterable, List
+
+from jrnlmd.journal import Journal
+
+from .journal_generator import generate_journal
+
+YEARS = 10
+START = "2012-01-01"
+
+
+def ten_year_journal() -> str:
+    text = generate_journal(5 * 2**20, start=START)
+    end = f"{int(START[:4]) + YEARS - 1}-12-31"
+    return Journal.from_md(text).between(START, end).to_md()
+
+
+def parse_nested_dicts(lines: Iterable[str]):
+    """Parse the notes into nested dictionaries, as `Journal` stored them."""
+    notes: DefaultDict[str, DefaultDict[str, List[str]]] = defaultdict(
+        lambda: defaultdict(list)
+    )
+    current_day = ""
+    current_topic = ""
+    code_fence = False
+    for line in lines:
+        if line.startswith("```") or line.startswith("~~~"):
+            code_fence = not code_fence
+        if line.startswith("##") and not code_fence:
+            current_topic = line.removeprefix("##").strip()
+        elif line.startswith("#") and not code_fence:
+            current_day = line.removeprefix("#").strip()
+        elif line or code_fence:
+            notes[current_day][current_topic].append(line)
+    nested: DefaultDict[str, DefaultDict[str, str]] = defaultdict(
+        lambda: defaultdict(str)
+    )
+    for day, topics in notes.items():
+        for topic, topic_lines in topics.items():
+            nested[day][topic] = "\n".join(topic_lines) + "\n"
+    return nested
+
+
+def parse_note_store(lines: Iterable[str]):
+    journal = Journal()
+    journal._from_md(lines)
+    return journal._j
+
+
+def measure(parse: Callable, lines: Iterable[str]) -> int:
+    """Return the memory held by the parsed notes, the notes included."""
+    gc.collect()
+    tracemalloc.start()
+    notes = parse(lines)
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del notes
+    return size
+
+
+def main():
+    text = ten_year_journal()
+    lines = text.splitlines()
+    journal = Journal.from_md(text)
+    n_notes = sum(len(journal._j[date]) for date in journal.dates())
+    print(
+        f"{YEARS} years: {len(journal.dates())} dates, {n_notes} notes,"
+        f" {len(text.encode()) / 2**20:.1f} MB"
+    )
+    del journal
+    for label, parse in [
+        ("nested dicts", parse_nested_dicts),
+        ("note store", parse_note_store),
+    ]:
+        size = measure(parse, lines)
+        print(f"{label:>12}: {size / 2**20:6.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Measure a search over 50 journals of 2 MB with more and more worker processes.
+
+Each run starts with an empty cache, so that every journal is parsed.
+
+Run with `python -m benchmarks.bench_multi_journal`."""
+import os
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+from jrnlmd.multi_journal import MultiJournal
+
+from .journal_generator import generate_journal
+
+N_JOURNALS = 50
+SIZE_MB = 2
+QUERY = "lorem dolor"
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        journal_paths = []
+        for i in range(N_JOURNALS):
+            journal_path = Path(tmp_dir) / f"journal{i}.md"
+            journal_path.write_text(generate_journal(SIZE_MB * 2**20, seed=i))
+            journal_paths.append(journal_path)
+        cpu_count = os.cpu_count() or 1
+        print(f"{N_JOURNALS} journals of {SIZE_MB} MB, {cpu_count} cores")
+        for max_workers in sorted({1, 2, 4, cpu_count}):
+            cache_dir = Path(tmp_dir) / f"cache{max_workers}"
+            with mock.patch("jrnlmd.config.DEFAULT_CACHE_DIR", str(cache_dir)):
+                journals = MultiJournal(journal_paths, max_workers=max_workers)
+                start = time.perf_counter()
+                n_dates = len(journals.search(QUERY).to_dict())
+                elapsed = time.perf_counter() - start
+            print(f"{max_workers:>3} workers: {n_dates} dates in {elapsed:6.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Compare the parsing of the notes of a markdown journal, which splits the text on
+its headings and code fences, with the line by line parser it replaced.
+
+Both build the notes by date and topic, and the time to store them in a `Journal`
+is reported separately.
+
+Run with `python -m benchmarks.bench_parse`."""
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List
+
+from jrnlmd.journal import Journal, _parse_notes
+
+from .journal_generator import generate_journal
+
+SIZES_MB = [5, 20, 50]
+REPEATS = 3
+
+
+def parse_lines(text: str) -> Dict[str, Dict[str, str]]:
+    """Parse the notes one line at a time, as `Journal._from_md` did."""
+    notes: Dict[str, Dict[str, List[str]]] = defaultdict(lambda: defaultdict(list))
+    current_day = ""
+    current_topic = ""
+    code_fence = False
+    for line in text.splitlines():
+        if line.startswith("```") or line.startswith("~~~"):
+            code_fence = not code_fence
+        if line.startswith("##") and not code_fence:
+            current_topic = line.removeprefix("##").strip()
+        elif line.startswith("#") and not code_fence:
+            current_day = line.removeprefix("#").strip()
+        elif line:
+            if not (current_day and current_topic):
+                raise ValueError("malformed journal")
+            notes[current_day][current_topic].append(line)
+        elif code_fence:
+            notes[current_day][current_topic].append(line)
+    return {
+        day: {topic: "\n".join(lines) + "\n" for topic, lines in topics.items()}
+        for day, topics in notes.items()
+    }
+
+
+def best_time(parse: Callable[[str], object], text: str) -> float:
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        parse(text)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    for size_mb in SIZES_MB:
+        text = generate_journal(size_mb * 2**20)
+        assert parse_lines(text) == _parse_notes(text)
+        lines_time = best_time(parse_lines, text)
+        split_time = best_time(_parse_notes, text)
+        journal_time = best_time(Journal.from_md, text)
+        print(
+            f"{size_mb:>4} MB  lines {lines_time:6.3f} s  split {split_time:6.3f} s"
+            f"  {lines_time / split_time:4.1f}x  from_md {journal_time:6.3f} s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Measure full-text queries on a journal with about 100k notes.
+
+Run with `python -m benchmarks.bench_search`."""
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+from jrnlmd.journal import Journal
+from jrnlmd.search_index import SearchIndexCache, parse_query
+
+from .journal_generator import generate_journal
+
+SIZE_MB = 35
+QUERIES = ["lorem", "lorem dolor tempor", "magna OR aliqua", '"sed do eiusmod"']
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        journal_file = Path(tmp_dir) / "journal.md"
+        journal_file.write_text(generate_journal(SIZE_MB * 2**20))
+        with mock.patch("jrnlmd.config.DEFAULT_CACHE_DIR", tmp_dir):
+            journal = Journal(journal_file, lazy=True, use_cache=True)
+            n_notes = sum(len(topics) for topics in journal._j.values())
+            start = time.perf_counter()
+            journal.search("lorem")
+            elapsed = time.perf_counter() - start
+            print(f"{n_notes} notes, index built in {elapsed:.3f} s")
+            start = time.perf_counter()
+            index = SearchIndexCache(journal_file).load()
+            print(f"index loaded in {time.perf_counter() - start:.3f} s")
+            for query in QUERIES:
+                start = time.perf_counter()
+                sections = index.search(parse_query(query))
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                print(f"{query!r:>22}: {len(sections):>6} notes {elapsed_ms:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
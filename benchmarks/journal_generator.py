@@ -0,0 +1,86 @@
+"""Generate synthetic journals for the benchmarks."""
+import datetime
+import random
+from typing import Iterator, List
+
+WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor"
+    " incididunt ut labore et dolore magna aliqua"
+).split()
+
+
+def generate_journal(
+    size: int, seed: int = 0, n_topics: int = 200, start: str = "2012-01-01"
+) -> str:
+    """Return a markdown journal of roughly `size` bytes.
+
+    The journal is written as `Journal.to_md` would write it, and some notes
+    contain a code fence."""
+    return "".join(_generate_chunks(size, seed, n_topics, start))
+
+
+def _generate_chunks(size: int, seed: int, n_topics: int, start: str) -> Iterator[str]:
+    rng = random.Random(seed)
+    topics = [f"topic{i}" for i in range(n_topics)]
+    day = datetime.date.fromisoformat(start)
+    days = []
+    written = 0
+    while written < size:
+        chunk = [f"# {day.isoformat()}\n"]
+        for topic in rng.sample(topics, rng.randint(1, 4)):
+            chunk.append(f"## {topic}\n")
+            note = [
+                f"- {' '.join(rng.choices(WORDS, k=12))}\n"
+                for _ in range(rng.randint(1, 8))
+            ]
+            if rng.random() < 0.1:
+                note.append("```bash\n# comment\n\nls -a\n```\n")
+            chunk.append("".join(note))
+        text = "\n".join(chunk)
+        days.append(text)
+        written += len(text) + 1
+        day += datetime.timedelta(days=1)
+    yield "\n".join(reversed(days))
+
+
+def generate_years(
+    years: int,
+    seed: int = 0,
+    n_topics: int = 200,
+    zipf_exponent: float = 1.1,
+    start: str = "2012-01-01",
+) -> str:
+    """Return a markdown journal written over `years` years, newest date first.
+
+    About two days out of three have notes. The topics are used with a Zipfian
+    distribution, so that a few topics appear on most dates and most topics are
+    rare. Some bullets continue on a second line and some notes contain a code
+    fence."""
+    rng = random.Random(seed)
+    topics = [f"topic{i}" for i in range(n_topics)]
+    weights = [1 / rank**zipf_exponent for rank in range(1, n_topics + 1)]
+    first_day = datetime.date.fromisoformat(start)
+    end = first_day.replace(year=first_day.year + years)
+    days = []
+    for ordinal in range(first_day.toordinal(), end.toordinal()):
+        if rng.random() < 0.3:
+            continue
+        day = datetime.date.fromordinal(ordinal)
+        chunk = [f"# {day.isoformat()}\n"]
+        day_topics = dict.fromkeys(rng.choices(topics, weights, k=rng.randint(1, 4)))
+        for topic in day_topics:
+            chunk.append(f"## {topic}\n")
+            chunk.append("".join(_generate_note(rng)))
+        days.append("\n".join(chunk))
+    return "\n".join(reversed(days))
+
+
+def _generate_note(rng: random.Random) -> List[str]:
+    note = []
+    for _ in range(rng.randint(1, 8)):
+        note.append(f"- {' '.join(rng.choices(WORDS, k=rng.randint(4, 16)))}\n")
+        if rng.random() < 0.2:
+            note.append(f"  {' '.join(rng.choices(WORDS, k=rng.randint(4, 16)))}\n")
+    if rng.random() < 0.1:
+        note.append("```python\n# comment\n\nprint('## not a topic')\n```\n")
+    return note
@@ -0,0 +1,226 @@
+"""Time the hot paths of the journal and of the commands, and compare the times
+with the baseline stored in `benchmarks/baseline.json`.
+
+Each benchmark runs on its own copy of a seeded journal written by
+`generate_years`, with its own cache directory. A fast benchmark is run several
+times in a row, so that each sample takes at least `MIN_SAMPLE_TIME`, and its
+time is the best of `REPEATS` samples, the setup excluded. The suite exits with
+an error if a time is more than `--tolerance` slower than its baseline.
+
+The times depend on the machine: store a baseline before changing the code, and
+compare with it on the same machine.
+
+Run with `python -m benchmarks.suite`, and with `--save` to store the times as
+the new baseline."""
+import argparse
+import json
+import math
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+from unittest import mock
+
+from click.testing import CliRunner
+
+from jrnlmd import jrnlmd
+from jrnlmd.journal import Journal
+from jrnlmd.journal_entry import JournalEntry
+
+from .journal_generator import generate_years
+
+BASELINE_FILE = Path(__file__).with_name("baseline.json")
+YEARS = 10
+SEED = 0
+REPEATS = 7
+MIN_SAMPLE_TIME = 0.02
+# The most used topic, as the generator ranks the topics by usage
+TOPIC = "topic0"
+
+# Each benchmark prepares a journal file and returns the function to time
+Benchmark = Callable[[Path], Callable[[], Any]]
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str) -> Callable[[Benchmark], Benchmark]:
+    def register(function: Benchmark) -> Benchmark:
+        BENCHMARKS[name] = function
+        return function
+
+    return register
+
+
+@benchmark("load")
+def load(journal_file: Path) -> Callable[[], Any]:
+    return lambda: Journal(journal_file)
+
+
+@benchmark("load lazy")
+def load_lazy(journal_file: Path) -> Callable[[], Any]:
+    return lambda: Journal(journal_file, lazy=True)
+
+
+@benchmark("load cached")
+def load_cached(journal_file: Path) -> Callable[[], Any]:
+    Journal(journal_file, lazy=True, use_cache=True)
+    return lambda: Journal(journal_file, lazy=True, use_cache=True)
+
+
+@benchmark("to_md")
+def to_md(journal_file: Path) -> Callable[[], Any]:
+    journal = Journal(journal_file)
+    return journal.to_md
+
+
+@benchmark("on")
+def on(journal_file: Path) -> Callable[[], Any]:
+    journal = Journal(journal_file, lazy=True)
+    date = journal.dates()[len(journal.dates()) // 2]
+    return lambda: journal.on(date).to_md()
+
+
+@benchmark("since")
+def since(journal_file: Path) -> Callable[[], Any]:
+    journal = Journal(journal_file, lazy=True)
+    date = journal.dates()[-365]
+    return lambda: journal.since(date).to_md()
+
+
+@benchmark("about")
+def about(journal_file: Path) -> Callable[[], Any]:
+    journal = Journal(journal_file, lazy=True)
+    return lambda: journal.about(TOPIC).to_md()
+
+
+@benchmark("topics")
+def topics(journal_file: Path) -> Callable[[], Any]:
+    journal = Journal(journal_file, lazy=True)
+    return lambda: (journal.topics(), journal.topic_counts())
+
+
+@benchmark("add and save")
+def add_and_save(journal_file: Path) -> Callable[[], Any]:
+    journal = Journal(journal_file, lazy=True)
+    date = journal.dates()[len(journal.dates()) // 2]
+
+    def run():
+        journal.add(JournalEntry("- a note", date, TOPIC))
+        journal.save()
+
+    return run
+
+
+@benchmark("delete and save")
+def delete_and_save(journal_file: Path) -> Callable[[], Any]:
+    journal = Journal(journal_file, lazy=True)
+    # A different date for each run, in the middle of the journal
+    dates = iter(journal.dates()[len(journal.dates()) // 2 :])
+
+    def run():
+        journal.delete(next(dates))
+        journal.save()
+
+    return run
+
+
+def command(*args: str) -> Benchmark:
+    """Return a benchmark of a command line run with the `CliRunner`."""
+
+    def prepare(journal_file: Path) -> Callable[[], Any]:
+        runner = CliRunner()
+        command_line = ["-j", str(journal_file), *args]
+
+        def run():
+            with mock.patch("jrnlmd.jrnlmd.print_with_external"):
+                result = runner.invoke(jrnlmd.cli, command_line)
+            assert result.exit_code == 0, result.output
+
+        # The first run builds the cache, as it does for the user
+        run()
+        return run
+
+    return prepare
+
+
+for name, args in [
+    ("cli cat", ["cat"]),
+    ("cli cat topic", ["cat", TOPIC]),
+    ("cli cat since", ["cat", "since 2021-01-01:"]),
+    ("cli add", ["add", f"2020-06-01: {TOPIC} . a note"]),
+    ("cli search", ["search", "lorem dolor"]),
+    ("cli top", ["top", "--counts"]),
+]:
+    benchmark(name)(command(*args))
+
+
+def run_benchmarks(names: List[str], journal_text: str) -> Iterator[Tuple[str, float]]:
+    """Yield the name and the best time of each benchmark."""
+    for name in names:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            journal_file = Path(tmp_dir) / "journal.md"
+            journal_file.write_text(journal_text)
+            cache_dir = Path(tmp_dir) / "cache"
+            with mock.patch("jrnlmd.config.DEFAULT_CACHE_DIR", str(cache_dir)):
+                function = BENCHMARKS[name](journal_file)
+                number = max(1, math.ceil(MIN_SAMPLE_TIME / time_runs(function, 1)))
+                best = min(time_runs(function, number) for _ in range(REPEATS))
+        yield name, best / number
+
+
+def time_runs(function: Callable[[], Any], number: int) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        function()
+    return time.perf_counter() - start
+
+
+def main(args: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.partition("\n\n")[0])
+    parser.add_argument("-k", default="", help="Run the benchmarks matching K.")
+    parser.add_argument(
+        "--save", action="store_true", help="Store the times as the baseline."
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.5,
+        help="The slowdown reported as a regression (default: 0.5).",
+    )
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE)
+    options = parser.parse_args(args)
+    try:
+        baseline = json.loads(options.baseline.read_text())
+    except FileNotFoundError:
+        baseline = {"years": YEARS, "seed": SEED, "times": {}}
+    journal_text = generate_years(YEARS, SEED)
+    names = [name for name in BENCHMARKS if options.k in name]
+    print(f"{YEARS} years journal, {len(journal_text) / 2**20:.1f} MB")
+    regressions = []
+    times = {}
+    for name, elapsed in run_benchmarks(names, journal_text):
+        times[name] = elapsed
+        line = f"{name:>16}: {elapsed * 1000:9.2f} ms"
+        baseline_time = baseline["times"].get(name)
+        if baseline_time:
+            ratio = elapsed / baseline_time
+            line += f"  {ratio:5.2f}x baseline"
+            if ratio > 1 + options.tolerance:
+                line += "  REGRESSION"
+                regressions.append(name)
+        print(line, flush=True)
+    if options.save:
+        baseline = {
+            "years": YEARS,
+            "seed": SEED,
+            "python": sys.version.split()[0],
+            "times": {**baseline["times"], **times},
+        }
+        options.baseline.write_text(json.dumps(baseline, indent=2) + "\n")
+        print(f"Baseline saved to {options.baseline}.")
+    elif regressions:
+        sys.exit(f"{len(regressions)} regressions: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,3 +10,15 @@ class AliasedGroup(click.Group):
             ctx.ensure_object(dict)
             ctx.obj["PRE-TEXT"] = cmd_name
             return click.Group.get_command(self, ctx, "add")
+
+
+class MultipleOption(click.Option):
+    """An option that can be repeated, and set to a single value in the config file."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, multiple=True, **kwargs)
+
+    def type_cast_value(self, ctx, value):
+        if isinstance(value, str):
+            value = (value,)
+        return super().type_cast_value(ctx, value)
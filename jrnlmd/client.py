@@ -0,0 +1,62 @@
+"""Thin client forwarding the command line to the jrnlmd server.
+
+Only the standard library and appdirs, for the cache directory, are imported, so
+that a command answered by the server does not pay for importing click, dateparser
+or GitPython. When the server is not running, the command is run locally."""
+import json
+import os
+import socket
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from . import config, ioutils
+
+
+def socket_path() -> Path:
+    """Return the socket of the server, which can be set with JRNLMD_SOCKET."""
+    return Path(
+        os.environ.get("JRNLMD_SOCKET", Path(config.DEFAULT_CACHE_DIR) / "jrnlmd.sock")
+    )
+
+
+def send_command(
+    args: List[str], path: Optional[Path] = None
+) -> Optional[Dict[str, Any]]:
+    """Run a command on the server.
+
+    Returns
+    -------
+    dict or None
+        The response of the server, or None if the server is not running.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(str(path or socket_path()))
+        except OSError:
+            return None
+        request = {"args": args, "cwd": os.getcwd()}
+        client.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        with client.makefile("rb") as f:
+            response = f.readline()
+    if not response:
+        raise ConnectionError("The jrnlmd server closed the connection.")
+    return json.loads(response)
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    if args is None:
+        args = sys.argv[1:]
+    response = send_command(args)
+    if response is None or response.get("fallback"):
+        from .jrnlmd import cli
+
+        cli(args, prog_name="jrnlmd")
+        return
+    ioutils.EXTERNAL_COMMAND = response["external_command"]
+    ioutils.replay_output(response["output"])
+    sys.exit(response["exit_code"])
+
+
+if __name__ == "__main__":
+    main()
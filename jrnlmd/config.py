@@ -3,3 +3,4 @@ from pathlib import PurePath
 import appdirs
 
 DEFAULT_CONFIG_FILE = str(PurePath(appdirs.user_config_dir()) / "jrnlmdrc")
+DEFAULT_CACHE_DIR = str(PurePath(appdirs.user_cache_dir("jrnlmd")))
@@ -0,0 +1,208 @@
+"""Commit and push a journal in a background process.
+
+The commits and pushes requested by the commands are queued in a state file in
+the user cache directory, and a detached worker process runs them. The worker
+waits `COALESCE_DELAY` seconds before running the queue, so that the entries added
+in quick succession are committed and pushed once."""
+import contextlib
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import IO, Iterator, List, NamedTuple, Optional, Sequence
+
+from . import config
+from .ioutils import atomic_write
+from .journal_cache import cache_file_path
+
+COALESCE_DELAY = 2.0
+# Seconds to wait before retrying a failed sync, the worker gives up after the last
+RETRY_DELAYS = (5.0, 30.0, 120.0)
+
+
+class SyncState(NamedTuple):
+    """The commits and push waiting to be run, and the error of the last attempt."""
+
+    messages: List[str]
+    remote: Optional[str]
+    error: Optional[str] = None
+    attempts: int = 0
+
+    def is_pending(self) -> bool:
+        return bool(self.messages) or self.remote is not None
+
+
+class GitSyncQueue:
+    """The queue of the commits and pushes of a journal, run by a background worker."""
+
+    def __init__(self, journal_path: Path, cache_dir: Optional[Path] = None):
+        self.journal_path = journal_path
+        self.cache_dir = Path(cache_dir or config.DEFAULT_CACHE_DIR)
+        self.state_path = cache_file_path(journal_path, ".sync.json", self.cache_dir)
+        self._lock_path = cache_file_path(journal_path, ".sync.lock", self.cache_dir)
+        self._worker_lock_path = cache_file_path(
+            journal_path, ".sync.worker", self.cache_dir
+        )
+
+    def status(self) -> SyncState:
+        with self._locked():
+            return self._read_state()
+
+    def is_running(self) -> bool:
+        """Return True if a worker is running the queue."""
+        worker_lock = _lock(self._worker_lock_path, blocking=False)
+        _unlock(worker_lock)
+        return worker_lock is None
+
+    def add(self, message: str, remote: Optional[str] = None) -> None:
+        """Queue a commit, and a push to `remote`, and start the worker if needed."""
+        with self._locked():
+            state = self._read_state()
+            state = state._replace(
+                messages=state.messages + [message], remote=remote or state.remote
+            )
+            self._write_state(state)
+            worker_lock = _lock(self._worker_lock_path, blocking=False)
+            if worker_lock is None:
+                # The running worker will find the new commit
+                return
+            _unlock(worker_lock)
+            self._start_worker()
+
+    def run_worker(
+        self,
+        delay: float = COALESCE_DELAY,
+        retry_delays: Sequence[float] = RETRY_DELAYS,
+    ) -> None:
+        """Run the queue until it is empty, unless another worker is running.
+
+        A failed sync is retried after each of the `retry_delays`, then the worker
+        stops and the sync is retried when another commit is queued."""
+        worker_lock = _lock(self._worker_lock_path, blocking=False)
+        if worker_lock is None:
+            return
+        failures = 0
+        try:
+            time.sleep(delay)
+            while True:
+                with self._locked():
+                    state = self._read_state()
+                    if not state.is_pending() or failures > len(retry_delays):
+                        # Released with the queue lock held, so that a commit
+                        # queued from now on starts a new worker
+                        _unlock(worker_lock)
+                        return
+                if failures:
+                    time.sleep(retry_delays[failures - 1])
+                if self._sync(state):
+                    failures = 0
+                    time.sleep(delay)
+                else:
+                    failures += 1
+        finally:
+            _unlock(worker_lock)
+
+    def _sync(self, state: SyncState) -> bool:
+        """Commit the queued messages and push, then update the queue.
+
+        Returns
+        -------
+        bool
+            False if the commit or the push failed.
+        """
+        committed = pushed = False
+        error = None
+        try:
+            # GitPython is slow to import, so it is imported only when needed
+            from .version_control import JournalGitVersionControl
+
+            vc = JournalGitVersionControl(self.journal_path)
+            if state.messages:
+                if not vc.commit("\n".join(dict.fromkeys(state.messages))):
+                    raise RuntimeError(
+                        f"{self.journal_path} is not in a git repository."
+                    )
+                committed = True
+            if state.remote is not None:
+                if not vc.push(state.remote):
+                    raise RuntimeError(f"remote repository {state.remote} not found.")
+                pushed = True
+        except Exception as e:
+            error = str(e).strip() or type(e).__name__
+        with self._locked():
+            new_state = self._read_state()
+            messages = new_state.messages
+            if committed:
+                messages = messages[len(state.messages) :]
+            remote = new_state.remote
+            if pushed and remote == state.remote:
+                remote = None
+            attempts = new_state.attempts + 1 if error else 0
+            self._write_state(SyncState(messages, remote, error, attempts))
+        return error is None
+
+    def _start_worker(self) -> None:
+        subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "jrnlmd.git_sync",
+                str(self.journal_path.resolve()),
+                str(self.cache_dir),
+            ],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+
+    def _read_state(self) -> SyncState:
+        try:
+            state = json.loads(self.state_path.read_text())
+        except (OSError, ValueError):
+            return SyncState([], None)
+        return SyncState(
+            state["messages"], state["remote"], state["error"], state["attempts"]
+        )
+
+    def _write_state(self, state: SyncState) -> None:
+        with atomic_write(self.state_path, fsync=False) as f:
+            f.write(json.dumps(state._asdict()).encode())
+
+    @contextlib.contextmanager
+    def _locked(self) -> Iterator[None]:
+        lock = _lock(self._lock_path)
+        try:
+            yield
+        finally:
+            _unlock(lock)
+
+
+def _lock(lock_path: Path, blocking: bool = True) -> Optional[IO[str]]:
+    """Lock a file, return None if it is locked and `blocking` is False."""
+    import fcntl
+
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    f = lock_path.open("a")
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+    except BlockingIOError:
+        f.close()
+        return None
+    return f
+
+
+def _unlock(f: Optional[IO[str]]) -> None:
+    """Unlock a file locked by `_lock`, if it is not already unlocked."""
+    if f is not None and not f.closed:
+        f.close()
+
+
+def main(args: List[str]) -> None:
+    journal_path, cache_dir = args
+    GitSyncQueue(Path(journal_path), Path(cache_dir)).run_worker()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
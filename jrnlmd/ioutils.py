@@ -1,18 +1,213 @@
+import contextlib
+import functools
+import io
 import os
+import stat
 import subprocess
-import tempfile
+import sys
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Tuple, Union
 
+from . import profiling
+
+# The command that prints markdown on a terminal, set by the --external-command
+# option
 EXTERNAL_COMMAND = "bat -l markdown --pager=never --style=plain"
 
+_DATE = "\033[1;35m"
+_TOPIC = "\033[1;34m"
+_BULLET = "\033[33m"
+_CODE = "\033[32m"
+_RESET = "\033[0m"
+
+# The output of the running command, when it is collected instead of printed
+_captured_output: Optional[List[Tuple[str, str]]] = None
+
+
+class InteractiveInputRequired(Exception):
+    """Raised when the editor is needed while the output is being collected."""
+
+
+class _CapturedStream(io.TextIOBase):
+    def __init__(self, stream: str):
+        self.stream = stream
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        if not isinstance(text, str):
+            raise TypeError("only text can be written to the captured output")
+        if _captured_output is not None:
+            _captured_output.append((self.stream, text))
+        return len(text)
+
+
+def print_with_external(text: Union[str, Iterable[str]]) -> None:
+    """Print a text, or the chunks of a text, highlighted as markdown.
+
+    On a terminal, the text is highlighted by `EXTERNAL_COMMAND`, or by
+    `highlight_markdown` if the command is not set or not installed. Otherwise, or
+    if the NO_COLOR environment variable is set, it is printed as it is. The chunks
+    are written as soon as they are produced, so that the beginning of a long text
+    is shown before the end is rendered."""
+    chunks = [text] if isinstance(text, str) else text
+    if profiling.ENABLED:
+        chunks = profiling.timed_iter("render", chunks)
+    if _captured_output is not None:
+        _captured_output.append(("external", "".join(chunks)))
+        return
+    if not sys.stdout.isatty() or "NO_COLOR" in os.environ:
+        with profiling.phase("print"):
+            sys.stdout.writelines(chunks)
+        return
+    command = _find_command(EXTERNAL_COMMAND)
+    if command is None:
+        with profiling.phase("print"):
+            sys.stdout.writelines(highlight_markdown(chunks))
+        return
+    sys.stdout.flush()
+    with profiling.phase("pager"):
+        process = subprocess.Popen(command, stdin=subprocess.PIPE, encoding="utf-8")
+        try:
+            for chunk in chunks:
+                process.stdin.write(chunk)  # type: ignore
+            process.stdin.close()  # type: ignore
+        except BrokenPipeError:
+            # The external command exited without reading the whole text
+            with contextlib.suppress(BrokenPipeError):
+                process.stdin.close()  # type: ignore
+        process.wait()
+
+
+@functools.lru_cache(maxsize=None)
+def _find_command(command: str) -> Optional[List[str]]:
+    """Return the arguments of the command, or None if it is not installed."""
+    import shlex
+    import shutil
+
+    args = shlex.split(command)
+    if not args:
+        return None
+    executable = shutil.which(args[0])
+    if executable is None:
+        return None
+    return [executable] + args[1:]
+
+
+def highlight_markdown(chunks: Iterable[str]) -> Iterator[str]:
+    """Highlight the dates, topics and bullets of the chunks of a journal.
+
+    The chunks are highlighted line by line, and a line split across chunks is
+    highlighted when it is complete."""
+    code_fence = False
+    partial_line = ""
+    for chunk in chunks:
+        lines = (partial_line + chunk).split("\n")
+        partial_line = lines.pop()
+        highlighted_lines = []
+        for line in lines:
+            highlighted_line, code_fence = _highlight_line(line, code_fence)
+            highlighted_lines.append(highlighted_line + "\n")
+        yield "".join(highlighted_lines)
+    if partial_line:
+        yield _highlight_line(partial_line, code_fence)[0]
 
-def print_with_external(text: str) -> None:
+
+def _highlight_line(line: str, code_fence: bool) -> Tuple[str, bool]:
+    """Return the highlighted line, and whether the next line is code."""
+    if line.startswith("```") or line.startswith("~~~"):
+        return f"{_CODE}{line}{_RESET}", not code_fence
+    if code_fence:
+        return f"{_CODE}{line}{_RESET}", code_fence
+    if line.startswith("## "):
+        return f"{_TOPIC}{line}{_RESET}", code_fence
+    if line.startswith("# "):
+        return f"{_DATE}{line}{_RESET}", code_fence
+    if line.startswith("- "):
+        return f"{_BULLET}-{_RESET}{line[1:]}", code_fence
+    return line, code_fence
+
+
+def replay_output(output: List[Tuple[str, str]]) -> None:
+    """Print the output collected by `capture_output`."""
+    for stream, text in output:
+        if stream == "external":
+            print_with_external(text)
+        else:
+            getattr(sys, stream).write(text)
+
+
+@contextlib.contextmanager
+def capture_output() -> Iterator[List[Tuple[str, str]]]:
+    """Collect what is printed, as a list of (stream, text) pairs.
+
+    The stream is "stdout", "stderr" or "external" for the text passed to
+    `print_with_external`. The editor cannot be opened while the output is
+    collected."""
+    global _captured_output
+    _captured_output = []
+    try:
+        with contextlib.redirect_stdout(
+            _CapturedStream("stdout")  # type: ignore
+        ), contextlib.redirect_stderr(
+            _CapturedStream("stderr")  # type: ignore
+        ):
+            yield _captured_output
+    finally:
+        _captured_output = None
+
+
+@contextlib.contextmanager
+def atomic_write(file_path: Path, fsync: bool = True) -> Iterator[BinaryIO]:
+    """Open a temporary file that replaces `file_path` once it is written.
+
+    The file is either fully replaced or left untouched, even if the program
+    crashes while writing. With `fsync`, the new file is on disk when the context
+    exits. The permissions of the replaced file are kept, and so is a symbolic link
+    to it: the file it points to is replaced."""
+    import tempfile
+
+    file_path = file_path.resolve()
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    f = tempfile.NamedTemporaryFile(
+        dir=file_path.parent, prefix=f".{file_path.name}.", suffix=".tmp", delete=False
+    )
+    try:
+        with f:
+            yield f  # type: ignore
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+        os.chmod(f.name, _file_mode(file_path))
+        os.replace(f.name, file_path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(f.name)
+        raise
+    if fsync:
+        dir_fd = os.open(file_path.parent, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def _file_mode(file_path: Path) -> int:
     try:
-        subprocess.run(EXTERNAL_COMMAND.split(), input=text, encoding="utf-8")
-    except Exception:
-        print(text)
+        return stat.S_IMODE(file_path.stat().st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
 
 
 def input_from_editor():
+    if _captured_output is not None:
+        raise InteractiveInputRequired()
+
+    import tempfile
+
     editor = os.environ.get("EDITOR", "vim")
     with tempfile.NamedTemporaryFile(suffix=".tmp") as tf:
         subprocess.call([editor, tf.name])
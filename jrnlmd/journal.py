@@ -1,15 +1,76 @@
+import contextlib
+from bisect import bisect_left, bisect_right, insort
 from collections import defaultdict
+from itertools import accumulate, islice, zip_longest
 from pathlib import Path
-from typing import Set, Union
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
+from . import profiling
+from .ioutils import atomic_write
+from .journal_cache import JournalCache, data_digest, file_digest
 from .journal_entry import JournalEntry
-from .usertypes import JDict, JDictDDateDTopic, JournalDict
+from .journal_index import (
+    Buffer,
+    SectionIndex,
+    has_md_layout,
+    index_journal,
+    index_range,
+    map_journal,
+    read_notes,
+)
+from .journal_lock import JournalLock
+from .journal_view import JournalView
+from .note_store import NoteStore
+from .search_index import SearchIndex, SearchIndexCache, matches, parse_query
+from .topic_index import TopicIndex
+from .usertypes import JDict
+
+# Unpickling all the cached notes is faster than reading more than this fraction of
+# the dates from the journal file
+CACHED_NOTES_MIN_FRACTION = 0.25
 
 
 class Journal:
-    def __init__(self, journal_path: Path = None):
+    def __init__(
+        self, journal_path: Path = None, lazy: bool = False, use_cache: bool = False
+    ):
+        """Create a journal, loading it from `journal_path` if the file exists.
+
+        A lazy journal only indexes the headings of the file when it is loaded, and
+        reads the notes of a date when they are first needed.
+
+        With `use_cache`, the parsed journal is stored in a persistent cache, which
+        is used instead of the file until the file changes."""
         self.file_path = journal_path
-        self._j: JDictDDateDTopic = self._empty_dict()
+        self.lazy = lazy
+        self.use_cache = use_cache
+        self._j = NoteStore()
+        # Sorted dates of the journal, including the ones not loaded yet
+        self._dates: List[str] = []
+        self._topic_index = TopicIndex()
+        self._unloaded: SectionIndex = {}
+        # Byte range of each date of the file, if the file can be updated in place
+        self._day_ranges: Optional[Dict[str, Tuple[int, int]]] = None
+        self._dirty_days: Set[str] = set()
+        self._file_stat: Tuple[int, int] = (0, 0)
+        # Digest of the file when it was loaded or saved, if it is known
+        self._digest: Optional[str] = None
+        # Number of saves of the file counted by the journal lock, when it was loaded
+        self._generation = 0
+        # Changes since the journal was loaded or saved, redone if another process
+        # modifies the file in the meantime
+        self._changes: List[Tuple[str, JournalEntry]] = []
+        # The notes are in the cache and have not been unpickled yet
+        self._cached_notes_pending = False
         if journal_path is not None:
             try:
                 self.load()
@@ -21,12 +82,26 @@ class Journal:
     def from_dict(cls, dictionary: JDict):
         journal = cls()
         for date, v in dictionary.items():
-            journal._j[date] = defaultdict(str, v)
+            journal._j.set_day(date, v)
+        journal._dates = sorted(journal._j)
+        journal._topic_index = TopicIndex(
+            (date, topic) for date, topics in journal._j.items() for topic in topics
+        )
         return journal
 
+    @classmethod
+    def concat(cls, journals: Iterable[Union["Journal", JournalView]]) -> "Journal":
+        """Return a journal with the dates of journals that have no date in common."""
+        dictionary: JDict = {}
+        for journal in journals:
+            dictionary.update(journal.to_dict())
+        return cls.from_dict(dictionary)
+
     @classmethod
     def from_md(cls, text: str) -> "Journal":
         journal = cls()
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
         journal._from_md(text)
         return journal
 
@@ -38,19 +113,81 @@ class Journal:
     def journal_file(self, file_path: Union[str, Path]):
         self.file_path = Path(file_path)
 
-    def load(self) -> None:
+    @property
+    def _path(self) -> Path:
+        """The journal file, which must have been set to load or save the journal."""
         if self.file_path is None:
             raise RuntimeError("The journal file name has not been set.")
-        if not self.file_path.is_file():
+        return self.file_path
+
+    def load(self, save_cache: bool = True) -> None:
+        """Read the journal file, or the cache of it when `use_cache` is set.
+
+        A cache that is missing or stale is stored again while holding the journal
+        lock, unless `save_cache` is False, as it must be when the lock is held."""
+        # Read before the file, so that a concurrent save is noticed by `save`
+        self._generation = JournalLock(self._path).generation()
+        self._j = NoteStore()
+        self._dates = []
+        self._topic_index = TopicIndex()
+        self._unloaded = {}
+        self._day_ranges = None
+        self._dirty_days = set()
+        self._changes = []
+        self._file_stat = (0, 0)
+        self._digest = None
+        self._cached_notes_pending = False
+        if not self._path.is_file():
             raise FileNotFoundError()
-        text = self.file_path.read_text()
-        self._from_md(text)
+        with profiling.phase("load"):
+            if self.use_cache and self._load_cache_header():
+                return
+            self._file_stat = self._stat_file()
+            if self.lazy:
+                index = index_journal(self._path)
+                self._unloaded = index.sections
+                self._dates = sorted(index.sections)
+                self._topic_index = TopicIndex(
+                    (section.date, section.topic)
+                    for sections in index.sections.values()
+                    for section in sections
+                )
+                self._day_ranges = self._in_place_day_ranges(index.days, index.size)
+                if self._day_ranges and not has_md_layout(self._path, index):
+                    self._day_ranges = None
+            else:
+                self._from_md(self._path.read_text())
+            if self.use_cache and save_cache:
+                self._save_cache_if_unchanged()
 
     def save(self) -> None:
-        if self.file_path is None:
-            raise RuntimeError("The journal file name has not been set.")
-        text = self.to_md()
-        self.file_path.write_text(text)
+        """Write the journal to its file.
+
+        The file is replaced atomically while holding the journal lock. If another
+        process modified the file since the journal was loaded, the file is loaded
+        again and the changes made since then are applied to it."""
+        with profiling.phase("save"), JournalLock(self._path) as lock:
+            if self.changed_on_disk():
+                self._reload_with_changes()
+            loaded_file_stat = self._file_stat
+            loaded_digest = self._digest
+            if not self._save_in_place():
+                self._save_full()
+            self._generation = lock.increment()
+            if self.use_cache:
+                self._save_cache(loaded_digest)
+                self._update_search_index(loaded_file_stat)
+        self._dirty_days = set()
+        self._changes = []
+
+    def changed_on_disk(self) -> bool:
+        """Return True if the file was modified since it was loaded or saved."""
+        if JournalLock(self._path).generation() != self._generation:
+            return True
+        try:
+            return self._stat_file() != self._file_stat
+        except FileNotFoundError:
+            return self._file_stat != (0, 0)
 
     def to_md(
         self,
@@ -58,91 +195,656 @@ class Journal:
         simplified: bool = False,
         compact: bool = False,
     ) -> str:
-        simplify = False
-        if simplified:
-            keys: Set[str] = set()
-            for v in self._j.values():
-                keys.update(v.keys())
-            simplify = len(keys) == 1
-        date_marker = "##" if simplify else "#"
-        maybe_blank_line = "" if compact else "\n"
-        output = []
-        if simplify:
-            topic = f"# {keys.pop()}{maybe_blank_line}"
-            output.append(topic)
-        for day in sorted(self._j, reverse=date_descending):
-            output.append(f"{date_marker} {day}{maybe_blank_line}")
-            for topic in self._j[day]:
-                if not simplify:
-                    output.append(f"## {topic}{maybe_blank_line}")
-                note = self._j[day][topic]
-                output.append(note)
-        return "\n".join(output)
-
-    def on(self, date: str) -> JournalDict:
-        """Return a filtered journal on the given date."""
-        return Journal.from_dict({k: v for k, v in self._j.items() if k == date})
+        self._load_days()
+        return "".join(self.iter_md(date_descending, simplified, compact))
+
+    def iter_md(
+        self,
+        date_descending: bool = True,
+        simplified: bool = False,
+        compact: bool = False,
+    ) -> Iterator[str]:
+        """Render the journal as `to_md` does, one date at a time.
+
+        The dates that are not loaded yet are read from the file while rendering,
+        and are not kept in memory."""
+        self._reload_if_changed()
+        topics = self._topic_index.topics()
+        single_topic = topics[0] if simplified and len(topics) == 1 else None
+        return self._iter_days_md(
+            self._dates, None, date_descending, compact, single_topic
+        )
 
-    def since(self, date: str) -> JournalDict:
+    def on(self, date: str) -> JournalView:
         """Return a filtered journal on the given date."""
-        return Journal.from_dict({k: v for k, v in self._j.items() if k >= date})
+        return JournalView(self).on(date)
+
+    def since(self, date: str) -> JournalView:
+        """Return a filtered journal since the given date, included."""
+        return JournalView(self).since(date)
+
+    def until(self, date: str) -> JournalView:
+        """Return a filtered journal until the given date, included."""
+        return JournalView(self).until(date)
 
-    def about(self, topic: str) -> JournalDict:
+    def between(self, start: str, end: str) -> JournalView:
+        """Return a filtered journal between the given dates, included."""
+        return JournalView(self).between(start, end)
+
+    def last(self, n_days: int) -> JournalView:
+        """Return a filtered journal on the last `n_days` days, today included."""
+        return JournalView(self).last(n_days)
+
+    def about(self, topic: str) -> JournalView:
         """Return a filtered journal about the given topic.
 
         The topic can be a partial match."""
-        return Journal.from_dict(
-            {
-                k: {kk: vv for kk, vv in v.items() if topic in kk}
-                for k, v in self._j.items()
-                if any(topic in kkk for kkk in v.keys())
-            }
-        )
+        return JournalView(self).about(topic)
+
+    def search(self, query: str) -> "Journal":
+        """Return a filtered journal with the notes that match the query.
+
+        Words are combined with AND, the OR keyword separates alternatives and a
+        text between double quotes is a phrase. Matching ignores case and
+        punctuation."""
+        with profiling.phase("search"):
+            parsed_query = parse_query(query)
+            sections = self._search_index().search(parsed_query)
+            self._load_days(sorted({date for date, _ in sections}))
+            found: Dict[str, Dict[str, str]] = defaultdict(dict)
+            for date, topic in sections:
+                note = self._j.note(date, topic)
+                if note is not None and matches(parsed_query, note):
+                    found[date][topic] = note
+            return Journal.from_dict(found)
 
     def add(self, entry: JournalEntry) -> None:
-        self._j[entry.date][entry.topic] += entry.note
+        self._load_days([entry.date])
+        self._mark_dirty(entry.date)
+        if entry.date not in self._j:
+            insort(self._dates, entry.date)
+        self._topic_index.add(entry.topic, entry.date)
+        self._j.append(entry.date, entry.topic, entry.note)
+        self._changes.append(("add", entry))
 
-    def delete(self, date: str, topic: str = None) -> "Journal":
+    def delete(self, date: str, topic: Optional[str] = None) -> "Journal":
+        self._load_days([date])
         if date not in self._j:
             raise KeyError(f"{date} missing from journal.")
+        notes = self._j[date]
         if topic:
-            if topic not in self._j[date]:
+            if topic not in notes:
                 raise KeyError(f"{topic} missing on {date} entry.")
             topic_to_delete = [topic]
         else:
-            topic_to_delete = list(self._j[date].keys())
+            topic_to_delete = list(notes.keys())
+        self._mark_dirty(date)
         deleted_entries = Journal()
         for tpc in topic_to_delete:
-            deleted_entries.add(JournalEntry(self._j[date][tpc], date, tpc))
-            del self._j[date][tpc]
-        if not self._j[date]:
-            del self._j[date]
+            deleted_entries.add(JournalEntry(notes[tpc], date, tpc))
+            self._j.delete(date, tpc)
+            self._topic_index.remove(tpc, date)
+            self._changes.append(("delete", JournalEntry("", date, tpc)))
+        if date not in self._j:
+            del self._dates[bisect_left(self._dates, date)]
         return deleted_entries
 
-    def topics(self):
-        topics = set()
-        for date in self._j:
-            topics.update(set(self._j[date].keys()))
-        return sorted(list(topics))
-
-    def _empty_dict(self):
-        return defaultdict(lambda: defaultdict(str))
-
-    def _from_md(self, text: str):
-        self._j = self._empty_dict()
-        current_day = ""
-        current_topic = ""
-        code_fence = False
-        for line in text.splitlines():
-            if line.startswith("```") or line.startswith("~~~"):
-                code_fence = not code_fence
-            if line.startswith("##") and not code_fence:
-                current_topic = line.removeprefix("##").strip()
-            elif line.startswith("#") and not code_fence:
-                current_day = line.removeprefix("#").strip()
-            elif line:
-                if not (current_day and current_topic):
-                    raise ValueError("malformed journal")
-                self._j[current_day][current_topic] += f"{line}\n"
-            elif code_fence:
-                self._j[current_day][current_topic] += f"{line}\n"
+    def dates(self) -> List[str]:
+        return list(self._dates)
+
+    def to_dict(self) -> JDict:
+        """Return the notes of the journal, as accepted by `from_dict`."""
+        self._load_days()
+        return dict(self._j)
+
+    def topics(self) -> List[str]:
+        return list(self._topic_index.topics())
+
+    def topic_counts(self) -> List[Tuple[str, int]]:
+        """Return the topics and the number of dates they appear on, most used first."""
+        counts = [(topic, self._topic_index.count(topic)) for topic in self.topics()]
+        return sorted(counts, key=lambda topic_count: -topic_count[1])
+
+    def recent_topics(self) -> List[Tuple[str, str]]:
+        """Return the topics and the last date they appear on, most recent first."""
+        last_dates = [
+            (topic, date)
+            for topic in self.topics()
+            if (date := self._topic_index.last_date(topic)) is not None
+        ]
+        return sorted(last_dates, key=lambda topic_date: topic_date[1], reverse=True)
+
+    def _dates_between(self, start: Optional[str], end: Optional[str]) -> List[str]:
+        """Return the dates between `start` and `end`, included, in O(log n)."""
+        lo = 0 if start is None else bisect_left(self._dates, start)
+        hi = len(self._dates) if end is None else bisect_right(self._dates, end)
+        return self._dates[lo:hi]
+
+    def _iter_days_md(
+        self,
+        days: List[str],
+        topics: Optional[Set[str]],
+        date_descending: bool,
+        compact: bool,
+        single_topic: Optional[str],
+    ) -> Iterator[str]:
+        """Render the given dates, one date at a time.
+
+        Only the notes of `topics` are rendered, if they are given. If
+        `single_topic` is given, it is the title and the dates are its headings."""
+        self._load_cached_notes(days)
+        simplify = single_topic is not None
+        date_marker = "##" if simplify else "#"
+        maybe_blank_line = "" if compact else "\n"
+        separator = ""
+        if simplify:
+            yield f"# {single_topic}{maybe_blank_line}"
+            separator = "\n"
+        with contextlib.ExitStack() as stack:
+            buffer = (
+                stack.enter_context(map_journal(self._path))
+                if self._unloaded
+                else b""
+            )
+            for day in reversed(days) if date_descending else days:
+                if day in self._unloaded:
+                    sections = self._unloaded[day]
+                    if topics is not None:
+                        sections = [s for s in sections if s.topic in topics]
+                    notes = read_notes(buffer, sections)
+                else:
+                    notes = self._j[day]
+                    if topics is not None:
+                        notes = {t: n for t, n in notes.items() if t in topics}
+                lines = self._notes_to_md_lines(
+                    day, notes, date_marker, maybe_blank_line, simplify
+                )
+                yield separator + "\n".join(lines)
+                separator = "\n"
+
+    @staticmethod
+    def _notes_to_md_lines(
+        day: str,
+        notes: Dict[str, str],
+        date_marker: str,
+        maybe_blank_line: str,
+        simplify: bool,
+    ) -> List[str]:
+        output = [f"{date_marker} {day}{maybe_blank_line}"]
+        for topic, note in notes.items():
+            if not simplify:
+                output.append(f"## {topic}{maybe_blank_line}")
+            output.append(note)
+        return output
+
+    def _day_to_md(self, day: str) -> bytes:
+        """Return the block of a date as written by `to_md`."""
+        lines = self._notes_to_md_lines(day, self._j[day], "#", "\n", False)
+        return "\n".join(lines).encode()
+
+    def _stat_file(self) -> Tuple[int, int]:
+        stat = self._path.stat()
+        return stat.st_size, stat.st_mtime_ns
+
+    def _in_place_day_ranges(
+        self, days: List[Tuple[str, int]], size: int
+    ) -> Optional[Dict[str, Tuple[int, int]]]:
+        """Return the byte range of each date, if the file is laid out as `to_md`
+        writes it.
+
+        The dates must be in `to_md` order, the first one at the start of the file
+        and no empty line after the last one, so that the bytes copied by a save in
+        place are the ones a full save would write."""
+        if not days:
+            return {} if size == 0 else None
+        if days[0][1] != 0:
+            return None
+        if any(prev <= day for (prev, _), (day, _) in zip(days, days[1:])):
+            return None
+        with self._path.open("rb") as f:
+            f.seek(max(size - 2, 0))
+            if f.read(2) == b"\n\n":
+                return None
+        ends = [start for _, start in days[1:]] + [size]
+        return {day: (start, end) for (day, start), end in zip(days, ends)}
+
+    def _mark_dirty(self, day: str) -> None:
+        """Record that a date is about to change, before it is modified.
+
+        The date can be rewritten in place only if its block in the file is the
+        one `to_md` would write."""
+        if day in self._dirty_days:
+            return
+        self._dirty_days.add(day)
+        if self._day_ranges is None or day not in self._day_ranges:
+            return
+        start, end = self._day_ranges[day]
+        with self._path.open("rb") as f:
+            f.seek(start)
+            block = f.read(end - start)
+        if end != self._file_stat[0]:
+            block = block.removesuffix(b"\n")
+        if day not in self._j or block != self._day_to_md(day):
+            self._day_ranges = None
+
+    def _reload_if_changed(self) -> bool:
+        """Load the file again if it was modified while dates are still to be read
+        from it, as their byte ranges are then stale.
+
+        Return True if the file was loaded again."""
+        ranges_pending = self._cached_notes_pending and self._day_ranges is not None
+        if not (self._unloaded or ranges_pending) or not self.changed_on_disk():
+            return False
+        self._reload_with_changes()
+        return True
+
+    def _reload_with_changes(self) -> None:
+        """Load the file again and redo the changes made since the last load."""
+        changes = self._changes
+        try:
+            # The lock may be held, the cache is stored by the next save or load
+            self.load(save_cache=False)
+        except FileNotFoundError:
+            # The file has been deleted, the changes are redone on an empty journal
+            pass
+        for change, entry in changes:
+            if change == "add":
+                self.add(entry)
+            else:
+                # The notes may have been deleted by the other process as well
+                with contextlib.suppress(KeyError):
+                    self.delete(entry.date, entry.topic)
+
+    def _save_full(self) -> None:
+        """Write the whole journal as `to_md` renders it."""
+        self._load_days()
+        days = self._dates[::-1]
+        blocks = [self._day_to_md(day) for day in days]
+        data = b"\n".join(blocks)
+        with atomic_write(self._path) as f:
+            f.write(data)
+        self._file_stat = self._stat_file()
+        self._digest = data_digest([data])
+        starts = accumulate((len(block) + 1 for block in blocks[:-1]), initial=0)
+        self._day_ranges = self._in_place_day_ranges(
+            list(zip(days, starts)), self._file_stat[0]
+        )
+
+    def _save_in_place(self) -> bool:
+        """Render only the dates changed since the journal has been loaded.
+
+        The bytes of the other dates are copied from the file, so that their notes
+        are neither parsed nor rendered. A file written by `to_md` stays
+        byte-identical to the one a full save would write.
+
+        Returns
+        -------
+        bool
+            False if the file cannot be updated in place.
+        """
+        day_ranges = self._day_ranges
+        if day_ranges is None or not self._path.is_file():
+            return False
+        if self.changed_on_disk():
+            return False
+        if not self._dirty_days:
+            return True
+        size = self._file_stat[0]
+        blocks = self._blocks_in_file_order(day_ranges)
+        first = next(i for i, (day, _) in enumerate(blocks) if day in self._dirty_days)
+        write_at = next((start for _, start in blocks[first:] if start >= 0), size)
+        with self._path.open("rb") as f:
+            head = f.read(write_at)
+            tail = f.read()
+        new_blocks = []
+        for day, start in blocks[first:]:
+            if day not in self._dirty_days:
+                end = day_ranges[day][1]
+                block = tail[start - write_at : end - write_at]
+                if end != size:
+                    block = block.removesuffix(b"\n")
+                new_blocks.append((day, block))
+            elif day in self._j:
+                new_blocks.append((day, self._day_to_md(day)))
+        new_tail = b"\n".join(block for _, block in new_blocks)
+        if write_at == size:
+            # The last date of the file has no trailing separator
+            if write_at > 0 and new_tail:
+                new_tail = b"\n" + new_tail
+        elif write_at > 0 and not new_tail:
+            write_at -= 1
+        with atomic_write(self._path) as f:
+            f.write(head[:write_at])
+            f.write(new_tail)
+        self._update_day_ranges(day_ranges, blocks[:first], new_blocks, write_at)
+        self._file_stat = self._stat_file()
+        self._digest = data_digest([head[:write_at], new_tail])
+        return True
+
+    def _blocks_in_file_order(
+        self, day_ranges: Dict[str, Tuple[int, int]]
+    ) -> List[Tuple[str, int]]:
+        """Return the dates of the file merged with the new ones, in `to_md` order.
+
+        The start offset of a new date is -1."""
+        new_days = sorted(self._dirty_days.difference(day_ranges), reverse=True)
+        blocks = []
+        for day, (start, _) in day_ranges.items():
+            while new_days and new_days[0] > day:
+                blocks.append((new_days.pop(0), -1))
+            blocks.append((day, start))
+        blocks.extend((day, -1) for day in new_days)
+        return blocks
+
+    def _update_day_ranges(
+        self,
+        old_day_ranges: Dict[str, Tuple[int, int]],
+        unchanged: List[Tuple[str, int]],
+        new_blocks: List[Tuple[str, bytes]],
+        write_at: int,
+    ) -> None:
+        """Shift the offsets of the dates and sections after a save in place."""
+        day_ranges = {day: old_day_ranges[day] for day, _ in unchanged}
+        offset = write_at + (1 if unchanged and write_at == self._file_stat[0] else 0)
+        if unchanged:
+            # The separator after the last unchanged date may have been added or
+            # removed
+            last_day = unchanged[-1][0]
+            day_ranges[last_day] = (
+                day_ranges[last_day][0],
+                offset if new_blocks else write_at,
+            )
+        for day, block in new_blocks:
+            if day in self._unloaded:
+                shift = offset - old_day_ranges[day][0]
+                self._unloaded[day] = [
+                    section._replace(
+                        start=section.start + shift, end=section.end + shift
+                    )
+                    for section in self._unloaded[day]
+                ]
+            day_ranges[day] = (offset, offset + len(block) + 1)
+            offset += len(block) + 1
+        if new_blocks:
+            last_day = new_blocks[-1][0]
+            day_ranges[last_day] = (day_ranges[last_day][0], offset - 1)
+        self._day_ranges = day_ranges
+
+    def _load_cache_header(self) -> bool:
+        """Load the journal from the cache, if the cache is valid.
+
+        The notes are unpickled immediately only for a journal that is not lazy."""
+        header = JournalCache(self._path).load_header()
+        if header is None:
+            return False
+        self._j = NoteStore()
+        self._file_stat = (header.size, header.mtime_ns)
+        self._digest = header.digest
+        self._dates = header.dates
+        self._topic_index = TopicIndex(header.date_topics)
+        self._day_ranges = header.day_ranges
+        self._cached_notes_pending = True
+        if not self.lazy:
+            self._load_cached_notes()
+        return True
+
+    def _load_cached_notes(self, days: Optional[List[str]] = None) -> None:
+        """Load the notes stored in the cache, before reading the given dates.
+
+        If the byte ranges of the dates in the file are known, the notes are
+        unpickled only if reading the dates from the file would be slower. The dates
+        are then indexed from their byte range, and read by `_load_days`. All the
+        notes are unpickled if `days` is None."""
+        if not self._cached_notes_pending:
+            return
+        if (
+            days is not None
+            and self._day_ranges is not None
+            and len(days) < len(self._dates) * CACHED_NOTES_MIN_FRACTION
+            and self._index_days(days, self._day_ranges)
+        ):
+            return
+        self._cached_notes_pending = False
+        # The dates read from the file may have been modified or deleted since
+        kept = set(self._dates).difference(self._j)
+        notes = JournalCache(self._path).load_notes()
+        if notes is None:
+            sections = index_journal(self._path).sections
+            self._unloaded = {day: sections[day] for day in kept if day in sections}
+            return
+        self._unloaded = {}
+        for day, topics in notes.items():
+            if day in kept:
+                self._j.set_day(day, topics)
+
+    def _index_days(
+        self, days: List[str], day_ranges: Dict[str, Tuple[int, int]]
+    ) -> bool:
+        """Find the sections of the given dates in the file from their byte range.
+
+        Return False if the notes of a date come before its first topic heading,
+        as their topic is then the last one of the date before it in the file."""
+        days = [
+            day
+            for day in days
+            if day not in self._unloaded and day not in self._j and day in day_ranges
+        ]
+        if not days:
+            return True
+        with map_journal(self._path) as buffer:
+            for day in days:
+                try:
+                    self._unloaded.update(index_range(buffer, *day_ranges[day]))
+                except ValueError:
+                    return False
+        return True
+
+    def _save_cache(self, loaded_digest: Optional[str] = None) -> None:
+        """Store the notes and the byte range of the dates of the file in the cache.
+
+        If the cache holds the version of the file with `loaded_digest`, only the
+        dates changed since are stored. Otherwise the dates that are not loaded are
+        read from the file one at a time while they are stored, so that the notes
+        are never all in memory."""
+        cache = JournalCache(self._path)
+        if loaded_digest is not None and self._digest is not None:
+            changed_notes = {
+                day: self._j[day] if day in self._j else {} for day in self._dirty_days
+            }
+            if cache.update(
+                loaded_digest, changed_notes, self._day_ranges, self._digest
+            ):
+                return
+        if self._digest is None:
+            self._digest = file_digest(self._path)
+        self._load_cached_notes()
+        date_topics: List[Tuple[str, str]] = []
+        # The same topic string for all the dates, so that it is pickled once
+        names: Dict[str, str] = {}
+        for day in self._dates:
+            if day in self._unloaded:
+                topics = dict.fromkeys(s.topic for s in self._unloaded[day])
+            else:
+                topics = dict.fromkeys(self._j[day])
+            date_topics.extend((day, names.setdefault(t, t)) for t in topics)
+        with map_journal(self._path) as buffer:
+            notes = self._iter_notes(buffer)
+            cache.save(notes, date_topics, self._day_ranges, self._digest)
+
+    def _iter_notes(self, buffer: Buffer) -> Iterator[Tuple[str, Dict[str, str]]]:
+        """Yield the notes of each date, reading the dates not loaded from `buffer`."""
+        for day in self._dates:
+            if day in self._unloaded:
+                yield day, read_notes(buffer, self._unloaded[day])
+            else:
+                yield day, self._j[day]
+
+    def _save_cache_if_unchanged(self) -> None:
+        """Store the cache, unless another process saved the file since it was read.
+
+        The cache is stored as the version of the file found on disk, so it must
+        not be stored if the file has been replaced in the meantime."""
+        with JournalLock(self._path):
+            if not self.changed_on_disk():
+                self._save_cache()
+
+    def _search_index(self) -> SearchIndex:
+        """Return the search index, building and storing it if needed."""
+        if not (self.use_cache and self.file_path and self.file_path.is_file()):
+            self._load_days()
+            return SearchIndex.from_notes(self._j)
+        cache = SearchIndexCache(self._path)
+        index = cache.load()
+        if index is None or self._dirty_days:
+            self._load_days()
+            index = SearchIndex.from_notes(self._j)
+            if not self._dirty_days:
+                with JournalLock(self._path):
+                    if not self.changed_on_disk():
+                        cache.save(index, self._digest)
+        return index
+
+    def _update_search_index(self, loaded_file_stat: Tuple[int, int]) -> None:
+        """Update the stored search index with the dates changed by a save."""
+        cache = SearchIndexCache(self._path)
+        if not cache.exists():
+            return
+        index = cache.load(loaded_file_stat)
+        if index is None:
+            cache.delete()
+            return
+        if index.needs_rebuild():
+            # The dates that are not loaded are read one at a time, as by `_save_cache`
+            index = SearchIndex()
+            with map_journal(self._path) as buffer:
+                for day, notes in self._iter_notes(buffer):
+                    index.update_day(day, notes)
+        else:
+            for day in self._dirty_days:
+                index.update_day(day, self._j.get(day, {}))
+        cache.save(index, self._digest)
+
+    def _load_days(self, days: Optional[List[str]] = None) -> None:
+        """Read the notes of the given dates that have not been loaded yet.
+
+        All the dates are read if `days` is None. Only the byte ranges of the dates
+        are read from the file, unless the notes stored in the cache are used. The
+        file is loaded again first if it was modified."""
+        self._reload_if_changed()
+        self._load_cached_notes(days)
+        if days is None:
+            days = list(self._unloaded)
+        days = [day for day in days if day in self._unloaded]
+        if not days:
+            return
+        with profiling.phase("read notes"), map_journal(self._path) as buffer:
+            for day in days:
+                self._j.set_day(day, read_notes(buffer, self._unloaded.pop(day)))
+
+    def _from_md(self, md: Union[str, Iterable[str]]):
+        """Parse the journal from a markdown text, or from an iterable of its lines."""
+        if not isinstance(md, str):
+            md = "\n".join(line.rstrip("\n") for line in md)
+        notes = _parse_notes(md)
+        self._j = NoteStore()
+        self._dates = sorted(notes)
+        self._topic_index = TopicIndex(
+            (date, topic) for date, topics in notes.items() for topic in topics
+        )
+        for day, topics in notes.items():
+            self._j.set_day(day, topics)
+
+
+def _parse_notes(text: str) -> JDict:
+    """Return the notes of a markdown journal by date and topic.
+
+    The text is split on the code fences with `str.find` and on the headings with
+    `str.split`, so that the notes are sliced between the headings and their lines
+    are never handled one at a time in Python.
+
+    Raises
+    ------
+    ValueError
+        If a note is found before the first date and topic headings.
+    """
+    notes: Dict[str, Dict[str, List[str]]] = {}
+    # The chunks of lines of the notes of the current date, by topic. The notes
+    # before the first date, or of an empty date or topic, make the journal malformed
+    day_notes: Dict[str, List[str]] = notes.setdefault("", {})
+    topic = ""
+    for i, part in enumerate(_split_code_fences(text)):
+        if i % 2:
+            # The lines of a code fence are kept as they are
+            day_notes.setdefault(topic, []).append(part)
+            continue
+        pieces = part.split("\n#")
+        if part.startswith("#"):
+            pieces[0] = pieces[0][1:]
+            first_heading = 0
+        else:
+            lines = _without_empty_lines(pieces[0])
+            if lines:
+                day_notes.setdefault(topic, []).append(lines)
+            first_heading = 1
+        for piece in islice(pieces, first_heading, None):
+            heading, _, lines = piece.partition("\n")
+            if heading.startswith("#"):
+                topic = heading[1:].strip()
+            else:
+                day_notes = notes.setdefault(heading.strip(), {})
+            lines = lines.strip("\n")
+            if lines:
+                if "\n\n" in lines:
+                    lines = _without_empty_lines(lines)
+                day_notes.setdefault(topic, []).append(lines)
+    if notes.pop("") or any("" in day_notes for day_notes in notes.values()):
+        raise ValueError("malformed journal")
+    return {
+        day: {topic: "\n".join(chunks) + "\n" for topic, chunks in topics.items()}
+        for day, topics in notes.items()
+        if topics
+    }
+
+
+def _without_empty_lines(lines: str) -> str:
+    """Remove the empty lines, out of a code fence, from some lines of a note."""
+    lines = lines.strip("\n")
+    while "\n\n" in lines:
+        lines = lines.replace("\n\n", "\n")
+    return lines
+
+
+def _split_code_fences(text: str) -> List[str]:
+    """Split a markdown text on its code fences, as `re.split` with a group would.
+
+    The parts alternate between the text out of the code fences and the lines of a
+    code fence, from its first line to the next code fence line or the end of the
+    text, without the final newline."""
+    fence_lines = sorted(
+        line_start
+        for marker in ["```", "~~~"]
+        for line_start in _line_starts(text, marker)
+    )
+    parts = []
+    end = 0
+    for start, close in zip_longest(fence_lines[::2], fence_lines[1::2]):
+        parts.append(text[end:start])
+        if close is None:
+            parts.append(text[start:].removesuffix("\n"))
+            return parts
+        end = text.find("\n", close)
+        end = len(text) if end == -1 else end
+        parts.append(text[start:end])
+    parts.append(text[end:])
+    return parts
+
+
+def _line_starts(text: str, prefix: str) -> Iterator[int]:
+    """Yield the start offset of the lines starting with `prefix`."""
+    if text.startswith(prefix):
+        yield 0
+    prefix = "\n" + prefix
+    i = text.find(prefix)
+    while i != -1:
+        yield i + 1
+        i = text.find(prefix, i + 1)
@@ -0,0 +1,261 @@
+"""Persistent cache of the parsed journal files."""
+
+import hashlib
+import os
+import pickle
+from bisect import bisect_right
+from itertools import islice
+from operator import itemgetter
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from . import config
+from .ioutils import atomic_write
+from .usertypes import JDict
+
+CACHE_VERSION = 7
+# The notes are pickled by chunks of this many dates
+NOTES_CHUNK_DATES = 1000
+
+
+class CacheHeader(NamedTuple):
+    """The part of the cache that identifies the journal file version."""
+
+    version: int
+    size: int
+    mtime_ns: int
+    digest: str
+    dates: List[str]
+    date_topics: List[Tuple[str, str]]
+    day_ranges: Optional[Dict[str, Tuple[int, int]]]
+    # Identify the notes file, which starts with the same id
+    notes_id: str
+    # First date, offset and length of each chunk of notes in the notes file
+    chunks: List[Tuple[str, int, int]]
+
+
+class JournalCache:
+    """A cache of the notes of a journal file, stored in the user cache directory.
+
+    The cache is made of two files: a header with the dates and the topics of the
+    journal, and the notes, pickled by chunks of dates. The header is enough to list
+    the topics, so the notes are only unpickled when they are needed. The cache is
+    valid as long as the size, the modification time and the content hash of the
+    journal file are unchanged.
+
+    When the journal is saved, only the chunks holding a changed date are pickled
+    again, and appended to the notes file. The notes file is written again when it
+    holds more replaced chunks than current ones."""
+
+    def __init__(self, journal_path: Path, cache_dir: Optional[Path] = None):
+        self.journal_path = journal_path
+        self.cache_path = cache_file_path(journal_path, ".pickle", cache_dir)
+        self.notes_path = cache_file_path(journal_path, ".notes.pickle", cache_dir)
+
+    def load_header(self) -> Optional[CacheHeader]:
+        """Return the cache header, or None if the cache does not match the journal."""
+        header = self._load_header()
+        if header is None:
+            return None
+        stat = self.journal_path.stat()
+        if (header.size, header.mtime_ns) != (stat.st_size, stat.st_mtime_ns):
+            return None
+        if header.digest != file_digest(self.journal_path):
+            return None
+        return header
+
+    def load_notes(self) -> Optional[JDict]:
+        """Return the notes stored in the cache, or None if they cannot be read."""
+        header = self._load_header()
+        if header is None:
+            return None
+        notes: JDict = {}
+        try:
+            with self.notes_path.open("rb") as f:
+                if pickle.load(f) != header.notes_id:
+                    return None
+                for _, offset, _ in header.chunks:
+                    f.seek(offset)
+                    notes.update(pickle.load(f))
+        except Exception:
+            return None
+        return notes
+
+    def save(
+        self,
+        notes: Iterable[Tuple[str, Dict[str, str]]],
+        date_topics: List[Tuple[str, str]],
+        day_ranges: Optional[Dict[str, Tuple[int, int]]] = None,
+        digest: Optional[str] = None,
+    ) -> None:
+        """Store the notes of the current version of the journal file.
+
+        The (date, notes) pairs are pickled by chunks, so that they can be read from
+        the journal file while they are stored without being all in memory. `digest`
+        is the digest of the journal file, computed from the file if it is None."""
+        notes_id = os.urandom(8).hex()
+        chunks: List[Tuple[str, int, int]] = []
+        notes = iter(notes)
+        # A cache file lost in a crash is rebuilt, so it is not synced to disk
+        with atomic_write(self.notes_path, fsync=False) as f:
+            pickle.dump(notes_id, f, protocol=pickle.HIGHEST_PROTOCOL)
+            for chunk in iter(lambda: dict(islice(notes, NOTES_CHUNK_DATES)), {}):
+                chunks.append(_dump_chunk(f, chunk))
+        dates = sorted({date for date, _ in date_topics})
+        self._save_header(dates, date_topics, day_ranges, digest, notes_id, chunks)
+
+    def update(
+        self,
+        digest: str,
+        changed_notes: Dict[str, Dict[str, str]],
+        day_ranges: Optional[Dict[str, Tuple[int, int]]],
+        new_digest: str,
+    ) -> bool:
+        """Store the dates changed since the version of the journal file `digest`.
+
+        `changed_notes` maps each changed date to its notes, empty if the date has
+        been deleted. Only the chunks holding a changed date are pickled again.
+
+        Returns
+        -------
+        bool
+            False if the cache does not hold the version `digest` of the journal
+            file, or if the notes file must be written again with `save`.
+        """
+        header = self._load_header()
+        if header is None or header.digest != digest or not header.chunks:
+            return False
+        try:
+            notes_size = self.notes_path.stat().st_size
+        except FileNotFoundError:
+            return False
+        if notes_size > 2 * sum(length for _, _, length in header.chunks):
+            return False
+        first_dates = [first_date for first_date, _, _ in header.chunks]
+        chunk_days: Dict[int, List[str]] = {}
+        for day in changed_notes:
+            i = max(bisect_right(first_dates, day) - 1, 0)
+            chunk_days.setdefault(i, []).append(day)
+        new_chunks: Dict[int, List[Tuple[str, int, int]]] = {}
+        with self.notes_path.open("r+b") as f:
+            if pickle.load(f) != header.notes_id:
+                return False
+            for i, days in chunk_days.items():
+                f.seek(header.chunks[i][1])
+                chunk = pickle.load(f)
+                for day in days:
+                    if changed_notes[day]:
+                        chunk[day] = changed_notes[day]
+                    else:
+                        chunk.pop(day, None)
+                new_chunks[i] = []
+                f.seek(0, os.SEEK_END)
+                for piece in _split_chunk(chunk):
+                    new_chunks[i].append(_dump_chunk(f, piece))
+        chunks = [
+            chunk
+            for i, old_chunk in enumerate(header.chunks)
+            for chunk in new_chunks.get(i, [old_chunk])
+        ]
+        dates = [date for date in header.dates if date not in changed_notes]
+        dates.extend(date for date, notes in changed_notes.items() if notes)
+        dates.sort()
+        date_topics = [
+            (date, topic)
+            for date, topic in header.date_topics
+            if date not in changed_notes
+        ]
+        date_topics.extend(
+            (date, topic) for date, notes in changed_notes.items() for topic in notes
+        )
+        date_topics.sort(key=itemgetter(0))
+        self._save_header(
+            dates, date_topics, day_ranges, new_digest, header.notes_id, chunks
+        )
+        return True
+
+    def _load_header(self) -> Optional[CacheHeader]:
+        try:
+            with self.cache_path.open("rb") as f:
+                header = pickle.load(f)
+        except Exception:
+            # A missing or corrupted cache is rebuilt
+            return None
+        if not isinstance(header, CacheHeader) or header.version != CACHE_VERSION:
+            return None
+        return header
+
+    def _save_header(
+        self,
+        dates: List[str],
+        date_topics: List[Tuple[str, str]],
+        day_ranges: Optional[Dict[str, Tuple[int, int]]],
+        digest: Optional[str],
+        notes_id: str,
+        chunks: List[Tuple[str, int, int]],
+    ) -> None:
+        stat = self.journal_path.stat()
+        header = CacheHeader(
+            CACHE_VERSION,
+            stat.st_size,
+            stat.st_mtime_ns,
+            digest or file_digest(self.journal_path),
+            dates,
+            date_topics,
+            day_ranges,
+            notes_id,
+            chunks,
+        )
+        write_pickles(self.cache_path, [header])
+
+
+def _dump_chunk(f: BinaryIO, chunk: Dict[str, Dict[str, str]]) -> Tuple[str, int, int]:
+    """Pickle a chunk of notes at the end of the notes file.
+
+    Return the first date of the chunk, and its offset and length in the file."""
+    offset = f.tell()
+    pickle.dump(chunk, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return min(chunk), offset, f.tell() - offset
+
+
+def _split_chunk(chunk: Dict[str, Dict[str, str]]) -> List[Dict[str, Dict[str, str]]]:
+    """Split a chunk that has grown too large, dropping it if it is empty."""
+    if len(chunk) <= 2 * NOTES_CHUNK_DATES:
+        return [chunk] if chunk else []
+    dates = sorted(chunk)
+    return [
+        {date: chunk[date] for date in dates[i : i + NOTES_CHUNK_DATES]}
+        for i in range(0, len(dates), NOTES_CHUNK_DATES)
+    ]
+
+
+def cache_file_path(
+    journal_path: Path, suffix: str, cache_dir: Optional[Path] = None
+) -> Path:
+    """Return the path of a cache file of the journal in the user cache directory."""
+    cache_dir = Path(cache_dir or config.DEFAULT_CACHE_DIR)
+    name = hashlib.sha1(str(journal_path.resolve()).encode()).hexdigest()
+    return cache_dir / f"{name}{suffix}"
+
+
+def write_pickles(file_path: Path, objects: Iterable) -> None:
+    """Pickle the objects one after the other and replace the file atomically.
+
+    Each object is pickled as soon as it is produced."""
+    # A cache file lost in a crash is rebuilt, so it is not synced to disk
+    with atomic_write(file_path, fsync=False) as f:
+        for obj in objects:
+            pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def file_digest(file_path: Path) -> str:
+    with file_path.open("rb") as f:
+        return data_digest(iter(lambda: f.read(2**20), b""))
+
+
+def data_digest(chunks: Iterable[bytes]) -> str:
+    """Return the digest of a file written as the given chunks of bytes."""
+    digest = hashlib.blake2b()
+    for chunk in chunks:
+        digest.update(chunk)
+    return digest.hexdigest()
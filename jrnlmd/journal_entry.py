@@ -42,6 +42,41 @@ class JournalEntry:
             notes = input_from_editor()
         return JournalEntry(notes, date, topic)
 
+    @staticmethod
+    def from_json(text: str) -> JournalEntry:
+        """Parse a JSON object into a journal entry.
+
+        Parameters
+        ----------
+        text : str
+            A JSON object with the optional keys "date", "topic" and "note". The
+            date has the same format as in `from_string`, the note can be a string
+            or a list of strings.
+
+        Returns
+        -------
+        JournalEntry
+        """
+        import json
+
+        entry = json.loads(text)
+        if not isinstance(entry, dict):
+            raise ValueError("The entry is not a JSON object.")
+        date_text, topic, notes = (entry.get(key) for key in ("date", "topic", "note"))
+        date = None
+        if date_text:
+            date, _, _ = parse_journal_entry_text(f"{date_text}:")
+            if date is None:
+                raise ValueError(f"Invalid date: {date_text}")
+        if topic is not None and not isinstance(topic, str):
+            raise ValueError("The topic is not a string.")
+        if isinstance(notes, list):
+            if not all(isinstance(note, str) for note in notes):
+                raise ValueError("The notes are not strings.")
+        elif notes is not None and not isinstance(notes, str):
+            raise ValueError("The note is not a string.")
+        return JournalEntry(notes, date, topic)
+
     def is_valid(self):
         return self.note != ""
 
@@ -0,0 +1,218 @@
+"""Index of the (date, topic) sections of a journal file."""
+import contextlib
+import mmap
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+# A journal file mapped in memory, or the empty bytes of an empty file
+Buffer = Union[mmap.mmap, bytes]
+
+_HEADING_OR_FENCE = re.compile(rb"\n(?:#|```|~~~)")
+_CONTENT = re.compile(rb"[^\r\n]")
+# A note as `Journal.to_md` writes it, after the empty line below its heading: no
+# empty line outside code blocks, and only closed code blocks
+_NOTE_LINE = rb"(?!```|~~~)[^\n]+\n"
+_CODE_BLOCK = rb"(?:```|~~~)[^\n]*\n(?:(?!```|~~~)[^\n]*\n)*(?:```|~~~)[^\n]*\n"
+_MD_NOTE = re.compile(rb"\n(?:%s|%s)+" % (_NOTE_LINE, _CODE_BLOCK))
+# Found in a note that is not plain lines, which must then match _MD_NOTE
+_EMPTY_LINE_OR_FENCE = re.compile(rb"\n(?:\n|```|~~~)")
+# The line breaks other than "\n" split by `str.splitlines` when reading the notes,
+# the ones of two or three bytes after their first byte
+_OTHER_LINE_BREAKS = [b"\r", b"\x0b", b"\x0c", b"\x1c", b"\x1d", b"\x1e"]
+_OTHER_MULTIBYTE_LINE_BREAKS = {
+    b"\xc2": [b"\xc2\x85"],
+    b"\xe2": [b"\xe2\x80\xa8", b"\xe2\x80\xa9"],
+}
+
+
+class JournalSection(NamedTuple):
+    """A (date, topic) section of a journal file and the byte range of its note."""
+
+    date: str
+    topic: str
+    start: int
+    end: int
+
+
+SectionIndex = Dict[str, List[JournalSection]]
+
+
+class JournalIndex(NamedTuple):
+    """The sections of a journal file grouped by date, in file order.
+
+    `days` holds the start offset of each date heading, in file order."""
+
+    sections: SectionIndex
+    days: List[Tuple[str, int]]
+    size: int
+
+
+def index_journal(file_path: Path) -> JournalIndex:
+    """Return the sections of a journal file grouped by date, in file order.
+
+    Only the heading and code fence lines are inspected, the notes are skipped.
+
+    Parameters
+    ----------
+    file_path : Path
+        The journal file.
+
+    Returns
+    -------
+    JournalIndex
+        The sections of each date and the offsets of the date headings.
+
+    Raises
+    ------
+    ValueError
+        If a note is found before the first date and topic headings.
+    """
+    with map_journal(file_path) as buffer:
+        return _index_buffer(buffer)
+
+
+@contextlib.contextmanager
+def map_journal(file_path: Path) -> Iterator[Buffer]:
+    """Map a journal file in memory, read-only.
+
+    Slicing the buffer reads only the pages of the slice, and the bytes of the
+    file are never decoded as a whole."""
+    with file_path.open("rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield buffer
+
+
+def index_range(buffer: Buffer, start: int, end: int) -> SectionIndex:
+    """Return the sections of the dates between two offsets of a journal buffer.
+
+    `start` must be the offset of a date heading."""
+    return _index_buffer(buffer, start, end).sections
+
+
+def has_md_layout(file_path: Path, index: JournalIndex) -> bool:
+    """Return True if the notes of the file are laid out as `Journal.to_md` writes
+    them.
+
+    Each heading is followed by an empty line and each note by an empty line,
+    unless it ends the file. A topic appears once on a date, the notes have no
+    empty line outside code blocks and no line break other than "\\n". The order of
+    the dates is not checked."""
+    ends = [start for _, start in index.days[1:]] + [index.size]
+    with map_journal(file_path) as buffer:
+        if _has_other_line_breaks(buffer):
+            return False
+        for (day, start), end in zip(index.days, ends):
+            sections = index.sections.get(day, [])
+            if not sections or len({s.topic for s in sections}) != len(sections):
+                return False
+            heading = f"# {day}\n".encode()
+            position = start + len(heading)
+            if buffer[start:position] != heading:
+                return False
+            for section in sections:
+                heading = f"\n## {section.topic}\n".encode()
+                if buffer[position : section.start] != heading:
+                    return False
+                position = section.end if section.end == index.size else section.end - 1
+                if not _is_md_note(buffer, section.start, position):
+                    return False
+            if sections[-1].end != end:
+                return False
+    return True
+
+
+def _has_other_line_breaks(buffer: Buffer) -> bool:
+    # Searching each byte is faster than a regular expression
+    if any(buffer.find(line_break) != -1 for line_break in _OTHER_LINE_BREAKS):
+        return True
+    return any(
+        buffer.find(line_break) != -1
+        for first_byte, line_breaks in _OTHER_MULTIBYTE_LINE_BREAKS.items()
+        if buffer.find(first_byte) != -1
+        for line_break in line_breaks
+    )
+
+
+def _is_md_note(buffer: Buffer, start: int, end: int) -> bool:
+    if end - start < 2 or buffer[start : start + 1] + buffer[end - 1 : end] != b"\n\n":
+        return False
+    if _EMPTY_LINE_OR_FENCE.search(buffer, start, end) is None:  # type: ignore
+        return True
+    return _MD_NOTE.fullmatch(buffer, start, end) is not None  # type: ignore
+
+
+def read_notes(buffer: Buffer, sections: List[JournalSection]) -> Dict[str, str]:
+    """Decode the notes of the sections of a date from the journal buffer."""
+    notes: Dict[str, List[str]] = {}
+    for section in sections:
+        text = buffer[section.start : section.end].decode()
+        notes.setdefault(section.topic, []).extend(note_lines(text.splitlines()))
+    return {topic: "\n".join(lines) + "\n" for topic, lines in notes.items()}
+
+
+def note_lines(lines: Iterable[str]) -> Iterator[str]:
+    """Yield the lines of a section body that belong to the note.
+
+    Blank lines are dropped unless they are inside a code fence."""
+    code_fence = False
+    for line in lines:
+        if line.startswith("```") or line.startswith("~~~"):
+            code_fence = not code_fence
+        if line or code_fence:
+            yield line
+
+
+def _index_buffer(
+    buffer: Buffer, start: int = 0, end: Optional[int] = None
+) -> JournalIndex:
+    end = len(buffer) if end is None else end
+    index: SectionIndex = {}
+    days: List[Tuple[str, int]] = []
+    current_day = ""
+    current_topic = ""
+    section_start = start
+    code_fence = False
+    for line_start in _heading_or_fence_lines(buffer, start, end):
+        if buffer[line_start : line_start + 1] != b"#":
+            code_fence = not code_fence
+            continue
+        if code_fence:
+            continue
+        line_end = buffer.find(b"\n", line_start, end)
+        line_end = end if line_end == -1 else line_end + 1
+        _add_section(
+            index, buffer, current_day, current_topic, section_start, line_start
+        )
+        heading = buffer[line_start:line_end].decode()
+        if heading.startswith("##"):
+            current_topic = heading.removeprefix("##").strip()
+        else:
+            current_day = heading.removeprefix("#").strip()
+            days.append((current_day, line_start))
+        section_start = line_end
+    _add_section(index, buffer, current_day, current_topic, section_start, end)
+    return JournalIndex(index, days, end)
+
+
+def _heading_or_fence_lines(buffer: Buffer, start: int, end: int) -> Iterator[int]:
+    """Yield the start offset of the heading and code fence lines."""
+    first_line = buffer[start : start + 3]
+    if first_line[:1] == b"#" or first_line in (b"```", b"~~~"):
+        yield start
+    for match in _HEADING_OR_FENCE.finditer(buffer, start, end):  # type: ignore
+        yield match.start() + 1
+
+
+def _add_section(
+    index: SectionIndex, buffer: Buffer, day: str, topic: str, start: int, end: int
+) -> None:
+    if _CONTENT.search(buffer, start, end) is None:  # type: ignore
+        return
+    if not (day and topic):
+        raise ValueError("malformed journal")
+    index.setdefault(day, []).append(JournalSection(day, topic, start, end))
@@ -0,0 +1,53 @@
+"""Advisory lock serializing the writers of a journal file."""
+from pathlib import Path
+from typing import IO, Optional
+
+from .journal_cache import cache_file_path
+
+
+class JournalLock:
+    """Exclusive lock on a journal file, held while the journal is saved.
+
+    The lock file, stored in the user cache directory, also counts the saves of
+    the journal. A writer can then tell that the journal was saved by another
+    process since it was loaded even when the size and the modification time of
+    the file did not change."""
+
+    def __init__(self, journal_path: Path, cache_dir: Optional[Path] = None):
+        self.lock_path = cache_file_path(journal_path, ".lock", cache_dir)
+        self._file: Optional[IO[str]] = None
+
+    def generation(self) -> int:
+        """Return the number of saves of the journal."""
+        try:
+            return int(self.lock_path.read_text() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def increment(self) -> int:
+        """Count a save of the journal, while the lock is held."""
+        if self._file is None:
+            raise RuntimeError("The journal lock is not held.")
+        self._file.seek(0)
+        generation = int(self._file.read() or 0) + 1
+        self._file.seek(0)
+        self._file.truncate()
+        self._file.write(str(generation))
+        self._file.flush()
+        return generation
+
+    def __enter__(self) -> "JournalLock":
+        import fcntl
+
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self.lock_path.open("a+")
+        fcntl.flock(self._file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        import fcntl
+
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
@@ -0,0 +1,154 @@
+"""Filtered views of a journal, which do not copy its notes."""
+import datetime
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Set, Tuple
+
+from . import profiling
+
+if TYPE_CHECKING:
+    from .journal import Journal
+
+
+class JournalView:
+    """The notes of a journal between two dates and about some topics.
+
+    A view keeps a reference to its journal and the filters applied to it, and
+    filtering a view returns a new view with the combined filters, without
+    reading any note. The notes are read from the journal only when the view is
+    rendered or converted, so a view shows the changes made to the journal after
+    it has been created."""
+
+    def __init__(
+        self,
+        journal: "Journal",
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        topic_texts: Tuple[str, ...] = (),
+    ):
+        self._journal = journal
+        self._start = start
+        self._end = end
+        # The topics of the view contain all these texts
+        self._topic_texts = topic_texts
+
+    def on(self, date: str) -> "JournalView":
+        """Return a filtered journal on the given date."""
+        return self.between(date, date)
+
+    def since(self, date: str) -> "JournalView":
+        """Return a filtered journal since the given date, included."""
+        return self.between(date, None)
+
+    def until(self, date: str) -> "JournalView":
+        """Return a filtered journal until the given date, included."""
+        return self.between(None, date)
+
+    def between(self, start: Optional[str], end: Optional[str]) -> "JournalView":
+        """Return a filtered journal between the given dates, included."""
+        if start is None or (self._start is not None and self._start > start):
+            start = self._start
+        if end is None or (self._end is not None and self._end < end):
+            end = self._end
+        return JournalView(self._journal, start, end, self._topic_texts)
+
+    def last(self, n_days: int) -> "JournalView":
+        """Return a filtered journal on the last `n_days` days, today included."""
+        today = datetime.date.today()
+        first_day = today - datetime.timedelta(days=n_days - 1)
+        return self.between(first_day.isoformat(), today.isoformat())
+
+    def about(self, topic: str) -> "JournalView":
+        """Return a filtered journal about the given topic.
+
+        The topic can be a partial match."""
+        return JournalView(
+            self._journal, self._start, self._end, self._topic_texts + (topic,)
+        )
+
+    def search(self, query: str) -> "JournalView":
+        """Return a filtered journal with the notes that match the query."""
+        found = self._journal.search(query)
+        return JournalView(found, self._start, self._end, self._topic_texts)
+
+    def dates(self) -> List[str]:
+        # Before choosing the dates to read, as the file may have been modified
+        self._journal._reload_if_changed()
+        with profiling.phase("filter"):
+            dates = self._journal._dates_between(self._start, self._end)
+            topics = self._topics()
+            if topics is None:
+                return dates
+            topic_index = self._journal._topic_index
+            topic_dates: Set[str] = set()
+            for topic in topics:
+                topic_dates.update(topic_index.dates(topic))
+            return [date for date in dates if date in topic_dates]
+
+    def topics(self) -> List[str]:
+        topics = self._topics()
+        if topics is None:
+            topics = set(self._journal.topics())
+        if self._start is None and self._end is None:
+            return sorted(topics)
+        topic_index = self._journal._topic_index
+        return sorted(
+            topic
+            for topic in topics
+            if any(self._in_range(date) for date in topic_index.dates(topic))
+        )
+
+    def to_dict(self) -> Dict[str, Dict[str, str]]:
+        """Return the notes of the view, as accepted by `Journal.from_dict`."""
+        dates = self.dates()
+        topics = self._topics()
+        self._journal._load_days(dates)
+        notes = {}
+        for date in dates:
+            day_notes = self._journal._j[date]
+            if topics is not None:
+                day_notes = {
+                    topic: note for topic, note in day_notes.items() if topic in topics
+                }
+            notes[date] = day_notes
+        return notes
+
+    def to_journal(self) -> "Journal":
+        """Return a new journal with a copy of the notes of the view."""
+        return type(self._journal).from_dict(self.to_dict())
+
+    def to_md(
+        self,
+        date_descending: bool = True,
+        simplified: bool = False,
+        compact: bool = False,
+    ) -> str:
+        return "".join(self.iter_md(date_descending, simplified, compact))
+
+    def iter_md(
+        self,
+        date_descending: bool = True,
+        simplified: bool = False,
+        compact: bool = False,
+    ) -> Iterator[str]:
+        """Render the view as `Journal.iter_md` renders a journal."""
+        single_topic = None
+        if simplified:
+            topics = self.topics()
+            single_topic = topics[0] if len(topics) == 1 else None
+        return self._journal._iter_days_md(
+            self.dates(), self._topics(), date_descending, compact, single_topic
+        )
+
+    def _topics(self) -> Optional[Set[str]]:
+        """Return the topics containing the topic texts, None if there are none."""
+        if not self._topic_texts:
+            return None
+        topic_index = self._journal._topic_index
+        topics = set(topic_index.matching(self._topic_texts[0]))
+        for text in self._topic_texts[1:]:
+            topics.intersection_update(topic_index.matching(text))
+        return topics
+
+    def _in_range(self, date: str) -> bool:
+        return (self._start is None or self._start <= date) and (
+            self._end is None or date <= self._end
+        )
@@ -1,30 +1,101 @@
+import glob
+import os
 from pathlib import Path
-from typing import Tuple
+from typing import List, Optional, TextIO, Tuple, Union
 
 import click
 import click_config_file
 
-from . import clickutils, config
+from . import clickutils, config, ioutils, profiling
 from .ioutils import print_with_external
 from .journal import Journal
 from .journal_entry import JournalEntry
 from .journal_entry_filter import JournalEntryFilter
-from .version_control import JournalGitVersionControl
+from .multi_journal import MultiJournal
+from .sharded_journal import SHARD_KEY_LENGTHS, ShardedJournal
+
+
+def _profile_callback(ctx: click.Context, param: click.Parameter, value: bool):
+    """Start profiling with --profile, or if JRNLMD_TRACE is set."""
+    trace = os.environ.get("JRNLMD_TRACE", "0")
+    if value or trace != "0":
+        profiling.start(None if trace in ["0", "1"] else trace)
+        ctx.call_on_close(profiling.stop)
+
+
+def _profile_output_callback(
+    ctx: click.Context, param: click.Parameter, value: Optional[str]
+):
+    if value:
+        profiling.start(value)
+        ctx.call_on_close(profiling.stop)
+
+
+def _read_config_file(file_path: str, cmd_name: str) -> dict:
+    with profiling.phase("config"):
+        return click_config_file.configobj_provider()(file_path, cmd_name)
 
 
 @click.group(name="jrnlmd", cls=clickutils.AliasedGroup, invoke_without_command=True)
 @click.option(
     "-j",
     "--journal",
-    type=click.Path(path_type=Path),
+    cls=clickutils.MultipleOption,
     required=True,
-    help="The journal file.",
+    help=(
+        "The journal file, or the directory of a split journal. Can be repeated or"
+        " be a glob pattern to query several journals with cat, search and top."
+    ),
+)
+@click.option(
+    "--external-command",
+    default=ioutils.EXTERNAL_COMMAND,
+    show_default=True,
+    help=(
+        "The command that highlights the markdown printed on a terminal. If empty"
+        " or not installed, the markdown is highlighted by jrnlmd."
+    ),
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    is_eager=True,
+    expose_value=False,
+    callback=_profile_callback,
+    help=(
+        "Print the time spent in each phase of the command to standard error. Also"
+        " enabled by setting JRNLMD_TRACE to 1, or to an output file."
+    ),
+)
+@click.option(
+    "--profile-output",
+    type=click.Path(dir_okay=False),
+    is_eager=True,
+    expose_value=False,
+    callback=_profile_output_callback,
+    help=(
+        "Profile the command and write a Chrome trace to a .json file, or the"
+        " cProfile statistics to any other file."
+    ),
 )
 @click.pass_context
-@click_config_file.configuration_option(config_file_name=config.DEFAULT_CONFIG_FILE)
-def cli(ctx: click.Context, journal: Path):
+@click_config_file.configuration_option(
+    config_file_name=config.DEFAULT_CONFIG_FILE, provider=_read_config_file
+)
+def cli(ctx: click.Context, journal: Tuple[str, ...], external_command: str):
     ctx.ensure_object(dict)
-    ctx.obj["JOURNAL"] = Journal(journal)
+    ioutils.EXTERNAL_COMMAND = external_command
+    journal_paths = _expand_journal_paths(journal)
+    if len(journal_paths) > 1:
+        if ctx.invoked_subcommand not in [None, "cat", "search", "top"]:
+            raise click.UsageError(
+                f"{ctx.invoked_subcommand} accepts a single journal."
+            )
+        ctx.obj["JOURNAL"] = MultiJournal(journal_paths)
+    else:
+        # The server passes its own function, which reuses the journals in memory
+        open_journal = ctx.obj.get("OPEN_JOURNAL", open_journal_file)
+        ctx.obj["JOURNAL"] = open_journal(journal_paths[0])
     if ctx.invoked_subcommand is None:
         ctx.invoke(cat, filter_=None)
 
@@ -46,8 +117,22 @@ def cli(ctx: click.Context, journal: Path):
         "If set, the journal will be pushed to the remote repository after the commit."
     ),
 )
+@click.option(
+    "--background/--no-background",
+    default=False,
+    help=(
+        "Commit and push in a background process, once for the entries added in"
+        " quick succession."
+    ),
+)
 @click.pass_context
-def add(ctx: click.Context, text: str, commit_message: str, git_remote: str) -> None:
+def add(
+    ctx: click.Context,
+    text: str,
+    commit_message: str,
+    git_remote: str,
+    background: bool,
+) -> None:
     """Add one or multiple entries to the journal.
 
     \b
@@ -64,10 +149,77 @@ def add(ctx: click.Context, text: str, commit_message: str, git_remote: str) ->
     journal.save()
     print_with_external(journal.on(entry.date).about(entry.topic).to_md())
     if commit_message:
-        vc = JournalGitVersionControl(journal.file_path)
-        commit_status = vc.commit(commit_message)
-        if git_remote and commit_status is True:
-            vc.push(git_remote)
+        _commit(journal, commit_message, git_remote, background)
+
+
+@cli.command(name="import")
+@click.argument("file", type=click.File("r"), default="-")
+@click.option(
+    "--commit-message",
+    help="If set, the journal will be committed with this message.",
+)
+@click.option(
+    "--git-remote",
+    help=(
+        "If set, the journal will be pushed to the remote repository after the commit."
+    ),
+)
+@click.option(
+    "--background/--no-background",
+    default=False,
+    help=(
+        "Commit and push in a background process, once for the entries added in"
+        " quick succession."
+    ),
+)
+@click.pass_context
+def import_(
+    ctx: click.Context,
+    file: TextIO,
+    commit_message: str,
+    git_remote: str,
+    background: bool,
+) -> None:
+    """Add the entries read from FILE to the journal, one entry per line.
+
+    \b
+    FILE is the standard input if it is not specified. Each line is either:
+    - an entry in the format of the add command: [DATE:] TOPIC . NOTE1 [, NOTE2]
+    - a JSON object: {"date": "12 nov 2021", "topic": "work", "note": "a note"},
+      where the note can also be a list of notes.
+
+    The journal is saved once, and only if all the entries are valid."""
+    import sys
+
+    entries = []
+    errors = []
+    for line_number, line in enumerate(file, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            if line.startswith("{"):
+                entry = JournalEntry.from_json(line)
+            else:
+                entry = JournalEntry.from_string(line)
+        except ValueError as e:
+            errors.append(f"line {line_number}: {e}")
+            continue
+        if entry.is_valid():
+            entries.append(entry)
+        else:
+            errors.append(f"line {line_number}: the entry has no note.")
+    if errors:
+        for error in errors:
+            print(f"ERROR: {error}", file=sys.stderr)
+        ctx.exit(1)
+    journal = ctx.obj["JOURNAL"]
+    for entry in entries:
+        journal.add(entry)
+    journal.save()
+    print(f"Imported {len(entries)} entries.")
+    if commit_message:
+        _commit(journal, commit_message, git_remote, background)
 
 
 @cli.command()
@@ -100,6 +252,13 @@ def cat(
 
     Accepts a DATE and/or a TOPIC to filter the journal entries.
 
+    \b
+    The DATE can be preceded by a modifier:
+      since DATE:           Entries on DATE and after it (alias: from).
+      until DATE:           Entries on DATE and before it.
+      between DATE and DATE:
+                            Entries between the two dates, included.
+
     \b
     Config file:
       default-filter        The default filter to use if no filter is specified."""
@@ -110,19 +269,31 @@ def cat(
     else:
         filter_text = filter_
     filter_time_modifier, filter_text_no_modifiers = _detect_time_modifier(filter_text)
+    start_date = None
+    if filter_time_modifier == "between":
+        start_text, _, filter_text_no_modifiers = filter_text_no_modifiers.partition(
+            " and "
+        )
+        start_date = JournalEntryFilter.from_string(f"{start_text}:").date
     entry_filter = JournalEntryFilter.from_string(filter_text_no_modifiers)
+    if filter_time_modifier == "between" and not (start_date and entry_filter.date):
+        raise click.UsageError(f"Expected between DATE and DATE: in {filter_text}")
     simplify = False
     journal_filtered = ctx.obj["JOURNAL"]
     if entry_filter.date:
         if filter_time_modifier == "since":
             journal_filtered = journal_filtered.since(entry_filter.date)
+        elif filter_time_modifier == "until":
+            journal_filtered = journal_filtered.until(entry_filter.date)
+        elif filter_time_modifier == "between":
+            journal_filtered = journal_filtered.between(start_date, entry_filter.date)
         else:
             journal_filtered = journal_filtered.on(entry_filter.date)
     if entry_filter.topic:
         simplify = True
         journal_filtered = journal_filtered.about(entry_filter.topic)
     print_with_external(
-        journal_filtered.to_md(
+        journal_filtered.iter_md(
             date_descending=False,
             simplified=(simplified and simplify),
             compact=compact,
@@ -156,17 +327,161 @@ def delete(ctx: click.Context, filter_: str = ""):
 
 
 @cli.command()
+@click.option(
+    "--compact/--no-compact",
+    default=False,
+    help="Reduce the number of blank lines in the output.",
+)
+@click.argument(
+    "query",
+    metavar="QUERY",
+    nargs=-1,
+    callback=lambda x, y, z: " ".join(z),
+)
+@click.pass_context
+def search(ctx: click.Context, query: str, compact: bool = False) -> None:
+    """Print the notes that match QUERY.
+
+    \b
+    - Words are combined with AND: jrnlmd search rust async
+    - OR separates alternatives: jrnlmd search rust OR go
+    - Double quotes match a phrase: jrnlmd search '"code review"'"""
+    journal = ctx.obj["JOURNAL"]
+    print_with_external(
+        journal.search(query).iter_md(date_descending=False, compact=compact)
+    )
+
+
+@cli.command()
+@click.option(
+    "--by",
+    type=click.Choice(list(SHARD_KEY_LENGTHS)),
+    default="year",
+    show_default=True,
+    help="Write one file per year or per month.",
+)
+@click.argument("directory", type=click.Path(file_okay=False, path_type=Path))
+@click.pass_context
+def split(ctx: click.Context, directory: Path, by: str) -> None:
+    """Split the journal into one file per year or month in DIRECTORY.
+
+    The journal file is left untouched. Use DIRECTORY as the journal to read and
+    write the split journal."""
+    import sys
+
+    journal = ctx.obj["JOURNAL"]
+    try:
+        sharded_journal = ShardedJournal.split(journal, directory, by)
+    except (FileExistsError, ValueError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        ctx.exit(1)
+    n_files = len(sharded_journal.shard_files())
+    files = "file" if n_files == 1 else "files"
+    print(f"Journal split into {n_files} {files} in {directory}.")
+
+
+@cli.command()
+@click.option(
+    "--counts",
+    is_flag=True,
+    help="Print the number of dates of each topic, most used topics first.",
+)
+@click.option(
+    "--recent",
+    is_flag=True,
+    help="Print the last date of each topic, most recent topics first.",
+)
 @click.pass_context
-def top(ctx: click.Context):
+def top(ctx: click.Context, counts: bool, recent: bool):
     """Print the topics of the journal."""
+    if counts and recent:
+        raise click.UsageError("--counts and --recent cannot be used together.")
     journal = ctx.obj["JOURNAL"]
-    print("\n".join(journal.topics()))
+    if counts:
+        lines = [f"{count:>5} {topic}" for topic, count in journal.topic_counts()]
+    elif recent:
+        lines = [f"{date} {topic}" for topic, date in journal.recent_topics()]
+    else:
+        lines = journal.topics()
+    print("\n".join(lines))
+
+
+@cli.command()
+@click.pass_context
+def status(ctx: click.Context) -> None:
+    """Print the commits and pushes waiting to be run in the background."""
+    from .git_sync import GitSyncQueue
+
+    queue = GitSyncQueue(ctx.obj["JOURNAL"].file_path)
+    state = queue.status()
+    for message in state.messages:
+        print(f"Commit pending: {message}")
+    if state.remote is not None:
+        print(f"Push to {state.remote} pending.")
+    if state.error is not None:
+        print(f"Last sync failed after {state.attempts} attempts: {state.error}")
+    if state.is_pending() and not queue.is_running():
+        print("No background sync running, it is retried at the next commit.")
+    if not state.is_pending() and state.error is None:
+        print("Nothing to sync.")
+
+
+def _commit(
+    journal: Union[Journal, ShardedJournal],
+    commit_message: str,
+    git_remote: str,
+    background: bool = False,
+) -> None:
+    journal_path = journal.file_path
+    if journal_path is None:
+        raise RuntimeError("The journal file name has not been set.")
+    if background:
+        from .git_sync import GitSyncQueue
+
+        GitSyncQueue(journal_path).add(commit_message, git_remote)
+        return
+    # GitPython is slow to import, so it is imported only when needed
+    from .version_control import JournalGitVersionControl
+
+    with profiling.phase("git"):
+        vc = JournalGitVersionControl(journal_path)
+        commit_status = vc.commit(commit_message)
+        if git_remote and commit_status is True:
+            vc.push(git_remote)
+
+
+def open_journal_file(journal_path: Path) -> Union[Journal, ShardedJournal]:
+    if journal_path.is_dir():
+        return ShardedJournal(journal_path)
+    return Journal(journal_path, lazy=True, use_cache=True)
+
+
+def _expand_journal_paths(patterns: Tuple[str, ...]) -> List[Path]:
+    """Return the journals of the paths and glob patterns, in order.
+
+    Raises
+    ------
+    click.UsageError
+        If a glob pattern matches no journal.
+    """
+    journal_paths: List[Path] = []
+    for pattern in patterns:
+        if not any(c in pattern for c in "*?["):
+            journal_paths.append(Path(pattern))
+            continue
+        matches = sorted(glob.glob(pattern))
+        if not matches:
+            raise click.UsageError(f"No journal matches {pattern}.")
+        journal_paths.extend(Path(match) for match in matches)
+    return list(dict.fromkeys(journal_paths))
 
 
 def _detect_time_modifier(text: str) -> Tuple[str, str]:
     tokens = text.split()
     if tokens and tokens[0] in ["from", "since"]:
         return "since", " ".join(tokens[1:])
+    elif tokens and tokens[0] in ["until", "between"]:
+        return tokens[0], " ".join(tokens[1:])
     else:
         return "on", text
 
@@ -0,0 +1,162 @@
+"""Read-only queries over several journals, run in parallel."""
+import datetime
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from . import config
+from .journal import Journal
+from .sharded_journal import ShardedJournal
+from .usertypes import JDict
+
+# A filter of the journal interface and its arguments, such as ("on", (date,))
+Filter = Tuple[str, Tuple[str, ...]]
+
+
+class MultiJournal:
+    """The journals of several files or directories, queried together.
+
+    It has the query interface of `Journal`. The filters are recorded, and each
+    journal is loaded and filtered in its own process when the result is needed.
+    The notes are merged by date and the topic of each section is labelled with
+    the name of its journal, such as `topic (alice)`."""
+
+    def __init__(
+        self,
+        journal_paths: Sequence[Path],
+        filters: Sequence[Filter] = (),
+        max_workers: Optional[int] = None,
+    ):
+        self.journal_paths = list(journal_paths)
+        self.max_workers = max_workers
+        self._filters = tuple(filters)
+
+    def on(self, date: str) -> "MultiJournal":
+        """Return the journals filtered on the given date."""
+        return self._filter("on", date)
+
+    def since(self, date: str) -> "MultiJournal":
+        """Return the journals filtered since the given date, included."""
+        return self._filter("since", date)
+
+    def until(self, date: str) -> "MultiJournal":
+        """Return the journals filtered until the given date, included."""
+        return self._filter("until", date)
+
+    def between(self, start: str, end: str) -> "MultiJournal":
+        """Return the journals filtered between the given dates, included."""
+        return self._filter("between", start, end)
+
+    def last(self, n_days: int) -> "MultiJournal":
+        """Return the journals filtered on the last `n_days` days, today included."""
+        today = datetime.date.today()
+        first_day = today - datetime.timedelta(days=n_days - 1)
+        return self.between(first_day.isoformat(), today.isoformat())
+
+    def about(self, topic: str) -> "MultiJournal":
+        """Return the journals filtered about the given topic."""
+        return self._filter("about", topic)
+
+    def search(self, query: str) -> "MultiJournal":
+        """Return the notes of the journals that match the query."""
+        return self._filter("search", query)
+
+    def to_dict(self) -> JDict:
+        """Return the merged notes, with the labelled topics."""
+        merged: Dict[str, Dict[str, str]] = {}
+        labels = journal_labels(self.journal_paths)
+        for label, notes in zip(labels, self._map("to_dict")):
+            for date, topics in notes.items():
+                day = merged.setdefault(date, {})
+                for topic, note in topics.items():
+                    day[f"{topic} ({label})"] = note
+        return {date: merged[date] for date in sorted(merged)}
+
+    def to_journal(self) -> Journal:
+        return Journal.from_dict(self.to_dict())
+
+    def to_md(
+        self,
+        date_descending: bool = True,
+        simplified: bool = False,
+        compact: bool = False,
+    ) -> str:
+        return self.to_journal().to_md(date_descending, simplified, compact)
+
+    def iter_md(
+        self,
+        date_descending: bool = True,
+        simplified: bool = False,
+        compact: bool = False,
+    ) -> Iterator[str]:
+        return self.to_journal().iter_md(date_descending, simplified, compact)
+
+    def dates(self) -> List[str]:
+        return sorted({date for dates in self._map("dates") for date in dates})
+
+    def topics(self) -> List[str]:
+        return sorted({topic for topics in self._map("topics") for topic in topics})
+
+    def topic_counts(self) -> List[Tuple[str, int]]:
+        """Return the topics and the number of dates they appear on, most used first."""
+        counts: Counter = Counter()
+        for topic_counts in self._map("topic_counts"):
+            counts.update(dict(topic_counts))
+        return sorted(sorted(counts.items()), key=lambda topic_count: -topic_count[1])
+
+    def recent_topics(self) -> List[Tuple[str, str]]:
+        """Return the topics and the last date they appear on, most recent first."""
+        last_dates: Dict[str, str] = {}
+        for recent_topics in self._map("recent_topics"):
+            for topic, date in recent_topics:
+                last_dates[topic] = max(date, last_dates.get(topic, date))
+        return sorted(
+            sorted(last_dates.items()),
+            key=lambda topic_date: topic_date[1],
+            reverse=True,
+        )
+
+    def _filter(self, name: str, *args: str) -> "MultiJournal":
+        return MultiJournal(
+            self.journal_paths, self._filters + ((name, args),), self.max_workers
+        )
+
+    def _map(self, method: str) -> List[Any]:
+        """Return the result of `method` on each filtered journal, in order."""
+        args = [(path, self._filters, method) for path in self.journal_paths]
+        if len(args) == 1 or self.max_workers == 1:
+            return [_query(*query) for query in args]
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_set_cache_dir,
+            initargs=(config.DEFAULT_CACHE_DIR,),
+        ) as executor:
+            return list(executor.map(_query, *zip(*args)))
+
+
+def journal_labels(journal_paths: Sequence[Path]) -> List[str]:
+    """Return the name of each journal, its path if the name is not unique."""
+    names = [path.stem for path in journal_paths]
+    return [
+        name if names.count(name) == 1 else str(path)
+        for name, path in zip(names, journal_paths)
+    ]
+
+
+def _query(journal_path: Path, filters: Sequence[Filter], method: str) -> Any:
+    """Open a journal, apply the filters and return the result of `method`."""
+    journal: Any
+    if journal_path.is_dir():
+        journal = ShardedJournal(journal_path)
+    else:
+        journal = Journal(journal_path, lazy=True, use_cache=True)
+    for name, args in filters:
+        journal = getattr(journal, name)(*args)
+    return getattr(journal, method)()
+
+
+def _set_cache_dir(cache_dir: str) -> None:
+    """Use the cache directory of the parent process in a worker."""
+    config.DEFAULT_CACHE_DIR = cache_dir
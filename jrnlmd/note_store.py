@@ -0,0 +1,89 @@
+"""Compact in-memory storage of the notes of a journal."""
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+# The topic ids and the notes of a date, alternated in the order of the topics
+DayNotes = Tuple[Union[int, str], ...]
+
+
+class NoteStore(Mapping):
+    """Map each date to its notes, as a read-only mapping of topics to notes.
+
+    The notes of a date are stored in a flat tuple instead of a dictionary, which
+    is built only when the date is read. The topics are the ids of the topic table
+    of the store, so that a topic used on many dates is stored once. The notes are
+    changed with `set_day`, `append` and `delete`."""
+
+    def __init__(self) -> None:
+        self._days: Dict[str, DayNotes] = {}
+        self._topics: List[str] = []
+        self._topic_ids: Dict[str, int] = {}
+
+    def __getitem__(self, date: str) -> Dict[str, str]:
+        day = self._days[date]
+        topics = map(self._topics.__getitem__, day[::2])  # type: ignore
+        return dict(zip(topics, day[1::2]))  # type: ignore
+
+    def __contains__(self, date: object) -> bool:
+        return date in self._days
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._days)
+
+    def __len__(self) -> int:
+        return len(self._days)
+
+    def note(self, date: str, topic: str) -> Optional[str]:
+        """Return the note of a topic on a date, None if there is none."""
+        i = self._index(self._days.get(date, ()), topic)
+        return None if i is None else self._days[date][i + 1]  # type: ignore
+
+    def set_day(self, date: str, notes: Mapping) -> None:
+        """Replace the notes of a date, removing the date if there are no notes."""
+        if not notes:
+            self._days.pop(date, None)
+            return
+        self._days[date] = tuple(
+            item
+            for topic, note in notes.items()
+            for item in (self._topic_id(topic), note)
+        )
+
+    def append(self, date: str, topic: str, note: str) -> None:
+        """Append a note to the notes of a topic on a date."""
+        day = self._days.get(date, ())
+        i = self._index(day, topic)
+        if i is None:
+            self._days[date] = day + (self._topic_id(topic), note)
+        else:
+            notes = day[i + 1] + note  # type: ignore
+            self._days[date] = day[: i + 1] + (notes,) + day[i + 2 :]
+
+    def delete(self, date: str, topic: str) -> None:
+        """Delete the notes of a topic on a date, and the date if it has no notes."""
+        day = self._days[date]
+        i = self._index(day, topic)
+        if i is None:
+            raise KeyError(f"{topic} missing on {date} entry.")
+        if len(day) == 2:
+            del self._days[date]
+        else:
+            self._days[date] = day[:i] + day[i + 2 :]
+
+    def _index(self, day: DayNotes, topic: str) -> Optional[int]:
+        """Return the index of the id of a topic in the notes of a date."""
+        topic_id = self._topic_ids.get(topic)
+        if topic_id is None:
+            return None
+        for i in range(0, len(day), 2):
+            if day[i] == topic_id:
+                return i
+        return None
+
+    def _topic_id(self, topic: str) -> int:
+        topic_id = self._topic_ids.get(topic)
+        if topic_id is None:
+            topic_id = len(self._topics)
+            self._topics.append(topic)
+            self._topic_ids[topic] = topic_id
+        return topic_id
@@ -1,12 +1,49 @@
 import datetime
+import functools
 import re
 from typing import List, Optional, Tuple, Union
 
-import dateparser
+from . import profiling
 
 TOKEN_SEP = "."
 NOTE_SEP = ","
 
+_RELATIVE_DAYS = {"today": 0, "now": 0, "yesterday": 1, "tomorrow": -1}
+_WEEKDAYS = {
+    name: weekday
+    for weekday, day_name in enumerate(
+        ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+    )
+    for name in (day_name, day_name[:3])
+}
+_MONTHS = {
+    name: month
+    for month, month_name in enumerate(
+        [
+            "january",
+            "february",
+            "march",
+            "april",
+            "may",
+            "june",
+            "july",
+            "august",
+            "september",
+            "october",
+            "november",
+            "december",
+        ],
+        start=1,
+    )
+    for name in (month_name, month_name[:3])
+}
+_DAYS_AGO_RE = re.compile(r"(\d+) (day|week)s? ago")
+_NUMERIC_DATE_RE = re.compile(r"(\d{1,2})[/.\- ](\d{1,2})(?:[/.\- ](\d{4}|\d{2}))?")
+# Read by dateparser as a time of the day, so as today or yesterday
+_DOTTED_TIME_RE = re.compile(r"(?:[01]?\d|2[0-3])\.[0-5]\d")
+_DAY_MONTH_NAME_RE = re.compile(r"(\d{1,2}) ?([a-z]+)\.?(?: ?(\d{4}|\d{2}))?")
+_MONTH_NAME_DAY_RE = re.compile(r"([a-z]+)\.? ?(\d{1,2})")
+
 
 def parse_journal_entry_text(
     text: str,
@@ -25,20 +62,21 @@ def parse_journal_entry_text(
     """
     if not text:
         return None, None, None
-    maybe_datetopic_notes = _split_on_separator(text, TOKEN_SEP)
-    if len(maybe_datetopic_notes) > 2:
-        raise ValueError(f"Too many {TOKEN_SEP} in input.")
-    maybe_datetopic = maybe_datetopic_notes[0]
-    date_txt, topic = _split_date_topic(maybe_datetopic)
-    date = _parse_date(date_txt)
-    if not topic:
-        return date, None, None
-    elif len(maybe_datetopic_notes) == 1:
-        return date, topic, None
-    else:
-        maybe_notes = maybe_datetopic_notes[1]
-        notes = _split_on_separator(maybe_notes, NOTE_SEP)
-        return date, topic, notes
+    with profiling.phase("parse"):
+        maybe_datetopic_notes = _split_on_separator(text, TOKEN_SEP)
+        if len(maybe_datetopic_notes) > 2:
+            raise ValueError(f"Too many {TOKEN_SEP} in input.")
+        maybe_datetopic = maybe_datetopic_notes[0]
+        date_txt, topic = _split_date_topic(maybe_datetopic)
+        date = _parse_date(date_txt)
+        if not topic:
+            return date, None, None
+        elif len(maybe_datetopic_notes) == 1:
+            return date, topic, None
+        else:
+            maybe_notes = maybe_datetopic_notes[1]
+            notes = _split_on_separator(maybe_notes, NOTE_SEP)
+            return date, topic, notes
 
 
 def _split_date_topic(text: str) -> Tuple[str, str]:
@@ -50,8 +88,87 @@ def _split_date_topic(text: str) -> Tuple[str, str]:
 
 
 def _parse_date(text: str) -> Union[None, str]:
+    if not text.strip():
+        return None
+    if len(text) == 1 and not re.match(r"\d", text):
+        return None
+    return _resolve_date(text, datetime.date.today())
+
+
+@functools.lru_cache(maxsize=256)
+def _resolve_date(text: str, today: datetime.date) -> Union[None, str]:
+    """Resolve a date string relative to `today`.
+
+    The ISO format and the common forms handled by `_parse_common_date` are
+    resolved directly, dateparser is used for anything else."""
+    try:
+        a_date: Optional[datetime.date] = datetime.datetime.fromisoformat(
+            text
+        ).date()
+    except ValueError:
+        a_date = _parse_common_date(text.strip().lower(), today)
+        if a_date is None:
+            a_date = _parse_date_with_dateparser(text)
+    if a_date is None:
+        return None
+    return a_date.isoformat()
+
+
+def _parse_common_date(text: str, today: datetime.date) -> Optional[datetime.date]:
+    """Parse the relative and day-month-year dates that do not need dateparser.
+
+    Dates without a year are in the past, as dateparser with PREFER_DATES_FROM set
+    to past would return them. A day and month separated by a dot that can be read
+    as a time, such as "12.03", is left to dateparser, which returns the date of
+    that time rather than 12 March. Return None if the text is not a common date."""
+    if text in _RELATIVE_DAYS:
+        return today - datetime.timedelta(days=_RELATIVE_DAYS[text])
+    if text in _WEEKDAYS:
+        days_back = (today.weekday() - _WEEKDAYS[text]) % 7 or 7
+        return today - datetime.timedelta(days=days_back)
+    m = _DAYS_AGO_RE.fullmatch(text)
+    if m:
+        days = int(m[1]) * (7 if m[2] == "week" else 1)
+        return today - datetime.timedelta(days=days)
+    m = _NUMERIC_DATE_RE.fullmatch(text)
+    if m and not _DOTTED_TIME_RE.fullmatch(text):
+        return _day_month_year(int(m[1]), int(m[2]), m[3], today)
+    m = _DAY_MONTH_NAME_RE.fullmatch(text)
+    if m and m[2] in _MONTHS:
+        return _day_month_year(int(m[1]), _MONTHS[m[2]], m[3], today)
+    m = _MONTH_NAME_DAY_RE.fullmatch(text)
+    if m and m[1] in _MONTHS:
+        return _day_month_year(int(m[2]), _MONTHS[m[1]], None, today)
+    return None
+
+
+def _day_month_year(
+    day: int, month: int, year: Optional[str], today: datetime.date
+) -> Optional[datetime.date]:
+    try:
+        if year is None:
+            a_date = datetime.date(today.year, month, day)
+            if a_date > today:
+                a_date = a_date.replace(year=today.year - 1)
+            return a_date
+        if len(year) == 2:
+            a_date = datetime.date(2000 + int(year), month, day)
+            if a_date > today:
+                a_date = a_date.replace(year=1900 + int(year))
+            return a_date
+        return datetime.date(int(year), month, day)
+    except ValueError:
+        # Invalid dates, such as Feb 29 in a non leap year, are left to dateparser
+        return None
+
+
+def _parse_date_with_dateparser(text: str) -> Optional[datetime.date]:
     import warnings
 
+    # dateparser is slow to import, so it is imported only when needed
+    with profiling.phase("import dateparser"):
+        import dateparser
+
     # Ignore dateparser warnings regarding pytz
     warnings.filterwarnings(
         "ignore",
@@ -60,17 +177,11 @@ def _parse_date(text: str) -> Union[None, str]:
             " fold attribute"
         ),
     )
-    if len(text) == 1 and not re.match(r"\d", text):
-        return None
-    try:
-        a_date = datetime.datetime.fromisoformat(text)
-    except ValueError:
+    with profiling.phase("dateparser"):
         a_date = dateparser.parse(
             text, settings={"DATE_ORDER": "DMY", "PREFER_DATES_FROM": "past"}
         )
-    if a_date is None:
-        return None
-    return a_date.date().isoformat()
+    return None if a_date is None else a_date.date()
 
 
 def _split_on_separator(text: str, sep: str) -> List[str]:
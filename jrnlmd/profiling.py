@@ -0,0 +1,146 @@
+"""Timings of the phases of a command, recorded with --profile or JRNLMD_TRACE.
+
+The code marks its phases with `with profiling.phase("load"):`. While profiling
+is disabled, `phase` returns the same empty context every time, so that a phase
+only costs a function call. When the command ends, the time spent in each phase
+is printed to the standard error, and written to a Chrome trace, for a `.json`
+output file, or to a cProfile dump readable by `pstats` for any other file."""
+import contextlib
+import json
+import sys
+import time
+from typing import ContextManager, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Set while a command is profiled
+ENABLED = False
+
+_NULL_CONTEXT = contextlib.nullcontext()
+# The phases run so far: name, start time, duration and time spent in sub-phases
+_events: List[Tuple[str, float, float, float]] = []
+# The time spent in the sub-phases of each running phase
+_running: List[float] = []
+_output: Optional[str] = None
+_profiler = None
+_imported = False
+
+
+def phase(name: str) -> ContextManager[None]:
+    """Return a context recording the time spent in the phase `name`."""
+    if not ENABLED:
+        return _NULL_CONTEXT
+    return _phase(name)
+
+
+def timed_iter(name: str, iterable: Iterable[str]) -> Iterator[str]:
+    """Yield the items of `iterable`, recording the time spent producing each one.
+
+    It is used for the chunks of the rendered journal, which are produced while
+    they are printed."""
+    iterator = iter(iterable)
+    while True:
+        with phase(name):
+            item = next(iterator, None)
+        if item is None:
+            return
+        yield item
+
+
+def start(output: Optional[str] = None) -> None:
+    """Enable profiling, and write the profile to `output` when it is stopped.
+
+    The first time, the CPU time spent by the process so far is recorded as the
+    `import` phase, as it is mostly spent starting Python and importing the
+    modules, unless `skip_import_phase` was called."""
+    global ENABLED, _imported, _output, _profiler
+    if not ENABLED:
+        ENABLED = True
+        if not _imported:
+            _imported = True
+            cpu_time = time.process_time()
+            _events.append(("import", time.perf_counter() - cpu_time, cpu_time, 0.0))
+    if output is not None:
+        _output = output
+        if _profiler is None and not output.endswith(".json"):
+            import cProfile
+
+            _profiler = cProfile.Profile()
+            _profiler.enable()
+
+
+def skip_import_phase() -> None:
+    """Do not record the `import` phase, in a process that runs several commands.
+
+    The CPU time of such a process is mostly spent running the earlier commands."""
+    global _imported
+    _imported = True
+
+
+def stop() -> None:
+    """Print the summary of the phases, write the output file and disable profiling."""
+    global ENABLED, _output, _profiler
+    if not ENABLED:
+        return
+    if _profiler is not None:
+        _profiler.disable()
+    print(summary(), file=sys.stderr)
+    if _output is not None and _output.endswith(".json"):
+        with open(_output, "w") as f:
+            json.dump(chrome_trace(), f)
+    elif _output is not None and _profiler is not None:
+        _profiler.dump_stats(_output)
+    ENABLED = False
+    _events.clear()
+    _running.clear()
+    _output = None
+    _profiler = None
+
+
+def summary() -> str:
+    """Return the number of calls, the total time and the self time of each phase.
+
+    The self time of a phase does not include the time of the phases run inside
+    it."""
+    totals: Dict[str, List[float]] = {}
+    for name, _, duration, children in _events:
+        total = totals.setdefault(name, [0, 0.0, 0.0])
+        total[0] += 1
+        total[1] += duration
+        total[2] += duration - children
+    lines = [f"{'phase':<18} {'calls':>6} {'total ms':>10} {'self ms':>10}"]
+    for name, (calls, duration, self_time) in totals.items():
+        lines.append(
+            f"{name:<18} {calls:>6} {duration * 1000:>10.2f} {self_time * 1000:>10.2f}"
+        )
+    return "\n".join(lines)
+
+
+def chrome_trace() -> Dict[str, list]:
+    """Return the phases as a trace for chrome://tracing or Perfetto."""
+    origin = min((start for _, start, _, _ in _events), default=0.0)
+    return {
+        "traceEvents": [
+            {
+                "name": name,
+                "ph": "X",
+                "ts": (start - origin) * 1e6,
+                "dur": duration * 1e6,
+                "pid": 0,
+                "tid": 0,
+            }
+            for name, start, duration, _ in _events
+        ]
+    }
+
+
+@contextlib.contextmanager
+def _phase(name: str) -> Iterator[None]:
+    _running.append(0.0)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        children = _running.pop()
+        if _running:
+            _running[-1] += duration
+        _events.append((name, start, duration, children))
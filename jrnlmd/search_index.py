@@ -0,0 +1,167 @@
+"""Full-text inverted index over the notes of a journal."""
+import pickle
+import re
+from array import array
+from pathlib import Path
+from typing import Dict, List, Mapping, NamedTuple, Optional, Set, Tuple
+
+from .journal_cache import cache_file_path, file_digest, write_pickles
+
+SEARCH_INDEX_VERSION = 1
+
+# A query is an OR of clauses, a clause is an AND of phrases of one or more tokens
+Query = List[List[Tuple[str, ...]]]
+
+_TOKEN = re.compile(r"\w+")
+_QUERY_TERM = re.compile(r'"([^"]*)"|(\S+)')
+
+
+class SearchIndexHeader(NamedTuple):
+    """Identify the version of the journal file the index was built from."""
+
+    version: int
+    size: int
+    mtime_ns: int
+    digest: str
+
+
+class SearchIndex:
+    """Map every token of the notes to the (date, topic) sections containing it.
+
+    Sections are numbered and the postings of a token are arrays of section ids,
+    so that the index is compact and fast to unpickle. Updating a date only marks
+    its old sections as removed, and the index is rebuilt when too many sections
+    have been removed."""
+
+    def __init__(self) -> None:
+        self._sections: List[Optional[Tuple[str, str]]] = []
+        self._day_ids: Dict[str, List[int]] = {}
+        self._postings: Dict[str, array] = {}
+        self._removed = 0
+
+    @classmethod
+    def from_notes(cls, notes: Mapping[str, Mapping[str, str]]) -> "SearchIndex":
+        index = cls()
+        for date, topics in notes.items():
+            index.update_day(date, topics)
+        return index
+
+    def update_day(self, date: str, topics: Mapping[str, str]) -> None:
+        """Replace the indexed notes of a date."""
+        for section_id in self._day_ids.pop(date, []):
+            self._sections[section_id] = None
+            self._removed += 1
+        for topic, note in topics.items():
+            section_id = len(self._sections)
+            self._sections.append((date, topic))
+            self._day_ids.setdefault(date, []).append(section_id)
+            for token in set(tokenize(note)):
+                self._postings.setdefault(token, array("I")).append(section_id)
+
+    def needs_rebuild(self) -> bool:
+        return self._removed > len(self._sections) // 2
+
+    def search(self, query: Query) -> List[Tuple[str, str]]:
+        """Return the sections containing all the tokens of at least one clause.
+
+        Phrases are matched token by token, their order is checked by
+        `matches`."""
+        section_ids: Set[int] = set()
+        for clause in query:
+            tokens = {token for phrase in clause for token in phrase}
+            if not tokens or not tokens.issubset(self._postings):
+                continue
+            postings = sorted((self._postings[token] for token in tokens), key=len)
+            clause_ids = set(postings[0])
+            for posting in postings[1:]:
+                clause_ids.intersection_update(posting)
+            section_ids.update(clause_ids)
+        sections = (self._sections[section_id] for section_id in sorted(section_ids))
+        return [section for section in sections if section is not None]
+
+
+class SearchIndexCache:
+    """The search index of a journal file, stored in the user cache directory."""
+
+    def __init__(self, journal_path: Path, cache_dir: Optional[Path] = None):
+        self.journal_path = journal_path
+        self.cache_path = cache_file_path(journal_path, ".search.pickle", cache_dir)
+
+    def exists(self) -> bool:
+        return self.cache_path.is_file()
+
+    def load(
+        self, file_stat: Optional[Tuple[int, int]] = None
+    ) -> Optional[SearchIndex]:
+        """Return the index if it matches the journal file, None otherwise.
+
+        If `file_stat` is given, the index must have been built from the version
+        of the file with that size and modification time, and the content hash is
+        not checked."""
+        try:
+            with self.cache_path.open("rb") as f:
+                header = pickle.load(f)
+                if not self._is_valid(header, file_stat):
+                    return None
+                return pickle.load(f)
+        except Exception:
+            # A missing or corrupted index is rebuilt
+            return None
+
+    def save(self, index: SearchIndex, digest: Optional[str] = None) -> None:
+        """Store the index of the current version of the journal file.
+
+        `digest` is the digest of the journal file, computed from the file if it is
+        None."""
+        stat = self.journal_path.stat()
+        header = SearchIndexHeader(
+            SEARCH_INDEX_VERSION,
+            stat.st_size,
+            stat.st_mtime_ns,
+            digest or file_digest(self.journal_path),
+        )
+        write_pickles(self.cache_path, [header, index])
+
+    def delete(self) -> None:
+        self.cache_path.unlink(missing_ok=True)
+
+    def _is_valid(
+        self, header: SearchIndexHeader, file_stat: Optional[Tuple[int, int]]
+    ) -> bool:
+        if header.version != SEARCH_INDEX_VERSION:
+            return False
+        if file_stat is not None:
+            return (header.size, header.mtime_ns) == file_stat
+        stat = self.journal_path.stat()
+        if (header.size, header.mtime_ns) != (stat.st_size, stat.st_mtime_ns):
+            return False
+        return header.digest == file_digest(self.journal_path)
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+def parse_query(text: str) -> Query:
+    """Parse a search query.
+
+    Words are combined with AND, the OR keyword separates alternatives and a text
+    between double quotes is a phrase."""
+    query = []
+    for clause_text in re.split(r"\s+OR\s+", text):
+        clause = [
+            tuple(tokenize(phrase or word))
+            for phrase, word in _QUERY_TERM.findall(clause_text)
+        ]
+        clause = [phrase for phrase in clause if phrase]
+        if clause:
+            query.append(clause)
+    return query
+
+
+def matches(query: Query, note: str) -> bool:
+    """Return True if the note matches the query, phrases included."""
+    text = f" {' '.join(tokenize(note))} "
+    return any(
+        all(f" {' '.join(phrase)} " in text for phrase in clause) for clause in query
+    )
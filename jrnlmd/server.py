@@ -0,0 +1,109 @@
+"""Server keeping the journals in memory to run the commands sent by the client.
+
+The client sends one JSON line with the command line arguments and its working
+directory, and the server answers with one JSON line holding the output of the
+command and its exit code, or asking the client to run the command itself when
+the command needs the editor."""
+import asyncio
+import json
+import os
+import traceback
+from pathlib import Path
+from typing import Any, Dict, List, Union
+
+import click
+
+from . import ioutils, profiling
+from .client import socket_path
+from .journal import Journal
+from .jrnlmd import cli, open_journal_file
+from .sharded_journal import ShardedJournal
+
+
+class JournalServer:
+    """Run the commands of the clients on journals kept in memory.
+
+    A journal is loaded again when its file is modified by another program. The
+    commands are run one at a time."""
+
+    def __init__(self) -> None:
+        profiling.skip_import_phase()
+        self._journals: Dict[Path, Union[Journal, ShardedJournal]] = {}
+
+    def open_journal(self, journal_path: Path) -> Union[Journal, ShardedJournal]:
+        journal_path = journal_path.resolve()
+        journal = self._journals.get(journal_path)
+        if journal is None or journal.changed_on_disk():
+            journal = self._journals[journal_path] = open_journal_file(journal_path)
+        return journal
+
+    def run(self, args: List[str], cwd: str) -> Dict[str, Any]:
+        """Run a command line as the `jrnlmd` command would."""
+        os.chdir(cwd)
+        with ioutils.capture_output() as output:
+            try:
+                exit_code = cli.main(
+                    args,
+                    prog_name="jrnlmd",
+                    standalone_mode=False,
+                    obj={"OPEN_JOURNAL": self.open_journal},
+                )
+            except ioutils.InteractiveInputRequired:
+                return {"fallback": True}
+            except click.ClickException as e:
+                e.show()
+                exit_code = e.exit_code
+            except click.Abort:
+                click.echo("Aborted!", err=True)
+                exit_code = 1
+            except Exception:
+                # The journals may have been left half modified
+                self._journals.clear()
+                traceback.print_exc()
+                exit_code = 1
+        if not isinstance(exit_code, int):
+            exit_code = 0
+        return {
+            "output": output,
+            "exit_code": exit_code,
+            "external_command": ioutils.EXTERNAL_COMMAND,
+        }
+
+    async def serve(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.unlink(missing_ok=True)
+        # Only the user can connect to the socket
+        umask = os.umask(0o177)
+        try:
+            server = await asyncio.start_unix_server(self._handle, path=str(path))
+        finally:
+            os.umask(umask)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            path.unlink(missing_ok=True)
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            request = json.loads(await reader.readline())
+            response = self.run(request["args"], request["cwd"])
+            writer.write(json.dumps(response).encode("utf-8") + b"\n")
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+@click.command()
+def main() -> None:
+    """Serve the commands sent by jrnlmd-client, keeping the journals in memory."""
+    try:
+        asyncio.run(JournalServer().serve(socket_path()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""Journal stored in a directory, with one file per year or per month."""
+import datetime
+import re
+from collections import Counter
+from itertools import groupby
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from .journal import Journal
+from .journal_entry import JournalEntry
+from .usertypes import JDict
+
+# Length of the prefix of the dates that names their shard
+SHARD_KEY_LENGTHS = {"year": 4, "month": 7}
+
+_SHARD_FILE_RE = re.compile(r"(\d{4}(?:-\d{2})?)\.md")
+_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+class ShardedJournal:
+    """A journal split into the files `YYYY.md` or `YYYY-MM.md` of a directory.
+
+    It has the interface of `Journal`. A shard is loaded only when one of its dates
+    is needed, and saving the journal writes only the shards that changed. The
+    shards are split by year or by month like the existing files, or as set by
+    `by` in an empty directory."""
+
+    def __init__(self, directory: Path, by: str = "year"):
+        self.file_path = directory
+        self._shard_keys = _list_shard_keys(directory)
+        if self._shard_keys:
+            by = "month" if "-" in self._shard_keys[0] else "year"
+        self.by = by
+        self._key_length = SHARD_KEY_LENGTHS[by]
+        self._shards: Dict[str, Journal] = {}
+        self._dirty_shards: Set[str] = set()
+
+    @classmethod
+    def split(
+        cls, journal: Union[Journal, "ShardedJournal"], directory: Path, by: str
+    ) -> "ShardedJournal":
+        """Write the dates of a journal to the shards of a new sharded journal."""
+        if _list_shard_keys(directory):
+            raise FileExistsError(f"{directory} already contains a journal.")
+        dates = journal.dates()
+        for date in dates:
+            if not _DATE_RE.fullmatch(date):
+                raise ValueError(f"{date} is not a date.")
+        key_length = SHARD_KEY_LENGTHS[by]
+        for key, group in groupby(dates, key=lambda date: date[:key_length]):
+            shard_dates = list(group)
+            shard_notes = journal.between(shard_dates[0], shard_dates[-1]).to_dict()
+            shard = Journal.from_dict(shard_notes)
+            shard.journal_file = directory / f"{key}.md"
+            shard.save()
+        return cls(directory, by)
+
+    def shard_files(self) -> List[Path]:
+        return [self.file_path / f"{key}.md" for key in self._shard_keys]
+
+    def save(self) -> None:
+        for key in sorted(self._dirty_shards):
+            self._shards[key].save()
+        self._dirty_shards = set()
+
+    def changed_on_disk(self) -> bool:
+        """Return True if a shard was modified since it was loaded or saved."""
+        if _list_shard_keys(self.file_path) != self._shard_keys:
+            return True
+        return any(shard.changed_on_disk() for shard in self._shards.values())
+
+    def to_md(
+        self,
+        date_descending: bool = True,
+        simplified: bool = False,
+        compact: bool = False,
+    ) -> str:
+        return "".join(self.iter_md(date_descending, simplified, compact))
+
+    def iter_md(
+        self,
+        date_descending: bool = True,
+        simplified: bool = False,
+        compact: bool = False,
+    ) -> Iterator[str]:
+        """Render the journal as `to_md` does, one shard after the other."""
+        if simplified:
+            yield from Journal.concat(self._load_shards()).iter_md(
+                date_descending, simplified, compact
+            )
+            return
+        keys = self._shard_keys[::-1] if date_descending else self._shard_keys
+        separator = ""
+        for key in keys:
+            chunks = self._shard(key).iter_md(date_descending, compact=compact)
+            first_chunk = next(chunks, None)
+            if first_chunk is None:
+                continue
+            yield separator + first_chunk
+            yield from chunks
+            separator = "\n"
+
+    def to_dict(self) -> JDict:
+        """Return the notes of all the shards, as accepted by `Journal.from_dict`."""
+        return Journal.concat(self._load_shards()).to_dict()
+
+    def on(self, date: str) -> Journal:
+        """Return a filtered journal on the given date."""
+        return self.between(date, date)
+
+    def since(self, date: str) -> Journal:
+        """Return a filtered journal since the given date, included."""
+        return Journal.concat(
+            shard.since(date) for shard in self._load_shards(start=date)
+        )
+
+    def until(self, date: str) -> Journal:
+        """Return a filtered journal until the given date, included."""
+        return Journal.concat(
+            shard.until(date) for shard in self._load_shards(end=date)
+        )
+
+    def between(self, start: str, end: str) -> Journal:
+        """Return a filtered journal between the given dates, included."""
+        return Journal.concat(
+            shard.between(start, end) for shard in self._load_shards(start, end)
+        )
+
+    def last(self, n_days: int) -> Journal:
+        """Return a filtered journal on the last `n_days` days, today included."""
+        today = datetime.date.today()
+        first_day = today - datetime.timedelta(days=n_days - 1)
+        return self.between(first_day.isoformat(), today.isoformat())
+
+    def about(self, topic: str) -> Journal:
+        """Return a filtered journal about the given topic."""
+        return Journal.concat(shard.about(topic) for shard in self._load_shards())
+
+    def search(self, query: str) -> Journal:
+        """Return a filtered journal with the notes that match the query."""
+        return Journal.concat(shard.search(query) for shard in self._load_shards())
+
+    def add(self, entry: JournalEntry) -> None:
+        key = entry.date[: self._key_length]
+        if key not in self._shard_keys:
+            self._shard_keys = sorted(self._shard_keys + [key])
+        self._shard(key).add(entry)
+        self._dirty_shards.add(key)
+
+    def delete(self, date: str, topic: Optional[str] = None) -> Journal:
+        key = date[: self._key_length]
+        if key not in self._shard_keys:
+            raise KeyError(f"{date} missing from journal.")
+        deleted_entries = self._shard(key).delete(date, topic)
+        self._dirty_shards.add(key)
+        return deleted_entries
+
+    def dates(self) -> List[str]:
+        return [date for shard in self._load_shards() for date in shard.dates()]
+
+    def topics(self) -> List[str]:
+        topics: Set[str] = set()
+        for shard in self._load_shards():
+            topics.update(shard.topics())
+        return sorted(topics)
+
+    def topic_counts(self) -> List[Tuple[str, int]]:
+        """Return the topics and the number of dates they appear on, most used first."""
+        counts: Counter = Counter()
+        for shard in self._load_shards():
+            counts.update(dict(shard.topic_counts()))
+        return sorted(sorted(counts.items()), key=lambda topic_count: -topic_count[1])
+
+    def recent_topics(self) -> List[Tuple[str, str]]:
+        """Return the topics and the last date they appear on, most recent first."""
+        last_dates: Dict[str, str] = {}
+        for shard in self._load_shards():
+            last_dates.update(shard.recent_topics())
+        return sorted(
+            sorted(last_dates.items()),
+            key=lambda topic_date: topic_date[1],
+            reverse=True,
+        )
+
+    def _shard(self, key: str) -> Journal:
+        if key not in self._shards:
+            self._shards[key] = Journal(
+                self.file_path / f"{key}.md", lazy=True, use_cache=True
+            )
+        return self._shards[key]
+
+    def _load_shards(
+        self, start: Optional[str] = None, end: Optional[str] = None
+    ) -> Iterable[Journal]:
+        """Return the shards holding the dates between `start` and `end`, included."""
+        start_key = start[: self._key_length] if start else ""
+        end_key = end[: self._key_length] if end else None
+        return [
+            self._shard(key)
+            for key in self._shard_keys
+            if start_key <= key and (end_key is None or key <= end_key)
+        ]
+
+
+def _list_shard_keys(directory: Path) -> List[str]:
+    """Return the names of the shard files of the directory, without extension."""
+    if not directory.is_dir():
+        return []
+    names = (path.name for path in directory.iterdir())
+    matches = map(_SHARD_FILE_RE.fullmatch, names)
+    return sorted(match.group(1) for match in matches if match)
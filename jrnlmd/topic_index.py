@@ -0,0 +1,104 @@
+"""Inverted index from the topics of a journal to their dates."""
+from collections import defaultdict
+from typing import DefaultDict, Dict, Iterable, List, Optional, Set, Tuple
+
+NGRAM_SIZE = 3
+
+
+class TopicIndex:
+    """Map each topic to the dates it appears on.
+
+    Every substring of up to `NGRAM_SIZE` characters of a topic is indexed as
+    well, so the topics containing a text are found by intersecting the topic sets
+    of its n-grams instead of scanning all the topics. The n-gram index is built
+    the first time it is needed.
+
+    The sorted list of topics and the last date of each topic are kept up to
+    date, so that listing the topics does not scan the journal."""
+
+    def __init__(self, pairs: Iterable[Tuple[str, str]] = ()) -> None:
+        self._dates: DefaultDict[str, Set[str]] = defaultdict(set)
+        self._last_date: Dict[str, str] = {}
+        self._ngrams: Optional[DefaultDict[str, Set[str]]] = None
+        self._sorted_topics: Optional[List[str]] = None
+        for date, topic in pairs:
+            self.add(topic, date)
+
+    def add(self, topic: str, date: str) -> None:
+        if topic not in self._dates:
+            self._sorted_topics = None
+            if self._ngrams is not None:
+                for ngram in _ngrams(topic):
+                    self._ngrams[ngram].add(topic)
+        self._dates[topic].add(date)
+        if date > self._last_date.get(topic, ""):
+            self._last_date[topic] = date
+
+    def remove(self, topic: str, date: str) -> None:
+        self._dates[topic].discard(date)
+        if self._dates[topic]:
+            if self._last_date[topic] == date:
+                self._last_date[topic] = max(self._dates[topic])
+            return
+        del self._dates[topic]
+        del self._last_date[topic]
+        self._sorted_topics = None
+        if self._ngrams is not None:
+            for ngram in _ngrams(topic):
+                self._ngrams[ngram].discard(topic)
+                if not self._ngrams[ngram]:
+                    del self._ngrams[ngram]
+
+    def topics(self) -> List[str]:
+        """Return the sorted topics."""
+        if self._sorted_topics is None:
+            self._sorted_topics = sorted(self._dates)
+        return self._sorted_topics
+
+    def count(self, topic: str) -> int:
+        """Return the number of dates the topic appears on."""
+        return len(self._dates[topic]) if topic in self._dates else 0
+
+    def dates(self, topic: str) -> Set[str]:
+        """Return the dates the topic appears on."""
+        return self._dates.get(topic, set())
+
+    def last_date(self, topic: str) -> Optional[str]:
+        """Return the last date the topic appears on."""
+        return self._last_date.get(topic)
+
+    def matching(self, text: str) -> List[str]:
+        """Return the topics that contain `text`."""
+        if not text:
+            return list(self._dates)
+        if self._ngrams is None:
+            self._ngrams = defaultdict(set)
+            for topic in self._dates:
+                for ngram in _ngrams(topic):
+                    self._ngrams[ngram].add(topic)
+        if len(text) <= NGRAM_SIZE:
+            return list(self._ngrams.get(text, ()))
+        candidate_sets = sorted(
+            (
+                self._ngrams.get(text[i : i + NGRAM_SIZE], set())
+                for i in range(len(text) - NGRAM_SIZE + 1)
+            ),
+            key=len,
+        )
+        candidates = set.intersection(*candidate_sets)
+        return [topic for topic in candidates if text in topic]
+
+    def dates_about(self, text: str) -> Set[str]:
+        """Return the dates with a topic that contains `text`."""
+        dates: Set[str] = set()
+        for topic in self.matching(text):
+            dates.update(self._dates[topic])
+        return dates
+
+
+def _ngrams(topic: str) -> Set[str]:
+    return {
+        topic[i : i + size]
+        for size in range(1, NGRAM_SIZE + 1)
+        for i in range(len(topic) - size + 1)
+    }
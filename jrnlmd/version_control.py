@@ -1,29 +1,69 @@
+import shutil
+import subprocess
 import sys
 from pathlib import Path
+from typing import Dict, Optional
 
-import git
+BACKENDS = ("git", "gitpython")
+# The object id that git uses for a ref that must not exist yet
+ZERO = "0" * 40
+
+# The repository of each journal directory, found once per process
+_repo_dirs: Dict[Path, Path] = {}
 
 
 class JournalGitVersionControl:
-    def __init__(self, journal_path: Path):
+    """Commit and push a journal with git.
+
+    The `git` backend stages the journal and writes the tree and the commit with
+    the git plumbing commands, which only rehash the trees that changed. The
+    `gitpython` backend reads and writes the whole index in Python, which is slow
+    in a repository with many files, and is used when git is not installed. Both
+    commit the staged changes of the other files as well."""
+
+    def __init__(self, journal_path: Path, backend: Optional[str] = None):
         self._repo = None
         self._journal_path = str(journal_path)
-        self._git_repo_dir = journal_path.parent
-        try:
-            self._repo = git.Repo(self._git_repo_dir, search_parent_directories=True)
-        except git.InvalidGitRepositoryError:
-            pass
+        # A sharded journal is a directory
+        self._git_repo_dir = (
+            journal_path if journal_path.is_dir() else journal_path.parent
+        )
+        if backend is None:
+            backend = "git" if shutil.which("git") else "gitpython"
+        self.backend = backend
+        self._repo_dir = find_repo_dir(self._git_repo_dir)
+        if self._repo_dir is not None and backend == "gitpython":
+            import git
+
+            self._repo = git.Repo(self._repo_dir)
 
     def commit(self, message: str) -> bool:
-        if self._repo is None:
+        if self._repo_dir is None:
             print(
                 f"ERROR: {self._git_repo_dir} is not a git repository. Skipping"
                 " commit.",
                 file=sys.stderr,
             )
             return False
-        self._repo.index.add(self._journal_path)
-        self._repo.index.commit(message)
+        if self._repo is not None:
+            self._repo.index.add(self._journal_path)
+            self._repo.index.commit(message)
+            return True
+        try:
+            self._git("add", "--", self._journal_path)
+            tree = self._git("write-tree")
+            parent = self._git("rev-parse", "--quiet", "--verify", "HEAD", check=False)
+            commit = self._git(
+                "commit-tree", tree, *(["-p", parent] if parent else []), "-m", message
+            )
+            summary = message.partition("\n")[0]
+            # Fails if another commit was made in the meantime
+            self._git(
+                "update-ref", "-m", f"commit: {summary}", "HEAD", commit, parent or ZERO
+            )
+        except subprocess.CalledProcessError as e:
+            print(f"ERROR: {e.stderr.strip()}", file=sys.stderr)
+            return False
         return True
 
     def push(self, remote_name: str) -> bool:
@@ -32,8 +72,50 @@ class JournalGitVersionControl:
             if self._repo is not None:
                 self._repo.remote(name=remote_name).push()
                 push_status = True
+            elif (
+                self._repo_dir is not None
+                and remote_name in self._git("remote").splitlines()
+            ):
+                try:
+                    self._git("push", "--quiet", remote_name)
+                except subprocess.CalledProcessError as e:
+                    print(f"ERROR: {e.stderr.strip()}", file=sys.stderr)
+                    return False
+                push_status = True
         except ValueError:
             pass
         if push_status is False:
             print("ERROR: remote repository not found. Skipping push.", file=sys.stderr)
         return push_status
+
+    def _git(self, *args: str, check: bool = True) -> str:
+        """Run a git command in the repository and return its output.
+
+        Raises
+        ------
+        subprocess.CalledProcessError
+            If the command fails and `check` is True.
+        """
+        result = subprocess.run(
+            ["git", *args], cwd=self._repo_dir, capture_output=True, text=True
+        )
+        if check:
+            result.check_returncode()
+        return result.stdout.strip()
+
+
+def find_repo_dir(path: Path) -> Optional[Path]:
+    """Return the working tree of the git repository containing `path`, if any.
+
+    The repository found for a path is cached, while a path outside of any
+    repository is searched again the next time."""
+    path = path.resolve()
+    repo_dir = _repo_dirs.get(path)
+    if repo_dir is None:
+        repo_dir = next(
+            (parent for parent in (path, *path.parents) if (parent / ".git").exists()),
+            None,
+        )
+        if repo_dir is not None:
+            _repo_dirs[path] = repo_dir
+    return repo_dir
@@ -83,8 +83,30 @@ def today():
     return datetime.date.today().isoformat()
 
 
+# Keep the journal cache inside the test directory
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr("jrnlmd.config.DEFAULT_CACHE_DIR", str(cache_dir))
+    return cache_dir
+
+
+def print_chunks(text):
+    print(text if isinstance(text, str) else "".join(text))
+
+
 # Replace print_with_external with print
 @pytest.fixture(autouse=True)
 def print_with_external_mock():
-    with mock.patch("jrnlmd.jrnlmd.print_with_external", wraps=print) as print_mock:
+    with mock.patch(
+        "jrnlmd.jrnlmd.print_with_external", wraps=print_chunks
+    ) as print_mock:
         yield print_mock
+
+
+# Let git commit where no user identity is configured
+@pytest.fixture(autouse=True)
+def git_identity(monkeypatch):
+    for variable in ["AUTHOR", "COMMITTER"]:
+        monkeypatch.setenv(f"GIT_{variable}_NAME", "jrnlmd")
+        monkeypatch.setenv(f"GIT_{variable}_EMAIL", "jrnlmd@example.com")
@@ -146,3 +146,69 @@ def test_cat_journal_since(mod, journal_multidate_file):
 """
         == result.output
     )
+
+
+def test_cat_journal_until(journal_multidate_file):
+    runner = CliRunner()
+    result = runner.invoke(
+        jrnlmd.cli,
+        ["-j", str(journal_multidate_file), "cat", "until 2021-11-05: topic1"],
+    )
+    assert (
+        """# 2021-11-01
+
+## topic1
+
+- another note
+
+# 2021-11-05
+
+## topic1
+
+- second date note
+
+"""
+        == result.output
+    )
+
+
+def test_cat_journal_between(journal_multidate_file):
+    runner = CliRunner()
+    result = runner.invoke(
+        jrnlmd.cli,
+        [
+            "-j",
+            str(journal_multidate_file),
+            "cat",
+            "between 2021-11-02 and 10 nov 2021:",
+        ],
+    )
+    assert (
+        """# 2021-11-05
+
+## topic1
+
+- second date note
+
+# 2021-11-10
+
+## topic1
+
+- third date note
+
+"""
+        == result.output
+    )
+
+
+@pytest.mark.parametrize(
+    "filter_",
+    ["between 2021-11-02: topic1", "between someday and 2021-11-10: topic1"],
+)
+def test_cat_journal_between_malformed(journal_multidate_file, filter_):
+    result = CliRunner().invoke(
+        jrnlmd.cli, ["-j", str(journal_multidate_file), "cat", filter_]
+    )
+
+    assert 2 == result.exit_code
+    assert "Expected between DATE and DATE:" in result.output
@@ -0,0 +1,92 @@
+from click.testing import CliRunner
+
+from jrnlmd import jrnlmd
+from jrnlmd.journal import Journal
+
+
+def test_import_from_stdin(simple_journal_file):
+    runner = CliRunner()
+    entries = """12nov2021 : topic1 . appended note
+
+2021-11-10: topic2 . first , second
+{"date": "2021-11-10", "topic": "topic3", "note": ["a", "b"]}
+{"date": "11 nov 2021", "topic": "topic1", "note": "json note"}
+"""
+
+    result = runner.invoke(
+        jrnlmd.cli, ["-j", str(simple_journal_file), "import"], input=entries
+    )
+
+    assert "Imported 4 entries.\n" == result.output
+    assert """# 2021-11-12
+
+## topic1
+
+- a note
+- second bullet
+- appended note
+
+# 2021-11-11
+
+## topic1
+
+- json note
+
+# 2021-11-10
+
+## topic2
+
+- first
+- second
+
+## topic3
+
+- a
+- b
+""" == Journal(simple_journal_file).to_md()
+
+
+def test_import_from_file(tmp_path, new_journal_file):
+    entries_file = tmp_path / "entries.txt"
+    entries_file.write_text("2021-11-12: topic1 . a note\n")
+    runner = CliRunner()
+
+    runner.invoke(
+        jrnlmd.cli, ["-j", str(new_journal_file), "import", str(entries_file)]
+    )
+
+    assert (
+        "# 2021-11-12\n\n## topic1\n\n- a note\n" == Journal(new_journal_file).to_md()
+    )
+
+
+def test_import_saves_once(mocker, simple_journal_file):
+    save = mocker.patch("jrnlmd.journal.Journal.save")
+    runner = CliRunner()
+    entries = "".join(f"2021-11-{day:02}: topic . note\n" for day in range(1, 29))
+
+    runner.invoke(jrnlmd.cli, ["-j", str(simple_journal_file), "import"], input=entries)
+
+    save.assert_called_once()
+
+
+def test_import_invalid_entries(simple_journal_file):
+    content = simple_journal_file.read_text()
+    runner = CliRunner()
+    entries = """2021-11-12: topic1 . a valid note
+2021-11-12: topic1
+{"date": "not a date", "topic": "topic1", "note": "a note"}
+{"topic": "topic1", "note": 3}
+{"topic": "topic1"
+"""
+
+    result = runner.invoke(
+        jrnlmd.cli, ["-j", str(simple_journal_file), "import"], input=entries
+    )
+
+    assert 1 == result.exit_code
+    errors = result.stderr.splitlines()
+    assert 4 == len(errors)
+    for line, error in zip(range(2, 6), errors):
+        assert error.startswith(f"ERROR: line {line}: ")
+    assert content == simple_journal_file.read_text()
@@ -0,0 +1,34 @@
+from click.testing import CliRunner
+
+from jrnlmd import jrnlmd
+
+
+def test_search(journal_multidate_file):
+    runner = CliRunner()
+    result = runner.invoke(
+        jrnlmd.cli, ["-j", str(journal_multidate_file), "search", "first OR third"]
+    )
+    assert (
+        """# 2021-11-01
+
+## topic2
+
+- first date note
+
+# 2021-11-10
+
+## topic1
+
+- third date note
+
+"""
+        == result.output
+    )
+
+
+def test_search_no_match(journal_multidate_file):
+    runner = CliRunner()
+    result = runner.invoke(
+        jrnlmd.cli, ["-j", str(journal_multidate_file), "search", "missing"]
+    )
+    assert "\n" == result.output
@@ -0,0 +1,76 @@
+from click.testing import CliRunner
+
+from jrnlmd import jrnlmd
+from jrnlmd.journal import Journal
+
+
+def test_split(tmp_path, journal_multidate_file):
+    journal_dir = tmp_path / "journal"
+    runner = CliRunner()
+
+    result = runner.invoke(
+        jrnlmd.cli, ["-j", str(journal_multidate_file), "split", str(journal_dir)]
+    )
+
+    assert f"Journal split into 1 file in {journal_dir}.\n" == result.output
+    assert Journal(journal_multidate_file).to_md() == (
+        Journal(journal_dir / "2021.md").to_md()
+    )
+
+
+def test_commands_on_split_journal(tmp_path, journal_multidate_file):
+    journal_dir = tmp_path / "journal"
+    runner = CliRunner()
+    runner.invoke(
+        jrnlmd.cli,
+        ["-j", str(journal_multidate_file), "split", "--by", "month", str(journal_dir)],
+    )
+
+    runner.invoke(jrnlmd.cli, ["-j", str(journal_dir), "add", "2021-12-01: t . a note"])
+    result = runner.invoke(
+        jrnlmd.cli, ["-j", str(journal_dir), "cat", "since 2021-11-10:"]
+    )
+
+    assert """# 2021-11-10
+
+## topic1
+
+- third date note
+
+# 2021-12-01
+
+## t
+
+- a note
+
+""" == result.output
+    assert (journal_dir / "2021-12.md").is_file()
+
+
+def test_split_a_split_journal(tmp_path, journal_multidate_file):
+    year_dir = tmp_path / "year"
+    month_dir = tmp_path / "month"
+    runner = CliRunner()
+    args = ["-j", str(journal_multidate_file), "split", str(year_dir)]
+    runner.invoke(jrnlmd.cli, args)
+
+    result = runner.invoke(
+        jrnlmd.cli, ["-j", str(year_dir), "split", "--by", "month", str(month_dir)]
+    )
+
+    assert f"Journal split into 1 file in {month_dir}.\n" == result.output
+    assert Journal(journal_multidate_file).to_md() == (
+        Journal(month_dir / "2021-11.md").to_md()
+    )
+
+
+def test_split_into_existing_journal(tmp_path, journal_multidate_file):
+    journal_dir = tmp_path / "journal"
+    runner = CliRunner()
+    args = ["-j", str(journal_multidate_file), "split", str(journal_dir)]
+    runner.invoke(jrnlmd.cli, args)
+
+    result = runner.invoke(jrnlmd.cli, args)
+
+    assert 1 == result.exit_code
+    assert "already contains a journal" in result.stderr
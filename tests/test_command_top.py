@@ -12,3 +12,38 @@ topic2
 """
         == result.output
     )
+
+
+def test_top_counts(journal_multidate_file):
+    runner = CliRunner()
+    result = runner.invoke(
+        jrnlmd.cli, ["-j", str(journal_multidate_file), "top", "--counts"]
+    )
+    assert (
+        """    3 topic1
+    1 topic2
+"""
+        == result.output
+    )
+
+
+def test_top_counts_and_recent(journal_multidate_file):
+    result = CliRunner().invoke(
+        jrnlmd.cli, ["-j", str(journal_multidate_file), "top", "--counts", "--recent"]
+    )
+
+    assert 2 == result.exit_code
+    assert "--counts and --recent cannot be used together." in result.output
+
+
+def test_top_recent(journal_multidate_file):
+    runner = CliRunner()
+    result = runner.invoke(
+        jrnlmd.cli, ["-j", str(journal_multidate_file), "top", "--recent"]
+    )
+    assert (
+        """2021-11-10 topic1
+2021-11-01 topic2
+"""
+        == result.output
+    )
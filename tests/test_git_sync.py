@@ -0,0 +1,119 @@
+import time
+
+import git
+import pytest
+from click.testing import CliRunner
+
+from jrnlmd import jrnlmd
+from jrnlmd.git_sync import GitSyncQueue, _lock, _unlock
+
+
+@pytest.fixture
+def remote_repo(tmp_path_factory):
+    return git.Repo.init(str(tmp_path_factory.mktemp("remote")), bare=True)
+
+
+@pytest.fixture
+def journal_repo(journal_multidate_file, remote_repo):
+    repo = git.Repo.init(str(journal_multidate_file.parent))
+    repo.index.add(str(journal_multidate_file))
+    repo.index.commit("initial commit")
+    repo.create_remote("origin", remote_repo.working_dir)
+    repo.git.push("-u", "origin", "HEAD")
+    return repo
+
+
+@pytest.fixture
+def queue(journal_multidate_file, mocker):
+    queue = GitSyncQueue(journal_multidate_file)
+    mocker.patch.object(queue, "_start_worker")
+    return queue
+
+
+def test_queued_commits_are_coalesced(journal_repo, remote_repo, queue):
+    queue.add("first", "origin")
+    queue.add("second", "origin")
+    queue.add("second", "origin")
+    assert ["first", "second", "second"] == queue.status().messages
+    queue.run_worker(delay=0)
+    assert "first\nsecond" == remote_repo.head.commit.message.strip()
+    assert "initial commit" == remote_repo.head.commit.parents[0].message.strip()
+    assert (None, False) == (queue.status().error, queue.status().is_pending())
+
+
+def test_worker_is_started_only_if_not_running(journal_repo, queue):
+    queue.add("first")
+    queue._start_worker.assert_called_once()
+    worker_lock = _lock(queue._worker_lock_path)
+    try:
+        assert queue.is_running()
+        queue.add("second")
+        queue._start_worker.assert_called_once()
+        # Another worker returns at once
+        queue.run_worker(delay=0)
+        assert ["first", "second"] == queue.status().messages
+    finally:
+        _unlock(worker_lock)
+    assert not queue.is_running()
+
+
+def test_failed_push_is_retried_and_reported(journal_repo, queue, journal_multidate):
+    queue.add("first", "missing")
+    queue.run_worker(delay=0, retry_delays=(0,))
+    state = queue.status()
+    assert [] == state.messages
+    assert "missing" == state.remote
+    assert "remote repository missing not found." == state.error
+    assert 2 == state.attempts
+    assert "first" == journal_repo.head.commit.message.strip()
+
+    result = CliRunner().invoke(
+        jrnlmd.cli, ["-j", str(journal_multidate.file_path), "status"]
+    )
+    assert (
+        "Push to missing pending.\n"
+        "Last sync failed after 2 attempts: remote repository missing not found.\n"
+        "No background sync running, it is retried at the next commit.\n"
+    ) == result.output
+
+
+def test_commit_outside_a_repository_is_kept(journal_multidate_file, queue):
+    queue.add("first")
+    queue.run_worker(delay=0, retry_delays=())
+    state = queue.status()
+    assert ["first"] == state.messages
+    assert "is not in a git repository" in state.error
+
+
+def test_status_with_nothing_to_sync(journal_multidate_file):
+    result = CliRunner().invoke(
+        jrnlmd.cli, ["-j", str(journal_multidate_file), "status"]
+    )
+    assert "Nothing to sync.\n" == result.output
+
+
+def test_add_in_background(journal_multidate_file, journal_repo, remote_repo):
+    runner = CliRunner()
+    initial_commit = remote_repo.git.rev_parse("HEAD")
+    for note in ["first", "second"]:
+        result = runner.invoke(
+            jrnlmd.cli,
+            [
+                "-j",
+                str(journal_multidate_file),
+                "add",
+                f"12 nov 2021: topic1 . {note}",
+                "--commit-message",
+                f"add {note}",
+                "--git-remote",
+                "origin",
+                "--background",
+            ],
+        )
+        assert 0 == result.exit_code
+    deadline = time.monotonic() + 30
+    while remote_repo.git.rev_parse("HEAD") == initial_commit:
+        assert time.monotonic() < deadline
+        time.sleep(0.1)
+    assert "add first\nadd second" == remote_repo.head.commit.message.strip()
+    assert "- first\n- second\n" in remote_repo.git.show("HEAD:journal.md")
@@ -0,0 +1,42 @@
+import subprocess
+import sys
+
+# Cumulative import time of the CLI module, in microseconds
+IMPORT_TIME_BUDGET = 300_000
+
+
+def import_cli(module="jrnlmd.jrnlmd"):
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            f"import sys, {module}; print(' '.join(sys.modules))",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stdout.split(), result.stderr.splitlines()
+
+
+def test_cli_does_not_import_heavy_modules():
+    modules, _ = import_cli()
+    assert "git" not in modules
+    assert "dateparser" not in modules
+
+
+def test_client_only_imports_the_standard_library():
+    modules, _ = import_cli("jrnlmd.client")
+    assert "click" not in modules
+    assert "jrnlmd.journal" not in modules
+
+
+def test_cli_import_time_is_within_budget():
+    _, import_times = import_cli()
+    cli_import_time = next(
+        line for line in import_times if line.endswith("| jrnlmd.jrnlmd")
+    )
+    cumulative = int(cli_import_time.split("|")[1])
+    assert cumulative < IMPORT_TIME_BUDGET
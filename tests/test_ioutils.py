@@ -0,0 +1,113 @@
+import sys
+from unittest import mock
+
+import pytest
+
+from jrnlmd import ioutils
+
+
+@pytest.fixture
+def tty(monkeypatch):
+    # sys.stdout is replaced by the capture fixtures when the test is called
+    def set_tty():
+        monkeypatch.delenv("NO_COLOR", raising=False)
+        monkeypatch.setattr(sys.stdout, "isatty", lambda: True)
+
+    return set_tty
+
+
+@pytest.fixture
+def external_command(monkeypatch):
+    def set_command(command):
+        monkeypatch.setattr(ioutils, "EXTERNAL_COMMAND", command)
+
+    return set_command
+
+
+def test_print_with_external_streams_chunks(capfd, tty, external_command):
+    tty()
+    external_command("cat")
+    ioutils.print_with_external(iter(["# 2021-11-12\n", "\n## topic1\n"]))
+    assert "# 2021-11-12\n\n## topic1\n" == capfd.readouterr().out
+
+
+def test_print_with_external_when_command_exits_early(capfd, tty, external_command):
+    tty()
+    external_command("head -c 1")
+    ioutils.print_with_external("x" * 2**20 for _ in range(4))
+    assert "x" == capfd.readouterr().out
+
+
+@pytest.mark.parametrize("command", ["", "jrnlmd-missing-command --option"])
+def test_print_with_external_highlights_without_command(
+    capsys, tty, external_command, command
+):
+    tty()
+    external_command(command)
+    with mock.patch("subprocess.Popen") as popen:
+        ioutils.print_with_external("# 2021-11-12\n\n- a note\n")
+    popen.assert_not_called()
+    assert "\033[1;35m# 2021-11-12\033[0m\n\n\033[33m-\033[0m a note\n" == (
+        capsys.readouterr().out
+    )
+
+
+def test_print_with_external_not_on_a_terminal(external_command, capsys):
+    external_command("cat")
+    with mock.patch("subprocess.Popen") as popen:
+        ioutils.print_with_external(iter(["# 2021-11-12\n", "\n- a note\n"]))
+    popen.assert_not_called()
+    assert "# 2021-11-12\n\n- a note\n" == capsys.readouterr().out
+
+
+def test_print_with_external_no_color(capsys, tty, monkeypatch):
+    tty()
+    monkeypatch.setenv("NO_COLOR", "1")
+    ioutils.print_with_external("# 2021-11-12\n")
+    assert "# 2021-11-12\n" == capsys.readouterr().out
+
+
+def test_find_command_is_cached(mocker):
+    which = mocker.patch("shutil.which", return_value="/usr/bin/jrnlmd-viewer")
+    ioutils._find_command.cache_clear()
+    assert ["/usr/bin/jrnlmd-viewer", "-l", "md"] == ioutils._find_command(
+        "jrnlmd-viewer -l md"
+    )
+    ioutils._find_command("jrnlmd-viewer -l md")
+    which.assert_called_once_with("jrnlmd-viewer")
+    ioutils._find_command.cache_clear()
+
+
+def test_highlight_markdown():
+    chunks = ["# 2021-11-12\n\n## topic1\n\n- a no", "te\n```\n# code\n```\n- end"]
+    assert (
+        "\033[1;35m# 2021-11-12\033[0m\n"
+        "\n"
+        "\033[1;34m## topic1\033[0m\n"
+        "\n"
+        "\033[33m-\033[0m a note\n"
+        "\033[32m```\033[0m\n"
+        "\033[32m# code\033[0m\n"
+        "\033[32m```\033[0m\n"
+        "\033[33m-\033[0m end"
+    ) == "".join(ioutils.highlight_markdown(chunks))
+
+
+def test_capture_output_joins_chunks():
+    with ioutils.capture_output() as output:
+        ioutils.print_with_external(iter(["a", "b"]))
+        print("c")
+    assert [("external", "ab"), ("stdout", "c"), ("stdout", "\n")] == output
+
+
+def test_atomic_write_keeps_symbolic_link(tmp_path):
+    target = tmp_path / "notes" / "journal.md"
+    target.parent.mkdir()
+    target.write_text("old")
+    link = tmp_path / "journal.md"
+    link.symlink_to(target)
+    with ioutils.atomic_write(link) as f:
+        f.write(b"new")
+    assert link.is_symlink()
+    assert "new" == target.read_text()
+    assert ["journal.md"] == [p.name for p in target.parent.iterdir()]
@@ -1,15 +1,15 @@
-from collections import defaultdict
 from pathlib import Path
 
 import pytest
 
 from jrnlmd.journal import Journal
 from jrnlmd.journal_entry import JournalEntry
+from jrnlmd.note_store import NoteStore
 
 
 def test_create_new_journal_file():
     journal = Journal()
-    assert isinstance(journal._j, defaultdict)
+    assert isinstance(journal._j, NoteStore)
 
 
 def test_constructor_with_journal_path(new_journal_file):
@@ -106,8 +106,7 @@ def test_from_dict():
     }
     journal = Journal.from_dict(d)
     assert d == journal._j
-    assert isinstance(journal._j, defaultdict)
-    assert isinstance(journal._j["2021-01-01"], defaultdict)
+    assert isinstance(journal._j, NoteStore)
 
 
 def test_dict_to_md_one_level():
@@ -463,3 +462,36 @@ mkdir test
     journal = Journal.from_md(in_text_md)
     out_text_md = journal.to_md()
     assert in_text_md == out_text_md
+
+
+def test_md_to_dict_from_line_iterator():
+    lines = iter(["# 2021-01-01\n", "## topic1\n", "\n", "- first line\n", "- second"])
+    journal = Journal()
+    journal._from_md(lines)
+    assert {"2021-01-01": {"topic1": "- first line\n- second\n"}} == journal._j
+
+
+@pytest.mark.parametrize(
+    "text,expected",
+    [
+        (
+            "# 2021-01-01\n## topic1\n```bash\n\n## not a topic\n~~~\n\n- note\n",
+            "```bash\n\n## not a topic\n~~~\n- note\n",
+        ),
+        (
+            "# 2021-01-01\n## topic1\n- note\n~~~\n# comment\n\n",
+            "- note\n~~~\n# comment\n\n",
+        ),
+        (
+            "# 2021-01-01\n\n## topic1\n\n\n- note\n\n- last note",
+            "- note\n- last note\n",
+        ),
+    ],
+)
+def test_md_to_dict_code_fences_and_empty_lines(text, expected):
+    assert {"2021-01-01": {"topic1": expected}} == Journal.from_md(text)._j
+
+
+def test_md_to_dict_malformed_journal_with_empty_date():
+    with pytest.raises(ValueError):
+        Journal.from_md("# 2021-01-01\n## topic1\n- note\n#\n- other note\n")
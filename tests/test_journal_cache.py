@@ -0,0 +1,217 @@
+import os
+
+import pytest
+
+from jrnlmd import journal_cache
+from jrnlmd.journal import Journal
+from jrnlmd.journal_cache import JournalCache
+from jrnlmd.journal_entry import JournalEntry
+
+
+@pytest.fixture
+def cache(journal_multidate_file):
+    return JournalCache(journal_multidate_file)
+
+
+def test_cache_is_stored_in_cache_dir(cache, cache_dir):
+    assert cache_dir == cache.cache_path.parent
+
+
+def test_load_missing_cache(cache):
+    assert cache.load_header() is None
+
+
+def test_load_cache(cache, monkeypatch):
+    monkeypatch.setattr("jrnlmd.journal_cache.NOTES_CHUNK_DATES", 7)
+    notes = {f"2021-11-{day:02}": {"topic1": "- a note\n"} for day in range(1, 31)}
+    cache.save(notes.items(), [(date, "topic1") for date in notes])
+    assert ("2021-11-01", "topic1") == cache.load_header().date_topics[0]
+    assert notes == cache.load_notes()
+
+
+def test_update_cache(cache, journal_multidate_file, monkeypatch):
+    monkeypatch.setattr("jrnlmd.journal_cache.NOTES_CHUNK_DATES", 7)
+    notes = {f"2021-11-{day:02}": {"topic1": "- a note\n"} for day in range(2, 31)}
+    cache.save(notes.items(), [(date, "topic1") for date in notes])
+    digest = cache.load_header().digest
+    changed_notes = {
+        "2021-11-01": {"topic2": "- new date\n"},
+        "2021-11-10": {"topic1": "- a note\n- another note\n"},
+        "2021-11-20": {},
+    }
+    journal_multidate_file.write_text("changed")
+    new_digest = journal_cache.file_digest(journal_multidate_file)
+
+    assert cache.update(digest, changed_notes, None, new_digest)
+
+    notes.update(changed_notes)
+    del notes["2021-11-20"]
+    assert notes == cache.load_notes()
+    header = cache.load_header()
+    assert sorted(notes) == header.dates
+    assert ("2021-11-01", "topic2") == header.date_topics[0]
+    assert ("2021-11-20", "topic1") not in header.date_topics
+
+
+def test_update_cache_splits_large_chunks(cache, monkeypatch):
+    monkeypatch.setattr("jrnlmd.journal_cache.NOTES_CHUNK_DATES", 2)
+    cache.save([("2021-11-01", {"topic1": "- a note\n"})], [("2021-11-01", "topic1")])
+    header = cache.load_header()
+    changed_notes = {f"2021-11-{day:02}": {"t": "- note\n"} for day in range(2, 7)}
+
+    assert cache.update(header.digest, changed_notes, None, header.digest)
+
+    assert 3 == len(cache.load_header().chunks)
+    assert 6 == len(cache.load_notes())
+
+
+def test_update_cache_of_another_version(cache):
+    cache.save([("2021-11-01", {"topic1": "- a note\n"})], [("2021-11-01", "topic1")])
+
+    assert not cache.update("other digest", {}, None, "new digest")
+
+
+def test_cache_invalid_if_journal_size_changes(cache, journal_multidate_file):
+    cache.save([], [])
+    journal_multidate_file.write_text("")
+    assert cache.load_header() is None
+
+
+def test_cache_invalid_if_journal_content_changes(cache, journal_multidate_file):
+    cache.save([], [])
+    stat = journal_multidate_file.stat()
+    journal_multidate_file.write_text(
+        journal_multidate_file.read_text().replace("third", "THIRD")
+    )
+    os.utime(journal_multidate_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert cache.load_header() is None
+
+
+def test_corrupted_cache(cache):
+    cache.cache_path.parent.mkdir()
+    cache.cache_path.write_bytes(b"not a pickle")
+    assert cache.load_header() is None
+
+
+def test_journal_creates_cache(journal_multidate_file, journal_multidate):
+    Journal(journal_multidate_file, use_cache=True)
+    notes = JournalCache(journal_multidate_file).load_notes()
+    assert journal_multidate._j == notes
+
+
+def test_journal_uses_valid_cache(mocker, journal_multidate_file, journal_multidate):
+    Journal(journal_multidate_file, use_cache=True)
+    index_journal = mocker.patch("jrnlmd.journal.index_journal")
+    journal = Journal(journal_multidate_file, lazy=True, use_cache=True)
+    assert ["topic1", "topic2"] == journal.topics()
+    assert {} == journal._j
+    assert journal_multidate.to_md() == journal.to_md()
+    index_journal.assert_not_called()
+
+
+def test_journal_save_refreshes_cache(journal_multidate_file):
+    journal = Journal(journal_multidate_file, lazy=True, use_cache=True)
+    journal.add(JournalEntry("a note", "2021-11-12", "topic3"))
+    journal.save()
+    header = JournalCache(journal_multidate_file).load_header()
+    assert ("2021-11-12", "topic3") in header.date_topics
+    journal = Journal(journal_multidate_file, lazy=True, use_cache=True)
+    journal.add(JournalEntry("new note", "2021-11-12", "topic3"))
+    assert journal._save_in_place()
+    assert Journal(journal_multidate_file).to_md() == journal.to_md()
+
+
+def test_filtered_read_uses_the_journal_file(mocker, journal_multidate_file):
+    Journal(journal_multidate_file, lazy=True, use_cache=True)
+    mocker.patch("jrnlmd.journal.CACHED_NOTES_MIN_FRACTION", 0.5)
+    load_notes = mocker.spy(JournalCache, "load_notes")
+    journal = Journal(journal_multidate_file, lazy=True, use_cache=True)
+
+    result = journal.on("2021-11-05").to_dict()
+
+    assert {"2021-11-05": {"topic1": "- second date note\n"}} == result
+    load_notes.assert_not_called()
+    journal.to_md()
+    load_notes.assert_called_once()
+
+
+def test_cached_day_ranges_are_updated_by_save(mocker, journal_multidate_file):
+    journal = Journal(journal_multidate_file, lazy=True, use_cache=True)
+    journal.add(JournalEntry("a longer note", "2021-11-05", "topic1"))
+    journal.save()
+    mocker.patch("jrnlmd.journal.CACHED_NOTES_MIN_FRACTION", 1.0)
+    load_notes = mocker.spy(JournalCache, "load_notes")
+    journal = Journal(journal_multidate_file, lazy=True, use_cache=True)
+
+    assert {
+        "2021-11-10": {"topic1": "- third date note\n"},
+        "2021-11-05": {"topic1": "- second date note\n- a longer note\n"},
+    } == journal.since("2021-11-05").to_dict()
+    load_notes.assert_not_called()
+
+
+def test_cached_notes_keep_the_changes_of_dates_read_from_the_file(
+    mocker, journal_multidate_file
+):
+    Journal(journal_multidate_file, lazy=True, use_cache=True)
+    mocker.patch("jrnlmd.journal.CACHED_NOTES_MIN_FRACTION", 0.5)
+    journal = Journal(journal_multidate_file, lazy=True, use_cache=True)
+    expected = Journal(journal_multidate_file)
+    for j in [journal, expected]:
+        j.delete("2021-11-05")
+        j.add(JournalEntry("a note", "2021-11-10", "topic1"))
+
+    assert expected.to_dict() == journal.to_dict()
+
+
+def test_filtered_read_of_a_date_without_topic_heading(mocker, new_journal_file):
+    new_journal_file.write_text("""# 2021-11-10
+
+## topic1
+
+- third date note
+
+# 2021-11-05
+
+- second date note
+""")
+    Journal(new_journal_file, lazy=True, use_cache=True)
+    mocker.patch("jrnlmd.journal.CACHED_NOTES_MIN_FRACTION", 1.0)
+    journal = Journal(new_journal_file, lazy=True, use_cache=True)
+
+    result = journal.on("2021-11-05").to_dict()
+
+    assert Journal(new_journal_file).on("2021-11-05").to_dict() == result
+    assert {"2021-11-05": {"topic1": "- second date note\n"}} == result
+
+
+def test_save_updates_the_changed_dates_of_the_cache(mocker, journal_multidate_file):
+    Journal(journal_multidate_file, lazy=True, use_cache=True)
+    save = mocker.spy(JournalCache, "save")
+    file_digest = mocker.spy(journal_cache, "file_digest")
+    journal = Journal(journal_multidate_file, lazy=True, use_cache=True)
+    file_digest.reset_mock()
+    journal.add(JournalEntry("a note", "2021-11-12", "topic3"))
+    journal.delete("2021-11-05")
+    journal.save()
+
+    save.assert_not_called()
+    file_digest.assert_not_called()
+    journal = Journal(journal_multidate_file, lazy=True, use_cache=True)
+    assert Journal(journal_multidate_file).to_dict() == journal.to_dict()
+    assert ["2021-11-01", "2021-11-10", "2021-11-12"] == journal.dates()
+
+
+def test_notes_cache_is_written_again_when_mostly_replaced(
+    mocker, journal_multidate_file
+):
+    Journal(journal_multidate_file, lazy=True, use_cache=True)
+    save = mocker.spy(JournalCache, "save")
+    for i in range(3):
+        journal = Journal(journal_multidate_file, lazy=True, use_cache=True)
+        journal.add(JournalEntry(f"note {i}", "2021-11-12", "topic3"))
+        journal.save()
+
+    save.assert_called_once()
+    journal = Journal(journal_multidate_file, lazy=True, use_cache=True)
+    assert Journal(journal_multidate_file).to_dict() == journal.to_dict()
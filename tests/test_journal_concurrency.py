@@ -0,0 +1,108 @@
+import multiprocessing
+import os
+
+import pytest
+
+from jrnlmd.journal import Journal
+from jrnlmd.journal_entry import JournalEntry
+
+N_WORKERS = 8
+N_NOTES = 25
+
+
+def test_save_merges_concurrent_adds(journal_multidate_file):
+    journal1 = Journal(journal_multidate_file, lazy=True)
+    journal2 = Journal(journal_multidate_file, lazy=True)
+    journal1.add(JournalEntry("first", "2021-11-05", "topic1"))
+    journal2.add(JournalEntry("second", "2021-11-05", "topic1"))
+    journal2.add(JournalEntry("third", "2021-11-12", "topic3"))
+    journal1.save()
+    journal2.save()
+    notes = Journal(journal_multidate_file)._j
+    assert "- second date note\n- first\n- second\n" == notes["2021-11-05"]["topic1"]
+    assert "- third\n" == notes["2021-11-12"]["topic3"]
+
+
+def test_save_merges_concurrent_deletes(journal_multidate_file):
+    journal1 = Journal(journal_multidate_file, lazy=True)
+    journal2 = Journal(journal_multidate_file, lazy=True)
+    journal1.delete("2021-11-01", "topic2")
+    journal2.delete("2021-11-01")
+    journal2.add(JournalEntry("a note", "2021-11-12", "topic3"))
+    journal2.save()
+    journal1.save()
+    journal = Journal(journal_multidate_file)
+    assert ["2021-11-05", "2021-11-10", "2021-11-12"] == journal._dates
+
+
+def test_save_notices_saves_that_keep_size_and_mtime(journal_multidate_file):
+    journal = Journal(journal_multidate_file, lazy=True)
+    stat = journal_multidate_file.stat()
+    other = Journal(journal_multidate_file, lazy=True)
+    other.delete("2021-11-10")
+    other.add(JournalEntry("third date NOTE", "2021-11-10", "topic1"))
+    other.save()
+    os.utime(journal_multidate_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert stat.st_size == journal_multidate_file.stat().st_size
+    assert journal.changed_on_disk()
+
+
+def test_save_reloads_external_edits_with_cache(journal_multidate_file):
+    journal = Journal(journal_multidate_file, lazy=True, use_cache=True)
+    stat = journal_multidate_file.stat()
+    journal_multidate_file.write_text("# 2021-11-12\n\n## topic3\n\n- external\n")
+    os.utime(journal_multidate_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    journal.add(JournalEntry("new", "2021-11-13", "topic3"))
+    journal.save()
+    notes = Journal(journal_multidate_file, lazy=True, use_cache=True).to_dict()
+    assert {
+        "2021-11-13": {"topic3": "- new\n"},
+        "2021-11-12": {"topic3": "- external\n"},
+    } == notes
+
+
+def test_failed_save_leaves_file_untouched(mocker, journal_multidate_file):
+    content = journal_multidate_file.read_text()
+    journal = Journal(journal_multidate_file)
+    journal.add(JournalEntry("a note", "2021-11-12", "topic3"))
+    mocker.patch("jrnlmd.ioutils.os.replace", side_effect=OSError("disk full"))
+    with pytest.raises(OSError):
+        journal.save()
+    assert content == journal_multidate_file.read_text()
+    assert [] == list(journal_multidate_file.parent.glob(".*.tmp"))
+
+
+def test_save_keeps_file_permissions(journal_multidate_file):
+    journal_multidate_file.chmod(0o640)
+    journal = Journal(journal_multidate_file)
+    journal.add(JournalEntry("a note", "2021-11-12", "topic3"))
+    journal.save()
+    assert 0o640 == journal_multidate_file.stat().st_mode & 0o777
+
+
+def _add_notes(journal_file, worker):
+    # Half of the workers keep the journal loaded, so their saves merge the notes
+    # of the others
+    journal = Journal(journal_file, lazy=True, use_cache=True)
+    for i in range(N_NOTES):
+        if worker % 2:
+            journal = Journal(journal_file, lazy=True, use_cache=True)
+        journal.add(JournalEntry(f"note {worker} {i}", f"2021-11-{i % 5 + 1:02}", "t"))
+        journal.save()
+
+
+def test_concurrent_adds_do_not_lose_notes(new_journal_file):
+    context = multiprocessing.get_context("fork")
+    workers = [
+        context.Process(target=_add_notes, args=(new_journal_file, worker))
+        for worker in range(N_WORKERS)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert all(worker.exitcode == 0 for worker in workers)
+    text = Journal(new_journal_file).to_md()
+    for worker in range(N_WORKERS):
+        for i in range(N_NOTES):
+            assert f"- note {worker} {i}\n" in text
@@ -1,11 +1,18 @@
+import datetime
+
+from jrnlmd.journal_entry import JournalEntry
+
+
 def test_journal_on_date(journal_multidate):
     journal_filtered = journal_multidate.on("2021-11-05")
-    assert {"2021-11-05": {"topic1": "- second date note\n"}} == journal_filtered._j
+    assert {
+        "2021-11-05": {"topic1": "- second date note\n"}
+    } == journal_filtered.to_dict()
 
 
 def test_journal_on_date_not_present(journal_multidate):
     journal_filtered = journal_multidate.on("1999-11-05")
-    assert {} == journal_filtered._j
+    assert {} == journal_filtered.to_dict()
 
 
 def test_journal_since_date(journal_multidate):
@@ -13,12 +20,53 @@ def test_journal_since_date(journal_multidate):
     assert {
         "2021-11-05": {"topic1": "- second date note\n"},
         "2021-11-10": {"topic1": "- third date note\n"},
-    } == journal_filtered._j
+    } == journal_filtered.to_dict()
 
 
 def test_journal_since_future_date(journal_multidate):
     journal_filtered = journal_multidate.since("3000-11-05")
-    assert {} == journal_filtered._j
+    assert {} == journal_filtered.to_dict()
+
+
+def test_journal_until_date(journal_multidate):
+    journal_filtered = journal_multidate.until("2021-11-05")
+    assert {
+        "2021-11-01": {"topic2": "- first date note\n", "topic1": "- another note\n"},
+        "2021-11-05": {"topic1": "- second date note\n"},
+    } == journal_filtered.to_dict()
+
+
+def test_journal_between_dates(journal_multidate):
+    journal_filtered = journal_multidate.between("2021-11-02", "2021-11-10")
+    assert {
+        "2021-11-05": {"topic1": "- second date note\n"},
+        "2021-11-10": {"topic1": "- third date note\n"},
+    } == journal_filtered.to_dict()
+
+
+def test_journal_between_empty_range(journal_multidate):
+    journal_filtered = journal_multidate.between("2021-11-06", "2021-11-09")
+    assert {} == journal_filtered.to_dict()
+
+
+def test_journal_last_days(journal_multidate, today):
+    journal_multidate.add(JournalEntry("a note", today, "topic1"))
+    journal_filtered = journal_multidate.last(7)
+    assert {today: {"topic1": "- a note\n"}} == journal_filtered.to_dict()
+
+
+def test_journal_last_days_excludes_future_dates(journal_multidate, today):
+    tomorrow = (datetime.date.fromisoformat(today) + datetime.timedelta(1)).isoformat()
+    journal_multidate.add(JournalEntry("a note", today, "topic1"))
+    journal_multidate.add(JournalEntry("a plan", tomorrow, "topic1"))
+    journal_filtered = journal_multidate.last(7)
+    assert {today: {"topic1": "- a note\n"}} == journal_filtered.to_dict()
+
+
+def test_journal_dates_stay_sorted(journal_multidate):
+    journal_multidate.add(JournalEntry("a note", "2021-11-07", "topic1"))
+    journal_multidate.delete("2021-11-05")
+    assert ["2021-11-01", "2021-11-07", "2021-11-10"] == journal_multidate._dates
 
 
 def test_journal_about_topic(journal_multidate):
@@ -27,12 +75,12 @@ def test_journal_about_topic(journal_multidate):
         "2021-11-01": {"topic1": "- another note\n"},
         "2021-11-05": {"topic1": "- second date note\n"},
         "2021-11-10": {"topic1": "- third date note\n"},
-    } == journal_filtered._j
+    } == journal_filtered.to_dict()
 
 
 def test_journal_about_topic_not_present(journal_multidate):
     journal_filtered = journal_multidate.about("nothing")
-    assert {} == journal_filtered._j
+    assert {} == journal_filtered.to_dict()
 
 
 def test_journal_about_topic_partial_matching(journal_multidate):
@@ -41,4 +89,9 @@ def test_journal_about_topic_partial_matching(journal_multidate):
         "2021-11-01": {"topic1": "- another note\n"},
         "2021-11-05": {"topic1": "- second date note\n"},
         "2021-11-10": {"topic1": "- third date note\n"},
-    } == journal_filtered._j
+    } == journal_filtered.to_dict()
+
+
+def test_journal_about_after_delete(journal_multidate):
+    journal_multidate.delete("2021-11-01", "topic2")
+    assert {} == journal_multidate.about("topic2").to_dict()
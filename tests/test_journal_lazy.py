@@ -0,0 +1,194 @@
+import pytest
+
+from jrnlmd.journal import Journal
+from jrnlmd.journal_entry import JournalEntry
+from jrnlmd.journal_index import (
+    JournalIndex,
+    JournalSection,
+    has_md_layout,
+    index_journal,
+    index_range,
+    map_journal,
+)
+
+
+@pytest.fixture
+def lazy_journal(journal_multidate_file):
+    return Journal(journal_multidate_file, lazy=True)
+
+
+def test_index_journal(journal_multidate_file):
+    text = journal_multidate_file.read_text()
+    index = index_journal(journal_multidate_file)
+    assert ["2021-11-10", "2021-11-05", "2021-11-01"] == list(index.sections)
+    assert [("2021-11-10", 0), ("2021-11-05", 44), ("2021-11-01", 89)] == index.days
+    section = index.sections["2021-11-01"][0]
+    assert ("2021-11-01", "topic2") == (section.date, section.topic)
+    assert "\n- first date note\n\n" == text[section.start : section.end]
+
+
+def test_index_range(journal_multidate_file):
+    index = index_journal(journal_multidate_file)
+    with map_journal(journal_multidate_file) as buffer:
+        sections = index_range(buffer, 44, 89)
+    assert {"2021-11-05": index.sections["2021-11-05"]} == sections
+
+
+def test_index_empty_journal(empty_journal_file):
+    assert JournalIndex({}, [], 0) == index_journal(empty_journal_file)
+
+
+def test_index_ignores_headings_in_code_fence(new_journal_file):
+    new_journal_file.write_text(
+        "# 2021-01-01\n## topic1\n- a note\n```bash\n# comment\n```\n"
+    )
+    index = index_journal(new_journal_file)
+    assert [JournalSection("2021-01-01", "topic1", 23, 54)] == index.sections[
+        "2021-01-01"
+    ]
+
+
+def test_index_malformed_journal(new_journal_file):
+    new_journal_file.write_text("## topic1\n\n- first line\n")
+    with pytest.raises(ValueError):
+        index_journal(new_journal_file)
+
+
+def test_has_md_layout(journal_multidate_file):
+    assert has_md_layout(journal_multidate_file, index_journal(journal_multidate_file))
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "# 2021-11-01\n## topic1\n\n- a note\n",
+        "# 2021-11-01\n\n## topic1\n- a note\n",
+        "# 2021-11-01\n\n##  topic1\n\n- a note\n",
+        "# 2021-11-01\n\n## topic1\n\n- a note\n\n- another note\n",
+        "# 2021-11-01\n\n## topic1\n\n- a note\n\n## topic1\n\n- a note\n",
+        "# 2021-11-01\r\n\r\n## topic1\r\n\r\n- a note\r\n",
+        "# 2021-11-01\n\n## topic1\n\n- a note\u2028\n",
+    ],
+)
+def test_has_md_layout_rejects_hand_edited_layout(new_journal_file, text):
+    new_journal_file.write_bytes(text.encode())
+    assert not has_md_layout(new_journal_file, index_journal(new_journal_file))
+
+
+def test_has_md_layout_allows_empty_lines_in_code_fence(new_journal_file):
+    new_journal_file.write_text(
+        "# 2021-11-01\n\n## topic1\n\n- a note\n```bash\n# c\n\nls\n```\n"
+    )
+    assert has_md_layout(new_journal_file, index_journal(new_journal_file))
+
+
+def test_lazy_journal_does_not_load_notes(lazy_journal):
+    assert {} == lazy_journal._j
+
+
+def test_lazy_journal_to_md(lazy_journal, journal_multidate):
+    assert journal_multidate.to_md() == lazy_journal.to_md()
+
+
+def test_lazy_journal_on_loads_only_the_date(lazy_journal):
+    result = lazy_journal.on("2021-11-05")
+    assert {"2021-11-05": {"topic1": "- second date note\n"}} == result.to_dict()
+    assert ["2021-11-10", "2021-11-01"] == list(lazy_journal._unloaded)
+
+
+EDITED_JOURNAL = """# 2021-11-12
+
+## topic3
+
+- a note added by another program
+
+# 2021-11-01
+
+## topic1
+
+- an edited note
+"""
+
+
+@pytest.mark.parametrize("use_cache", [False, True])
+def test_lazy_journal_reads_the_file_again_if_modified(
+    journal_multidate_file, use_cache
+):
+    Journal(journal_multidate_file, lazy=True, use_cache=use_cache)
+    journal = Journal(journal_multidate_file, lazy=True, use_cache=use_cache)
+    journal_multidate_file.write_text(EDITED_JOURNAL)
+    result = journal.on("2021-11-01")
+    assert {"2021-11-01": {"topic1": "- an edited note\n"}} == result.to_dict()
+    assert EDITED_JOURNAL == journal.to_md()
+
+
+def test_lazy_journal_redoes_changes_on_the_modified_file(lazy_journal):
+    lazy_journal.add(JournalEntry("new note", "2021-11-10", "topic1"))
+    lazy_journal.journal_file.write_text(EDITED_JOURNAL)
+    assert (
+        "# 2021-11-12\n\n## topic3\n\n- a note added by another program\n"
+        == lazy_journal.on("2021-11-12").to_md()
+    )
+    assert ["2021-11-01", "2021-11-10", "2021-11-12"] == lazy_journal.dates()
+    assert {"2021-11-10": {"topic1": "- new note\n"}} == lazy_journal.on(
+        "2021-11-10"
+    ).to_dict()
+
+
+def test_lazy_journal_since(lazy_journal):
+    result = lazy_journal.since("2021-11-05")
+    assert ["2021-11-10", "2021-11-05"] == sorted(result.to_dict(), reverse=True)
+    assert ["2021-11-01"] == list(lazy_journal._unloaded)
+
+
+def test_lazy_journal_about(lazy_journal):
+    result = lazy_journal.about("topic2")
+    assert {"2021-11-01": {"topic2": "- first date note\n"}} == result.to_dict()
+    assert ["2021-11-10", "2021-11-05"] == list(lazy_journal._unloaded)
+
+
+def test_lazy_journal_topics_does_not_load_notes(lazy_journal):
+    assert ["topic1", "topic2"] == lazy_journal.topics()
+    assert {} == lazy_journal._j
+
+
+def test_lazy_journal_add_keeps_topic_order(lazy_journal):
+    lazy_journal.add(JournalEntry("new note", "2021-11-01", "topic3"))
+    assert ["topic2", "topic1", "topic3"] == list(lazy_journal._j["2021-11-01"])
+
+
+def test_lazy_journal_delete(lazy_journal):
+    deleted_entries = lazy_journal.delete("2021-11-01", "topic2")
+    assert {"2021-11-01": {"topic2": "- first date note\n"}} == deleted_entries._j
+
+
+def test_lazy_journal_preserves_code_fence(new_journal_file):
+    text = """# 2021-11-01
+
+## topic1
+
+- a note
+```bash
+# comment
+
+ls -a
+```
+"""
+    new_journal_file.write_text(text)
+    assert text == Journal(new_journal_file, lazy=True).to_md()
+
+
+@pytest.mark.parametrize("date_descending", [True, False])
+@pytest.mark.parametrize("compact", [True, False])
+def test_lazy_iter_md(journal_multidate, lazy_journal, date_descending, compact):
+    chunks = list(lazy_journal.iter_md(date_descending, compact=compact))
+    assert 3 == len(chunks)
+    assert journal_multidate.to_md(date_descending, compact=compact) == "".join(chunks)
+    assert {} == lazy_journal._j
+
+
+def test_lazy_iter_md_simplified(journal_multidate_file):
+    journal = Journal(journal_multidate_file, lazy=True).about("topic2")
+    assert "# topic2\n\n## 2021-11-01\n\n- first date note\n" == "".join(
+        journal.iter_md(simplified=True)
+    )
@@ -0,0 +1,148 @@
+import random
+import re
+
+import pytest
+
+from jrnlmd.journal import Journal
+from jrnlmd.journal_entry import JournalEntry
+
+DAYS = [f"2021-11-{day:02}" for day in range(1, 29)]
+TOPICS = [f"topic{i}" for i in range(6)]
+
+
+def random_journal(rng):
+    journal = Journal()
+    for _ in range(rng.randint(0, 30)):
+        journal.add(random_entry(rng))
+    return journal
+
+
+def random_entry(rng):
+    note = rng.choice(["a note", "wrapped\n  line", "code\n```bash\n# c\n\nls\n```"])
+    return JournalEntry(note, rng.choice(DAYS), rng.choice(TOPICS))
+
+
+def random_change(rng, journal, expected):
+    if rng.random() < 0.7 or not expected._j:
+        entry = random_entry(rng)
+        journal.add(entry)
+        expected.add(entry)
+    else:
+        date = rng.choice(sorted(expected._j))
+        topic = rng.choice([None, *expected._j[date]])
+        journal.delete(date, topic)
+        expected.delete(date, topic)
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_save_in_place_matches_full_save(seed, new_journal_file):
+    rng = random.Random(seed)
+    expected = random_journal(rng)
+    # Hand-edited files may have empty lines before the first date or after the last
+    blank_lines = ["", "\n", "\n\n"]
+    new_journal_file.write_text(
+        rng.choice(blank_lines) + expected.to_md() + rng.choice(blank_lines)
+    )
+    journal = Journal(new_journal_file, lazy=True)
+    for _ in range(3):
+        for _ in range(rng.randint(1, 4)):
+            random_change(rng, journal, expected)
+        journal.save()
+        assert expected.to_md() == new_journal_file.read_text()
+        assert journal._day_ranges is not None
+    assert expected.to_md() == journal.to_md()
+
+
+def hand_edit(rng, text):
+    """Lay out the notes as a hand-edited file could, other than `to_md` does."""
+    edits = [
+        lambda t: re.sub(r"^(#+ .*\n)\n", r"\1", t, flags=re.M),
+        lambda t: re.sub(r"^## ", "##  ", t, flags=re.M),
+        lambda t: t.replace("- a note\n", "- a note\n\n- a note\n"),
+        lambda t: t + "\n# 2021-11-01\n\n## topic0\n\n- again\n",
+        lambda t: t + "\n# 2021-11-28\n\n## topic1\n\n- on the last date\n",
+        lambda t: t.replace("\n", "\r\n"),
+    ]
+    for edit in rng.sample(edits, rng.randint(1, 2)):
+        text = edit(text)
+    return text
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_save_in_place_matches_full_save_of_hand_edited_file(seed, new_journal_file):
+    rng = random.Random(seed)
+    new_journal_file.write_bytes(hand_edit(rng, random_journal(rng).to_md()).encode())
+    expected = Journal(new_journal_file)
+    journal = Journal(new_journal_file, lazy=True)
+    for _ in range(3):
+        for _ in range(rng.randint(1, 4)):
+            random_change(rng, journal, expected)
+        journal.save()
+        assert expected.to_md() == new_journal_file.read_text()
+    assert expected.to_md() == journal.to_md()
+
+
+def test_save_in_place_does_not_load_other_dates(journal_multidate_file):
+    journal = Journal(journal_multidate_file, lazy=True)
+    journal.add(JournalEntry("new note", "2021-11-05", "topic1"))
+    journal.save()
+    assert ["2021-11-10", "2021-11-01"] == list(journal._unloaded)
+    assert (
+        """# 2021-11-05
+
+## topic1
+
+- second date note
+- new note
+"""
+        == journal.on("2021-11-05").to_md()
+    )
+    notes = journal.on("2021-11-01").to_dict()
+    assert "- another note\n" == notes["2021-11-01"]["topic1"]
+
+
+def test_save_in_place_falls_back_on_non_canonical_date(mocker, new_journal_file):
+    new_journal_file.write_text("# 2021-11-01\n## topic1\n- a note\n")
+    journal = Journal(new_journal_file, lazy=True)
+    save_full = mocker.spy(journal, "_save_full")
+    journal.add(JournalEntry("new note", "2021-11-01", "topic1"))
+    journal.save()
+    save_full.assert_called_once()
+    assert (
+        "# 2021-11-01\n\n## topic1\n\n- a note\n- new note\n"
+        == new_journal_file.read_text()
+    )
+
+
+def test_save_in_place_reloads_if_file_changed(mocker, journal_multidate_file):
+    journal = Journal(journal_multidate_file, lazy=True)
+    load = mocker.spy(journal, "load")
+    journal.add(JournalEntry("new note", "2021-11-05", "topic1"))
+    journal_multidate_file.write_text("")
+    journal.save()
+    load.assert_called_once()
+    assert "# 2021-11-05\n\n## topic1\n\n- new note\n" == (
+        journal_multidate_file.read_text()
+    )
+
+
+def test_save_in_place_after_full_save(new_journal_file):
+    journal = Journal(new_journal_file, lazy=True)
+    journal.add(JournalEntry("a note", "2021-11-01", "topic1"))
+    journal.save()
+    journal.add(JournalEntry("new note", "2021-11-02", "topic1"))
+    assert journal._save_in_place()
+    assert Journal(new_journal_file).to_md() == journal.to_md()
+
+
+@pytest.mark.parametrize("text", ["\n\n", "\n# 2021-11-01\n", "# 2021-11-01\n\n"])
+def test_save_in_place_falls_back_on_empty_lines_around_dates(
+    mocker, new_journal_file, text
+):
+    new_journal_file.write_text(text)
+    journal = Journal(new_journal_file, lazy=True)
+    save_full = mocker.spy(journal, "_save_full")
+    journal.add(JournalEntry("a note", "2021-11-02", "topic1"))
+    journal.save()
+    save_full.assert_called_once()
+    assert "# 2021-11-02\n\n## topic1\n\n- a note\n" == new_journal_file.read_text()
@@ -1,3 +1,35 @@
+from jrnlmd.journal import Journal
+from jrnlmd.journal_entry import JournalEntry
+
+
 def test_journal_topics(journal_multidate):
     topics = journal_multidate.topics()
     assert ["topic1", "topic2"] == topics
+
+
+def test_journal_topics_after_add_and_delete(journal_multidate):
+    journal_multidate.add(JournalEntry("a note", "2021-11-12", "topic0"))
+    assert ["topic0", "topic1", "topic2"] == journal_multidate.topics()
+    journal_multidate.delete("2021-11-01", "topic2")
+    assert ["topic0", "topic1"] == journal_multidate.topics()
+
+
+def test_journal_topic_counts(journal_multidate):
+    journal_multidate.delete("2021-11-10")
+    assert [("topic1", 2), ("topic2", 1)] == journal_multidate.topic_counts()
+
+
+def test_journal_recent_topics(journal_multidate):
+    journal_multidate.add(JournalEntry("a note", "2021-11-12", "topic2"))
+    assert [
+        ("topic2", "2021-11-12"),
+        ("topic1", "2021-11-10"),
+    ] == journal_multidate.recent_topics()
+    journal_multidate.delete("2021-11-12")
+    assert ("topic2", "2021-11-01") in journal_multidate.recent_topics()
+
+
+def test_journal_topics_lazy(journal_multidate_file):
+    journal = Journal(journal_multidate_file, lazy=True)
+    assert ["topic1", "topic2"] == journal.topics()
+    assert {} == journal._j
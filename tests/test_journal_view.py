@@ -0,0 +1,78 @@
+import pytest
+
+from jrnlmd.journal import Journal
+from jrnlmd.journal_entry import JournalEntry
+from jrnlmd.journal_view import JournalView
+
+
+@pytest.fixture
+def lazy_journal(journal_multidate_file):
+    return Journal(journal_multidate_file, lazy=True)
+
+
+def test_filters_return_views(journal_multidate):
+    view = journal_multidate.since("2021-11-01").until("2021-11-05").about("topic")
+    assert isinstance(view, JournalView)
+    assert journal_multidate is view._journal
+
+
+def test_chained_date_filters_intersect(journal_multidate):
+    view = journal_multidate.since("2021-11-02").between("2021-10-01", "2021-11-07")
+    assert ["2021-11-05"] == view.dates()
+    assert [] == journal_multidate.on("2021-11-01").on("2021-11-05").dates()
+
+
+def test_chained_topic_filters_intersect(journal_multidate):
+    journal_multidate.add(JournalEntry("a note", "2021-11-05", "topic12"))
+    assert ["topic1", "topic12"] == journal_multidate.about("pic1").topics()
+    view = journal_multidate.about("pic1").about("12")
+    assert {"2021-11-05": {"topic12": "- a note\n"}} == view.to_dict()
+
+
+def test_view_on_and_about(journal_multidate):
+    view = journal_multidate.on("2021-11-01").about("topic1")
+    assert {"2021-11-01": {"topic1": "- another note\n"}} == view.to_dict()
+    assert "# 2021-11-01\n\n## topic1\n\n- another note\n" == view.to_md()
+
+
+def test_view_topics_in_date_range(journal_multidate):
+    assert ["topic1"] == journal_multidate.since("2021-11-05").topics()
+    assert ["topic1", "topic2"] == journal_multidate.about("topic").topics()
+
+
+def test_view_simplified_with_a_single_topic_in_range(journal_multidate):
+    view = journal_multidate.since("2021-11-05").about("topic")
+    assert (
+        "# topic1\n\n## 2021-11-05\n\n- second date note\n"
+        "\n## 2021-11-10\n\n- third date note\n"
+    ) == view.to_md(date_descending=False, simplified=True)
+
+
+def test_view_shows_later_changes(journal_multidate):
+    view = journal_multidate.on("2021-11-05")
+    journal_multidate.add(JournalEntry("a new note", "2021-11-05", "topic3"))
+    assert {
+        "topic1": "- second date note\n",
+        "topic3": "- a new note\n",
+    } == view.to_dict()["2021-11-05"]
+
+
+def test_view_renders_lazy_journal_without_loading_notes(lazy_journal):
+    view = lazy_journal.since("2021-11-01").about("topic2")
+    assert "# 2021-11-01\n\n## topic2\n\n- first date note\n" == view.to_md()
+    assert {} == lazy_journal._j
+
+
+def test_view_to_journal(journal_multidate):
+    journal = journal_multidate.about("topic2").to_journal()
+    assert isinstance(journal, Journal)
+    journal.add(JournalEntry("a new note", "2021-11-01", "topic2"))
+    assert (
+        "- first date note\n"
+        == journal_multidate.on("2021-11-01").to_dict()["2021-11-01"]["topic2"]
+    )
+
+
+def test_view_search(journal_multidate):
+    view = journal_multidate.since("2021-11-05").search("date note")
+    assert ["2021-11-05", "2021-11-10"] == view.dates()
@@ -0,0 +1,143 @@
+import pytest
+from click.testing import CliRunner
+
+from jrnlmd import jrnlmd
+from jrnlmd.journal import Journal
+from jrnlmd.multi_journal import MultiJournal, journal_labels
+from jrnlmd.sharded_journal import ShardedJournal
+
+
+@pytest.fixture
+def journal_files(tmp_path, journal_multidate_file):
+    bob_file = tmp_path / "team" / "bob.md"
+    bob_file.parent.mkdir()
+    bob_file.write_text("""# 2021-11-10
+
+## topic1
+
+- bob note
+
+# 2021-11-08
+
+## topic3
+
+- another bob note
+""")
+    alice_file = bob_file.with_name("alice.md")
+    journal_multidate_file.rename(alice_file)
+    return [alice_file, bob_file]
+
+
+def test_notes_are_merged_by_date(journal_files):
+    journals = MultiJournal(journal_files)
+
+    assert {
+        "2021-11-10": {
+            "topic1 (alice)": "- third date note\n",
+            "topic1 (bob)": "- bob note\n",
+        }
+    } == journals.on("2021-11-10").to_dict()
+    assert ["2021-11-01", "2021-11-05", "2021-11-08", "2021-11-10"] == journals.dates()
+
+
+def test_filters_are_run_in_worker_processes(journal_files):
+    journals = MultiJournal(journal_files, max_workers=2)
+
+    assert {
+        "2021-11-08": {"topic3 (bob)": "- another bob note\n"},
+        "2021-11-10": {"topic1 (bob)": "- bob note\n"},
+    } == journals.since("2021-11-06").search("bob").to_dict()
+    assert [("topic1", 4), ("topic2", 1), ("topic3", 1)] == journals.topic_counts()
+    assert [
+        ("topic1", "2021-11-10"),
+        ("topic3", "2021-11-08"),
+        ("topic2", "2021-11-01"),
+    ] == journals.recent_topics()
+
+
+def test_file_and_directory_journals(tmp_path, journal_files):
+    alice_dir = tmp_path / "alice"
+    ShardedJournal.split(Journal(journal_files[0]), alice_dir, "month")
+    journals = MultiJournal([alice_dir, journal_files[1]])
+
+    assert MultiJournal(journal_files).to_dict() == journals.to_dict()
+    result = CliRunner().invoke(
+        jrnlmd.cli, ["-j", str(alice_dir), "-j", str(journal_files[1]), "cat"]
+    )
+    assert journals.to_md(date_descending=False) + "\n" == result.output
+
+
+def test_labels_of_journals_with_the_same_name(tmp_path):
+    paths = [tmp_path / "a" / "journal.md", tmp_path / "b" / "journal.md"]
+
+    assert [str(path) for path in paths] == journal_labels(paths)
+
+
+def test_cat_several_journals(journal_files):
+    result = CliRunner().invoke(
+        jrnlmd.cli,
+        ["-j", str(journal_files[0]), "-j", str(journal_files[1]), "cat", "topic1"],
+    )
+
+    assert """# 2021-11-01
+
+## topic1 (alice)
+
+- another note
+
+# 2021-11-05
+
+## topic1 (alice)
+
+- second date note
+
+# 2021-11-10
+
+## topic1 (alice)
+
+- third date note
+
+## topic1 (bob)
+
+- bob note
+
+""" == result.output
+
+
+def test_search_journals_matching_a_glob(journal_files):
+    result = CliRunner().invoke(
+        jrnlmd.cli, ["-j", str(journal_files[0].parent / "*.md"), "search", "another"]
+    )
+
+    assert """# 2021-11-01
+
+## topic1 (alice)
+
+- another note
+
+# 2021-11-08
+
+## topic3 (bob)
+
+- another bob note
+
+""" == result.output
+
+
+def test_glob_matching_no_journal(tmp_path):
+    result = CliRunner().invoke(jrnlmd.cli, ["-j", str(tmp_path / "*.md"), "top"])
+
+    assert 2 == result.exit_code
+    assert "No journal matches" in result.output
+
+
+@pytest.mark.parametrize("command", [["add", "topic1 . note"], ["topic1", ". note"]])
+def test_add_to_several_journals_is_refused(journal_files, command):
+    bob_text = journal_files[1].read_text()
+    result = CliRunner().invoke(
+        jrnlmd.cli, ["-j", str(journal_files[0].parent / "*.md"), *command]
+    )
+
+    assert 2 == result.exit_code
+    assert "accepts a single journal" in result.output
+    assert bob_text == journal_files[1].read_text()
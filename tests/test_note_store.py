@@ -0,0 +1,59 @@
+import pytest
+
+from jrnlmd.note_store import NoteStore
+
+
+@pytest.fixture
+def store():
+    store = NoteStore()
+    store.set_day("2021-11-01", {"topic2": "- a note\n", "topic1": "- another\n"})
+    store.set_day("2021-11-05", {"topic1": "- a third note\n"})
+    return store
+
+
+def test_store_is_a_mapping(store):
+    assert {
+        "2021-11-01": {"topic2": "- a note\n", "topic1": "- another\n"},
+        "2021-11-05": {"topic1": "- a third note\n"},
+    } == store
+    assert ["topic2", "topic1"] == list(store["2021-11-01"])
+    assert 2 == len(store)
+    assert "2021-11-05" in store
+    assert "2021-11-06" not in store
+    assert {} == store.get("2021-11-06", {})
+
+
+def test_note(store):
+    assert "- another\n" == store.note("2021-11-01", "topic1")
+    assert store.note("2021-11-05", "topic2") is None
+    assert store.note("2021-11-05", "topic3") is None
+    assert store.note("2021-11-06", "topic1") is None
+
+
+def test_append(store):
+    store.append("2021-11-01", "topic2", "- appended\n")
+    store.append("2021-11-01", "topic3", "- new topic\n")
+    store.append("2021-11-10", "topic1", "- new date\n")
+    assert {
+        "topic2": "- a note\n- appended\n",
+        "topic1": "- another\n",
+        "topic3": "- new topic\n",
+    } == store["2021-11-01"]
+    assert {"topic1": "- new date\n"} == store["2021-11-10"]
+
+
+def test_delete(store):
+    store.delete("2021-11-01", "topic2")
+    assert {"topic1": "- another\n"} == store["2021-11-01"]
+    store.delete("2021-11-01", "topic1")
+    assert "2021-11-01" not in store
+
+
+def test_set_day_without_notes_removes_the_date(store):
+    store.set_day("2021-11-05", {})
+    assert "2021-11-05" not in store
+
+
+def test_topics_are_stored_once(store):
+    store.append("2021-11-10", "topic1", "- new date\n")
+    assert ["topic2", "topic1"] == store._topics
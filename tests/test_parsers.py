@@ -1,5 +1,12 @@
+import datetime
+import sys
+
+import pytest
+
 from jrnlmd.parsers import (
+    _parse_common_date,
     _parse_date,
+    _resolve_date,
     _split_date_topic,
     _split_on_separator,
     parse_journal_entry_text,
@@ -30,6 +37,61 @@ def test_parse_date_iso_format():
     assert "2021-11-12" == iso_date
 
 
+@pytest.mark.parametrize(
+    "txt_date,iso_date",
+    [
+        ("today", "2021-11-12"),
+        ("Yesterday", "2021-11-11"),
+        ("2 days ago", "2021-11-10"),
+        ("1 week ago", "2021-11-05"),
+        ("mon", "2021-11-08"),
+        ("friday", "2021-11-05"),
+        ("12/03", "2021-03-12"),
+        ("25/12", "2020-12-25"),
+        ("1 11 2021", "2021-11-01"),
+        ("12.03.21", "2021-03-12"),
+        ("12.3", "2021-03-12"),
+        ("31.05", "2021-05-31"),
+        ("12/03/99", "1999-03-12"),
+        ("12nov2021", "2021-11-12"),
+        ("12 nov", "2021-11-12"),
+        ("13 november", "2020-11-13"),
+        ("nov 2", "2021-11-02"),
+    ],
+)
+def test_parse_common_date(txt_date, iso_date):
+    today = datetime.date(2021, 11, 12)
+    assert iso_date == _resolve_date(txt_date, today)
+
+
+@pytest.mark.parametrize(
+    "txt_date", ["31/02", "2 months ago", "aaaa", "12 foo", "12.03", "9.30", "23.59"]
+)
+def test_parse_common_date_not_handled(txt_date):
+    assert _parse_common_date(txt_date, datetime.date(2021, 11, 12)) is None
+
+
+def test_parse_date_dotted_time_as_dateparser():
+    # dateparser reads "12.03" as 12:03, today or yesterday, and not as 12 March
+    today = datetime.date.today()
+    yesterday = today - datetime.timedelta(days=1)
+    assert _parse_date("12.03") in [today.isoformat(), yesterday.isoformat()]
+
+
+def test_parse_common_date_without_dateparser(mocker):
+    mocker.patch.dict(sys.modules, {"dateparser": None})
+    _resolve_date.cache_clear()
+    assert "2021-11-11" == _resolve_date("yesterday", datetime.date(2021, 11, 12))
+    assert _parse_date("") is None
+
+
+def test_parse_date_is_memoized():
+    _resolve_date.cache_clear()
+    _parse_date("12nov2021")
+    _parse_date("12nov2021")
+    assert 1 == _resolve_date.cache_info().hits
+
+
 def test_input_date_only():
     txt_input = "12 nov 2021:"
     date, topic, notes = parse_journal_entry_text(txt_input)
@@ -0,0 +1,83 @@
+import json
+import pstats
+
+import pytest
+from click.testing import CliRunner
+
+from jrnlmd import ioutils, jrnlmd, profiling
+
+
+@pytest.fixture(autouse=True)
+def stop_profiling():
+    yield
+    profiling.stop()
+
+
+def test_phases_are_not_recorded_when_disabled():
+    assert profiling.phase("load") is profiling.phase("save")
+    with profiling.phase("load"):
+        pass
+    assert [] == profiling._events
+
+
+def test_nested_phases(monkeypatch):
+    monkeypatch.setattr(profiling, "_imported", False)
+    profiling.start()
+    with profiling.phase("load"):
+        with profiling.phase("read notes"):
+            pass
+    assert ["import", "read notes", "load"] == [e[0] for e in profiling._events]
+    _, _, load_time, children_time = profiling._events[-1]
+    assert children_time == profiling._events[1][2]
+    assert load_time >= children_time
+
+
+def test_profile_prints_the_phases(journal_multidate_file):
+    result = CliRunner().invoke(
+        jrnlmd.cli, ["-j", str(journal_multidate_file), "--profile", "cat", "topic1"]
+    )
+
+    assert 0 == result.exit_code
+    assert "# 2021-11-10" in result.stdout
+    phases = [line.rsplit(maxsplit=3)[0] for line in result.stderr.splitlines()[1:]]
+    assert {"config", "load", "parse", "filter"} <= set(phases)
+    assert not profiling.ENABLED
+
+
+def test_trace_environment_variable_writes_a_chrome_trace(
+    journal_multidate_file, tmp_path, monkeypatch
+):
+    trace_file = tmp_path / "trace.json"
+    monkeypatch.setenv("JRNLMD_TRACE", str(trace_file))
+
+    result = CliRunner().invoke(
+        jrnlmd.cli, ["-j", str(journal_multidate_file), "add", "topic1 . a note"]
+    )
+
+    assert 0 == result.exit_code
+    events = json.loads(trace_file.read_text())["traceEvents"]
+    assert "save" in [event["name"] for event in events]
+    assert all(event["ph"] == "X" and event["dur"] >= 0 for event in events)
+
+
+def test_profile_output_writes_the_cprofile_statistics(
+    journal_multidate_file, tmp_path
+):
+    stats_file = tmp_path / "jrnlmd.prof"
+
+    result = CliRunner().invoke(
+        jrnlmd.cli,
+        ["-j", str(journal_multidate_file), "--profile-output", str(stats_file), "top"],
+    )
+
+    assert 0 == result.exit_code
+    functions = [name for _, _, name in pstats.Stats(str(stats_file)).stats]
+    assert "topics" in functions
+
+
+def test_rendering_is_timed_while_printing(capsys):
+    profiling.start()
+    ioutils.print_with_external(iter(["# 2021-11-10\n", "\n## topic1\n"]))
+
+    assert "# 2021-11-10\n\n## topic1\n" == capsys.readouterr().out
+    assert ["render"] * 3 + ["print"] == [e[0] for e in profiling._events[-4:]]
@@ -0,0 +1,103 @@
+import pytest
+
+from jrnlmd.journal import Journal
+from jrnlmd.journal_cache import JournalCache
+from jrnlmd.journal_entry import JournalEntry
+from jrnlmd.search_index import (
+    SearchIndex,
+    SearchIndexCache,
+    matches,
+    parse_query,
+)
+
+NOTES = {
+    "2021-11-01": {"work": "- code review of the parser\n", "home": "- fix sink\n"},
+    "2021-11-02": {"work": "- review meeting\n- parser bug\n"},
+}
+
+
+@pytest.fixture
+def search_index():
+    return SearchIndex.from_notes(NOTES)
+
+
+def test_parse_query():
+    assert [[("parser",), ("code", "review")], [("sink",)]] == parse_query(
+        'parser "Code review" OR sink'
+    )
+
+
+def test_parse_empty_query():
+    assert [] == parse_query("")
+
+
+@pytest.mark.parametrize(
+    "query,expected",
+    [
+        ("parser", [("2021-11-01", "work"), ("2021-11-02", "work")]),
+        ("review parser", [("2021-11-01", "work"), ("2021-11-02", "work")]),
+        ("sink OR meeting", [("2021-11-01", "home"), ("2021-11-02", "work")]),
+        ("REVIEW sink", []),
+        ("missing", []),
+    ],
+)
+def test_search(search_index, query, expected):
+    assert expected == search_index.search(parse_query(query))
+
+
+def test_matches_phrase():
+    query = parse_query('"review meeting"')
+    assert matches(query, "- review meeting\n")
+    assert not matches(query, "- meeting review\n")
+
+
+def test_update_day(search_index):
+    search_index.update_day("2021-11-01", {"work": "- new note\n"})
+    assert [] == search_index.search(parse_query("sink"))
+    assert [("2021-11-01", "work")] == search_index.search(parse_query("new"))
+    assert not search_index.needs_rebuild()
+
+
+def test_search_index_cache(journal_multidate_file):
+    cache = SearchIndexCache(journal_multidate_file)
+    cache.save(SearchIndex.from_notes(NOTES))
+    assert [("2021-11-01", "home")] == cache.load().search(parse_query("sink"))
+    journal_multidate_file.write_text("")
+    assert cache.load() is None
+
+
+def test_journal_search(journal_multidate):
+    result = journal_multidate.search("date note")
+    assert ["2021-11-01", "2021-11-05", "2021-11-10"] == sorted(result._j)
+    assert {"2021-11-01": {"topic2": "- first date note\n"}} == (
+        journal_multidate.search('"first date"')._j
+    )
+
+
+def test_journal_search_index_is_updated_on_save(journal_multidate_file):
+    journal = Journal(journal_multidate_file, lazy=True, use_cache=True)
+    journal.search("note")
+    cache = SearchIndexCache(journal_multidate_file)
+    assert cache.exists()
+    journal = Journal(journal_multidate_file, lazy=True, use_cache=True)
+    journal.add(JournalEntry("unusual word", "2021-11-12", "topic3"))
+    journal.delete("2021-11-05")
+    journal.save()
+    index = cache.load()
+    assert [("2021-11-12", "topic3")] == index.search(parse_query("unusual"))
+    assert [] == index.search(parse_query("second"))
+
+
+def test_journal_search_index_rebuilt_on_save_keeps_unloaded_dates(
+    mocker, journal_multidate_file
+):
+    Journal(journal_multidate_file, lazy=True, use_cache=True).search("note")
+    needs_rebuild = mocker.spy(SearchIndex, "needs_rebuild")
+    while not any(needs_rebuild.spy_return_list):
+        # Without the notes in the cache, the dates are indexed but not read
+        JournalCache(journal_multidate_file).cache_path.unlink()
+        journal = Journal(journal_multidate_file, lazy=True, use_cache=True)
+        journal.add(JournalEntry("a note", "2021-11-12", "topic3"))
+        journal.save()
+    index = SearchIndexCache(journal_multidate_file).load()
+    assert [("2021-11-01", "topic2")] == index.search(parse_query("first"))
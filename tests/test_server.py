@@ -0,0 +1,126 @@
+import asyncio
+import contextlib
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from jrnlmd import client, ioutils, jrnlmd, profiling
+from jrnlmd.journal import Journal
+from jrnlmd.server import JournalServer
+
+
+@pytest.fixture
+def server():
+    return JournalServer()
+
+
+@pytest.fixture
+def server_socket(server):
+    # Unix socket paths are limited in length, so tmp_path cannot be used
+    with tempfile.TemporaryDirectory() as socket_dir:
+        path = Path(socket_dir) / "jrnlmd.sock"
+
+        async def serve():
+            with contextlib.suppress(asyncio.CancelledError):
+                await server.serve(path)
+
+        loop = asyncio.new_event_loop()
+        serving = loop.create_task(serve())
+        thread = threading.Thread(target=loop.run_until_complete, args=(serving,))
+        thread.start()
+        while not path.exists():
+            time.sleep(0.01)
+        yield path
+        loop.call_soon_threadsafe(serving.cancel)
+        thread.join()
+        loop.close()
+
+
+def _run_locally(args):
+    return CliRunner().invoke(jrnlmd.cli, args).output
+
+
+def _output(response):
+    return "".join(text for _, text in response["output"])
+
+
+def test_server_cat(server, capsys, journal_multidate_file):
+    args = ["-j", str(journal_multidate_file), "cat", "since 2021-11-05:"]
+    response = server.run(args, str(Path.cwd()))
+    assert 0 == response["exit_code"]
+    ioutils.replay_output(response["output"])
+    assert _run_locally(args) == capsys.readouterr().out
+
+
+def test_server_top(server, journal_multidate_file):
+    args = ["-j", str(journal_multidate_file), "top"]
+    response = server.run(args, str(Path.cwd()))
+    assert "topic1\ntopic2\n" == _output(response)
+
+
+def test_server_keeps_journal_in_memory(server, journal_multidate_file):
+    journal = server.open_journal(journal_multidate_file)
+    server.run(
+        ["-j", str(journal_multidate_file), "add", "2021-11-12: t . a note"], "/"
+    )
+    assert journal is server.open_journal(journal_multidate_file)
+    assert "- a note\n" == Journal(journal_multidate_file)._j["2021-11-12"]["t"]
+
+
+def test_server_reloads_modified_journal(server, journal_multidate_file):
+    server.open_journal(journal_multidate_file)
+    journal_multidate_file.write_text("# 2021-11-12\n\n## edited\n\n- a note\n")
+    response = server.run(["-j", str(journal_multidate_file), "top"], "/")
+    assert "edited\n" == _output(response)
+
+
+def test_server_relative_journal_path(server, journal_multidate_file):
+    args = ["-j", journal_multidate_file.name, "top"]
+    response = server.run(args, str(journal_multidate_file.parent))
+    assert "topic1\ntopic2\n" == _output(response)
+
+
+def test_server_falls_back_when_editor_is_needed(server, journal_multidate_file):
+    response = server.run(["-j", str(journal_multidate_file), "add", "topic1"], "/")
+    assert {"fallback": True} == response
+
+
+def test_server_usage_error(server):
+    response = server.run(["top"], "/")
+    assert 2 == response["exit_code"]
+    assert "Missing option" in _output(response)
+
+
+def test_server_profile_has_no_import_phase(monkeypatch, journal_multidate_file):
+    monkeypatch.setattr(profiling, "_imported", False)
+    server = JournalServer()
+    args = ["-j", str(journal_multidate_file), "--profile", "top"]
+    response = server.run(args, "/")
+    assert 0 == response["exit_code"]
+    stderr = "".join(text for stream, text in response["output"] if stream == "stderr")
+    phases = [line.split()[0] for line in stderr.splitlines()[1:]]
+    assert "load" in phases
+    assert "import" not in phases
+
+
+def test_client_sends_command(server_socket, journal_multidate_file):
+    args = ["-j", str(journal_multidate_file), "top", "--counts"]
+    response = client.send_command(args, server_socket)
+    assert _run_locally(args) == _output(response)
+
+
+def test_client_without_server(tmp_path):
+    assert client.send_command(["top"], tmp_path / "missing.sock") is None
+
+
+def test_client_main_runs_locally_without_server(
+    monkeypatch, capsys, journal_multidate_file
+):
+    monkeypatch.setenv("JRNLMD_SOCKET", str(journal_multidate_file.parent / "none"))
+    with pytest.raises(SystemExit):
+        client.main(["-j", str(journal_multidate_file), "top"])
+    assert "topic1\ntopic2\n" == capsys.readouterr().out
@@ -0,0 +1,92 @@
+import pytest
+
+from jrnlmd.journal import Journal
+from jrnlmd.journal_entry import JournalEntry
+from jrnlmd.sharded_journal import ShardedJournal
+
+
+@pytest.fixture
+def journal_dir(tmp_path):
+    return tmp_path / "journal"
+
+
+@pytest.fixture
+def sharded_journal(journal_multidate, journal_dir):
+    journal_multidate.add(JournalEntry("old note", "2020-12-31", "topic3"))
+    return ShardedJournal.split(journal_multidate, journal_dir, "year")
+
+
+def test_split(sharded_journal, journal_multidate, journal_dir):
+    assert ["2020.md", "2021.md"] == sorted(path.name for path in journal_dir.iterdir())
+    assert journal_multidate.to_md() == sharded_journal.to_md()
+    assert journal_multidate.to_md(date_descending=False, compact=True) == (
+        sharded_journal.to_md(date_descending=False, compact=True)
+    )
+
+
+def test_split_by_month(journal_multidate, journal_dir):
+    sharded_journal = ShardedJournal.split(journal_multidate, journal_dir, "month")
+    assert [journal_dir / "2021-11.md"] == sharded_journal.shard_files()
+    assert "month" == ShardedJournal(journal_dir).by
+
+
+def test_split_into_existing_journal(sharded_journal, journal_multidate, journal_dir):
+    with pytest.raises(FileExistsError):
+        ShardedJournal.split(journal_multidate, journal_dir, "year")
+
+
+def test_filters_load_only_needed_shards(sharded_journal, journal_dir):
+    journal = ShardedJournal(journal_dir)
+    assert ["2021-11-05"] == journal.on("2021-11-05").dates()
+    assert ["2021"] == list(journal._shards)
+    assert ["2021-11-01", "2021-11-05"] == journal.between(
+        "2021-01-01", "2021-11-05"
+    ).dates()
+    assert ["2020-12-31", "2021-11-01"] == journal.until("2021-11-01").dates()
+    assert ["2021-11-05", "2021-11-10"] == journal.since("2021-11-02").dates()
+
+
+def test_topics(sharded_journal):
+    assert ["topic1", "topic2", "topic3"] == sharded_journal.topics()
+    assert [("topic1", 3), ("topic2", 1), ("topic3", 1)] == (
+        sharded_journal.topic_counts()
+    )
+    assert ("topic3", "2020-12-31") == sharded_journal.recent_topics()[-1]
+
+
+def test_about_and_search(sharded_journal):
+    assert ["2020-12-31"] == sharded_journal.about("topic3").dates()
+    assert ["2020-12-31"] == sharded_journal.search("old").dates()
+
+
+def test_save_writes_only_dirty_shards(sharded_journal, journal_dir):
+    old_shard = (journal_dir / "2020.md").stat()
+    journal = ShardedJournal(journal_dir)
+    journal.add(JournalEntry("a note", "2021-11-12", "topic1"))
+    journal.delete("2021-11-01", "topic2")
+    journal.add(JournalEntry("a new year", "2022-01-01", "topic1"))
+    journal.save()
+    assert old_shard == (journal_dir / "2020.md").stat()
+    assert "# 2022-01-01\n\n## topic1\n\n- a new year\n" == (
+        (journal_dir / "2022.md").read_text()
+    )
+    journal = ShardedJournal(journal_dir)
+    assert ["topic1", "topic3"] == journal.topics()
+    assert "2022-01-01" == journal.dates()[-1]
+    assert "- a note\n" in Journal(journal_dir / "2021.md").to_md()
+
+
+def test_changed_on_disk(sharded_journal, journal_dir):
+    journal = ShardedJournal(journal_dir)
+    journal.topics()
+    assert not journal.changed_on_disk()
+    (journal_dir / "2019.md").write_text("# 2019-01-01\n\n## topic\n\n- a note\n")
+    assert journal.changed_on_disk()
+
+
+def test_empty_directory(journal_dir):
+    journal_dir.mkdir()
+    journal = ShardedJournal(journal_dir, by="month")
+    journal.add(JournalEntry("a note", "2021-11-12", "topic1"))
+    journal.save()
+    assert [journal_dir / "2021-11.md"] == ShardedJournal(journal_dir).shard_files()
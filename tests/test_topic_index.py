@@ -0,0 +1,68 @@
+import pytest
+
+from jrnlmd.topic_index import TopicIndex
+
+
+@pytest.fixture
+def topic_index():
+    return TopicIndex(
+        [
+            ("2021-11-01", "work meeting"),
+            ("2021-11-02", "work meeting"),
+            ("2021-11-02", "homework"),
+            ("2021-11-03", "gym"),
+        ]
+    )
+
+
+@pytest.mark.parametrize(
+    "text,topics",
+    [
+        ("work", ["homework", "work meeting"]),
+        ("meeting", ["work meeting"]),
+        ("g", ["gym", "work meeting"]),
+        ("", ["gym", "homework", "work meeting"]),
+        ("workout", []),
+    ],
+)
+def test_matching(topic_index, text, topics):
+    assert topics == sorted(topic_index.matching(text))
+
+
+def test_dates_about(topic_index):
+    assert {"2021-11-01", "2021-11-02"} == topic_index.dates_about("work")
+
+
+def test_remove_date(topic_index):
+    topic_index.remove("work meeting", "2021-11-02")
+    assert {"2021-11-01"} == topic_index.dates_about("meeting")
+
+
+def test_remove_last_date_of_topic(topic_index):
+    topic_index.remove("gym", "2021-11-03")
+    assert [] == topic_index.matching("gym")
+    assert "gym" not in topic_index._ngrams
+
+
+def test_topics_are_sorted_and_updated(topic_index):
+    assert ["gym", "homework", "work meeting"] == topic_index.topics()
+    topic_index.add("diet", "2021-11-04")
+    topic_index.remove("gym", "2021-11-03")
+    assert ["diet", "homework", "work meeting"] == topic_index.topics()
+
+
+def test_count_and_last_date(topic_index):
+    assert 2 == topic_index.count("work meeting")
+    assert "2021-11-02" == topic_index.last_date("work meeting")
+    topic_index.remove("work meeting", "2021-11-02")
+    assert 1 == topic_index.count("work meeting")
+    assert "2021-11-01" == topic_index.last_date("work meeting")
+    assert 0 == topic_index.count("diet")
+    assert topic_index.last_date("diet") is None
+
+
+def test_matching_after_add_and_remove(topic_index):
+    topic_index.matching("work")
+    topic_index.add("workout", "2021-11-04")
+    topic_index.remove("homework", "2021-11-02")
+    assert ["work meeting", "workout"] == sorted(topic_index.matching("work"))
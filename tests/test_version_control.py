@@ -1,39 +1,109 @@
 from unittest import mock
 
 import git
+import pytest
 
-from jrnlmd.version_control import JournalGitVersionControl
+from jrnlmd.version_control import BACKENDS, JournalGitVersionControl, find_repo_dir
 
 
-def test_git_version_control_has_none_repo_if_journal_not_in_repo(journal_multidate):
-    vc = JournalGitVersionControl(journal_multidate.file_path)
+@pytest.fixture(params=BACKENDS)
+def backend(request):
+    return request.param
 
+
+@pytest.fixture
+def remote_repo(tmp_path_factory):
+    return git.Repo.init(str(tmp_path_factory.mktemp("remote")), bare=True)
+
+
+def test_git_version_control_has_none_repo_if_journal_not_in_repo(
+    journal_multidate, backend
+):
+    vc = JournalGitVersionControl(journal_multidate.file_path, backend)
+
+    assert vc._repo_dir is None
     assert vc._repo is None
+    assert vc.commit("test commit") is False
 
 
 def test_git_version_control_detect_repo(journal_multidate):
     git.Repo.init(str(journal_multidate.file_path.parent))
 
-    vc = JournalGitVersionControl(journal_multidate.file_path)
+    vc = JournalGitVersionControl(journal_multidate.file_path, "gitpython")
 
     assert isinstance(vc._repo, git.Repo)
+    assert journal_multidate.file_path.parent == vc._repo_dir
 
 
-def test_git_commit(journal_multidate, capsys):
-    git.Repo.init(str(journal_multidate.file_path.parent))
-    vc = JournalGitVersionControl(journal_multidate.file_path)
+def test_git_commit(journal_multidate, backend, capsys):
+    repo = git.Repo.init(str(journal_multidate.file_path.parent))
+    vc = JournalGitVersionControl(journal_multidate.file_path, backend)
 
     result = vc.commit("test commit")
 
     assert result is True
+    assert "test commit" == repo.head.commit.message.strip()
+    assert ["journal.md"] == [blob.path for blob in repo.head.commit.tree.blobs]
 
 
-@mock.patch("jrnlmd.version_control.git.Repo.remote")
-def test_git_push(mock_remote, journal_multidate):
-    git.Repo.init(str(journal_multidate.file_path.parent))
-    vc = JournalGitVersionControl(journal_multidate.file_path)
+def test_git_commit_changes(journal_multidate, backend):
+    repo = git.Repo.init(str(journal_multidate.file_path.parent))
+    vc = JournalGitVersionControl(journal_multidate.file_path, backend)
+    vc.commit("first commit")
+    journal_multidate.file_path.write_text("# 2021-11-12\n\n## topic1\n\n- a note\n")
+
+    assert vc.commit("second commit") is True
+
+    assert "second commit" == repo.head.commit.message.strip()
+    assert "first commit" == repo.head.commit.parents[0].message.strip()
+    assert "- a note" in repo.git.show("HEAD:journal.md")
+    assert "" == repo.git.status("--short", "--untracked-files=no")
+
+
+def test_git_commit_sharded_journal(tmp_path, backend):
+    repo = git.Repo.init(str(tmp_path))
+    journal_dir = tmp_path / "journal"
+    journal_dir.mkdir()
+    (journal_dir / "2020.md").write_text("# 2020-12-31\n")
+    vc = JournalGitVersionControl(journal_dir, backend)
+    vc.commit("first commit")
+    (journal_dir / "2021.md").write_text("# 2021-11-12\n")
+
+    assert vc.commit("second commit") is True
+
+    assert ["2020.md", "2021.md"] == [
+        blob.name for blob in (repo.head.commit.tree / "journal").blobs
+    ]
+
+
+def test_git_push(journal_multidate, remote_repo, backend):
+    repo = git.Repo.init(str(journal_multidate.file_path.parent))
+    repo.create_remote("origin", remote_repo.working_dir)
+    vc = JournalGitVersionControl(journal_multidate.file_path, backend)
+    vc.commit("test commit")
+    repo.git.push("-u", "origin", "HEAD")
+    vc.commit("second commit")
 
     result = vc.push("origin")
 
     assert result is True
-    mock_remote.return_value.push.assert_called_once()
+    assert "second commit" == remote_repo.head.commit.message.strip()
+
+
+def test_git_push_to_missing_remote(journal_multidate, backend, capsys):
+    git.Repo.init(str(journal_multidate.file_path.parent))
+    vc = JournalGitVersionControl(journal_multidate.file_path, backend)
+
+    assert vc.push("origin") is False
+    assert "remote repository not found" in capsys.readouterr().err
+
+
+def test_find_repo_dir_is_cached(tmp_path):
+    journal_dir = tmp_path / "notes" / "journal"
+    journal_dir.mkdir(parents=True)
+    assert find_repo_dir(journal_dir) is None
+    git.Repo.init(str(tmp_path))
+    assert tmp_path == find_repo_dir(journal_dir)
+    with mock.patch("pathlib.Path.exists") as exists:
+        assert tmp_path == find_repo_dir(journal_dir)
+    exists.assert_not_called()